@@ -44,6 +44,107 @@ class Settings(BaseModel):
     rate_limit_per_minute: int = 60
     rate_limit_ai_per_minute: int = 10
 
+    # AI Service
+    ai_model: str = os.getenv("AI_MODEL", "gemini-pro")
+    ai_timeout: float = float(os.getenv("AI_TIMEOUT", "30"))
+    # Threads for blocking Gemini SDK calls (caps concurrent upstream requests per worker)
+    ai_max_threads: int = int(os.getenv("AI_MAX_THREADS", "16"))
+    # In-flight upstream calls per worker, overall and per endpoint; the excess waits in a queue
+    ai_max_concurrency: int = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+    ai_endpoint_concurrency: int = int(os.getenv("AI_ENDPOINT_CONCURRENCY", "6"))
+    # Per-endpoint overrides, e.g. "improve-batch=2,analyze=4"
+    ai_endpoint_limits: dict = {
+        endpoint.strip(): int(limit)
+        for endpoint, limit in (
+            item.split("=", 1) for item in os.getenv("AI_ENDPOINT_LIMITS", "").split(",") if "=" in item
+        )
+    }
+    ai_queue_size: int = int(os.getenv("AI_QUEUE_SIZE", "64"))
+    ai_queue_timeout: float = float(os.getenv("AI_QUEUE_TIMEOUT", "10"))
+    # Estimated input tokens per upstream call for /ai/improve-batch; larger batches are split
+    ai_batch_token_budget: int = int(os.getenv("AI_BATCH_TOKEN_BUDGET", "3000"))
+    # Token budgets for the CV text in a prompt, e.g. AI_PROMPT_BUDGETS="analyze=1500"
+    ai_prompt_budget: int = int(os.getenv("AI_PROMPT_BUDGET", "2000"))
+    ai_prompt_budgets: dict = {
+        "analyze": 2000,
+        "optimize-for-job": 1500,
+        **{
+            endpoint.strip(): int(budget)
+            for endpoint, budget in (
+                item.split("=", 1) for item in os.getenv("AI_PROMPT_BUDGETS", "").split(",") if "=" in item
+            )
+        },
+    }
+    # Job descriptions longer than this are clipped before reaching the AI
+    ai_job_description_tokens: int = int(os.getenv("AI_JOB_DESCRIPTION_TOKENS", "1500"))
+    ai_cache_size: int = int(os.getenv("AI_CACHE_SIZE", "1000"))
+    ai_cache_ttl: int = int(os.getenv("AI_CACHE_TTL", str(24 * 3600)))
+    # Providers in order of preference: gemini, openai (any OpenAI-compatible API),
+    # fake (in-process stub with injected latency/errors for tests and drills)
+    ai_providers: list = [name.strip() for name in os.getenv("AI_PROVIDERS", "gemini").split(",") if name.strip()]
+    # Per-endpoint provider preference, e.g. "analyze=openai|gemini,improve=gemini"
+    ai_routes: dict = {
+        endpoint.strip(): [name.strip() for name in names.split("|") if name.strip()]
+        for endpoint, names in (
+            item.split("=", 1) for item in os.getenv("AI_ROUTES", "").split(",") if "=" in item
+        )
+    }
+    openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
+    openai_base_url: str = os.getenv("OPENAI_BASE_URL", "")
+    openai_model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    ai_fake_latency: float = float(os.getenv("AI_FAKE_LATENCY", "0.5"))
+    ai_fake_jitter: float = float(os.getenv("AI_FAKE_JITTER", "0"))
+    ai_fake_error_rate: float = float(os.getenv("AI_FAKE_ERROR_RATE", "0"))
+    # Circuit breaker per provider: opens at this error rate over its last AI_BREAKER_WINDOW calls
+    ai_breaker_threshold: float = float(os.getenv("AI_BREAKER_THRESHOLD", "0.5"))
+    ai_breaker_min_calls: int = int(os.getenv("AI_BREAKER_MIN_CALLS", "10"))
+    ai_breaker_window: int = int(os.getenv("AI_BREAKER_WINDOW", "20"))
+    ai_breaker_open_seconds: float = float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30"))
+    # Race a second attempt against calls slower than the recent p95 latency
+    ai_hedge: bool = os.getenv("AI_HEDGE", "false").lower() == "true"
+    # Job titles /ai/suggest-skills may learn from AI answers into the shared taxonomy
+    skill_taxonomy_max_learned: int = int(os.getenv("SKILL_TAXONOMY_MAX_LEARNED", "5000"))
+    # Usage metering: events are written to Mongo in batches
+    ai_usage_batch_size: int = int(os.getenv("AI_USAGE_BATCH_SIZE", "200"))
+    ai_usage_flush_seconds: float = float(os.getenv("AI_USAGE_FLUSH_SECONDS", "10"))
+    ai_usage_retention_days: int = int(os.getenv("AI_USAGE_RETENTION_DAYS", "90"))
+    # USD per million input/output tokens by provider, e.g. "gemini=0.075/0.30,openai=0.15/0.60"
+    ai_token_prices: dict = {
+        provider.strip(): tuple(float(price) for price in prices.split("/", 1))
+        for provider, prices in (
+            item.split("=", 1) for item in os.getenv("AI_TOKEN_PRICES", "").split(",") if "=" in item
+        )
+    }
+    # Users allowed to see everyone's AI usage; others only see their own
+    admin_emails: list = [email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()]
+
+    # PDF Rendering
+    pdf_backend: str = os.getenv("PDF_BACKEND", "xhtml2pdf")
+    # Per-template backend overrides, e.g. "tech=weasyprint,creative=weasyprint"
+    pdf_template_backends: dict = {
+        template.strip(): backend.strip()
+        for template, backend in (
+            item.split("=", 1) for item in os.getenv("PDF_TEMPLATE_BACKENDS", "").split(",") if "=" in item
+        )
+    }
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", "2"))
+    pdf_queue_size: int = int(os.getenv("PDF_QUEUE_SIZE", "8"))
+    pdf_render_timeout: float = float(os.getenv("PDF_RENDER_TIMEOUT", "30"))
+    pdf_worker_max_renders: int = int(os.getenv("PDF_WORKER_MAX_RENDERS", "100"))
+    pdf_worker_max_rss_mb: int = int(os.getenv("PDF_WORKER_MAX_RSS_MB", "512"))
+    pdf_export_concurrency: int = int(os.getenv("PDF_EXPORT_CONCURRENCY", "2"))
+    pdf_job_runners: int = int(os.getenv("PDF_JOB_RUNNERS", "2"))
+    # Seconds a finished PDF job is kept before Mongo's TTL monitor deletes it
+    pdf_job_ttl: int = int(os.getenv("PDF_JOB_TTL", str(24 * 3600)))
+    pdf_cache_memory_mb: int = int(os.getenv("PDF_CACHE_MEMORY_MB", "64"))
+    pdf_fragment_cache_size: int = int(os.getenv("PDF_FRAGMENT_CACHE_SIZE", "5000"))
+    # PDF size optimization after rendering: none, lossless or max
+    pdf_optimize_level: str = os.getenv("PDF_OPTIMIZE_LEVEL", "lossless")
+    pdf_image_dpi: int = int(os.getenv("PDF_IMAGE_DPI", "150"))
+    thumbnail_width: int = int(os.getenv("THUMBNAIL_WIDTH", "320"))
+    # Seconds a CV must go unsaved before its thumbnail is refreshed (autosave fires every few seconds)
+    thumbnail_idle_seconds: float = float(os.getenv("THUMBNAIL_IDLE_SECONDS", "30"))
+
     class Config:
         case_sensitive = False
 
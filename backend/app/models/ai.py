@@ -1,9 +1,25 @@
 """AI request and response models."""
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, BeforeValidator, Field
+from typing import Annotated, List, Optional
 from app.models.cv import CVData
 
 
+def _round_number(value):
+    """Accept 78.5 or "78" from the model where an integer score is expected."""
+    if isinstance(value, str):
+        value = value.strip().rstrip("%")
+        try:
+            value = float(value)
+        except ValueError:
+            return value
+    if isinstance(value, float):
+        return round(value)
+    return value
+
+
+Score = Annotated[int, BeforeValidator(_round_number), Field(ge=0, le=100)]
+
+
 class AIAnalysisRequest(BaseModel):
     cv_data: CVData
 
@@ -14,6 +30,70 @@ class AIImproveRequest(BaseModel):
     context: Optional[str] = None
 
 
+class AIImproveBatchRequest(BaseModel):
+    items: List[AIImproveRequest] = Field(..., min_length=1, max_length=50)
+
+
 class JobOptimizeRequest(BaseModel):
     cv_data: CVData
     job_description: str
+
+
+class ScoreBreakdown(BaseModel):
+    content: Score
+    formatting: Score
+    keywords: Score
+    ats_compatibility: Score
+
+
+class Weakness(BaseModel):
+    issue: str
+    suggestion: str = ""
+
+
+class CVAnalysis(BaseModel):
+    """Response of /ai/analyze."""
+    overall_score: Score
+    breakdown: ScoreBreakdown
+    strengths: List[str] = []
+    weaknesses: List[Weakness] = []
+    missing_keywords: List[str] = []
+    recommendations: List[str] = []
+    # "ai", or "local" for the rule-based score from cv_scorer
+    source: str = "ai"
+
+
+class JobSuggestion(BaseModel):
+    section: str = ""
+    suggestion: str
+
+
+class JobTailoring(BaseModel):
+    """LLM part of /ai/optimize-for-job; the keyword match is computed locally."""
+    suggestions: List[JobSuggestion] = []
+    optimized_summary: str = ""
+
+
+class JobOptimization(BaseModel):
+    """Response of /ai/optimize-for-job."""
+    match_percentage: Score
+    matched_keywords: List[str] = []
+    missing_keywords: List[str] = []
+    suggestions: List[JobSuggestion] = []
+    optimized_summary: str = ""
+
+
+class SkillSuggestions(BaseModel):
+    """Response of /ai/suggest-skills."""
+    technical_skills: List[str] = []
+    soft_skills: List[str] = []
+
+
+class ImprovedItem(BaseModel):
+    id: int
+    improved: str
+
+
+class ImprovedItems(BaseModel):
+    """Model answer for one /ai/improve-batch group."""
+    items: List[ImprovedItem] = []
@@ -1,24 +1,42 @@
 """AI-powered CV analysis and optimization routes."""
+import asyncio
 import json
+from typing import List
 from fastapi import APIRouter, HTTPException, Depends
-from app.models.ai import AIAnalysisRequest, AIImproveRequest, JobOptimizeRequest
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.models.ai import (
+    AIAnalysisRequest, AIImproveRequest, AIImproveBatchRequest, JobOptimizeRequest,
+    CVAnalysis, ImprovedItems, JobOptimization, JobTailoring, SkillSuggestions
+)
+from app.models.cv import CVData
 from app.models.user import User
 from app.core.security import get_current_user
-from app.utils.ai_service import get_ai_response
+from app.utils.ai_service import ai_router, get_ai_response, stream_ai_response
+from app.utils.ai_structured import StructuredOutputError, get_structured_response
+from app.utils.ai_prompts import (
+    clip_text, compact_json, estimate_tokens, log_prompt_size, pack_by_budget, prompt_budget, serialize_cv
+)
+from app.utils.ats_matcher import match_cv_to_job
+from app.utils.cv_scorer import score_cv
+from app.utils.skill_taxonomy import skill_taxonomy
 from app.core.logging import logger
 
 router = APIRouter(prefix="/ai", tags=["AI Features"])
 
+IMPROVE_SYSTEM_PROMPT = """You are an expert CV writer. Improve the provided text to be more professional, impactful, and ATS-friendly.
+Use strong action verbs and quantify achievements where possible.
+Return ONLY the improved text, nothing else. Keep it concise."""
+
+IMPROVE_BATCH_SYSTEM_PROMPT = """You are an expert CV writer. You receive a JSON array of CV sections, each with an "id", a "section" type, the original "content" and optional "context".
+Improve every item independently to be more professional, impactful, and ATS-friendly.
+Use strong action verbs and quantify achievements where possible. Keep each item concise.
+
+Return ONLY valid JSON in this exact format, with one entry per input id:
+{"items": [{"id": 0, "improved": "Improved text here"}]}"""
 
-@router.post("/analyze")
-async def analyze_cv(
-    request: AIAnalysisRequest,
-    user: User = Depends(get_current_user)
-):
-    """Analyze CV and provide score + suggestions."""
-    cv_data = request.cv_data
 
-    system_prompt = """You are an expert CV/Resume analyst and career coach. Analyze the provided CV and return a JSON response with:
+ANALYZE_SYSTEM_PROMPT = """You are an expert CV/Resume analyst and career coach. Analyze the provided CV and return a JSON response with:
 1. An overall score (0-100)
 2. Breakdown scores for: content, formatting, keywords, ats_compatibility
 3. List of strengths (max 5)
@@ -41,54 +59,82 @@ Return ONLY valid JSON in this exact format:
     "recommendations": ["Add more quantifiable achievements"]
 }"""
 
-    cv_text = f"""
-Personal Info: {cv_data.personal_info.full_name}, {cv_data.personal_info.email}
-Summary: {cv_data.summary}
-Experience: {[f"{e.position} at {e.company}: {e.description}" for e in cv_data.experiences]}
-Education: {[f"{e.degree} in {e.field} from {e.institution}" for e in cv_data.education]}
-Skills: {[s.name for s in cv_data.skills]}
-"""
 
+INVALID_AI_RESPONSE = "AI returned an invalid response. Please try again."
+
+
+def analyze_message(cv_data: CVData) -> str:
+    """User message for a CV analysis, with the CV trimmed to the endpoint's token budget."""
+    cv = serialize_cv(cv_data, prompt_budget("analyze"))
+    message = f"Analyze this CV:\n{cv.text}"
+    log_prompt_size("analyze", cv, message)
+    return message
+
+
+def improve_message(request: AIImproveRequest) -> str:
+    """User message for a single section improvement."""
+    user_message = f"Section type: {request.section}\nOriginal content: {request.content}"
+    if request.context:
+        user_message += f"\nAdditional context: {request.context}"
+    return user_message
+
+
+@router.post("/analyze")
+async def analyze_cv(
+    request: AIAnalysisRequest,
+    user: User = Depends(get_current_user)
+):
+    """Analyze CV and provide score + suggestions.
+
+    If the AI analysis fails, the rule-based score from ``cv_scorer`` is
+    returned instead, marked ``"source": "local"``.
+    """
     try:
-        response = await get_ai_response(system_prompt, f"Analyze this CV:\n{cv_text}")
-        response = response.strip()
-        if response.startswith("```json"):
-            response = response[7:]
-        if response.startswith("```"):
-            response = response[3:]
-        if response.endswith("```"):
-            response = response[:-3]
-        result = json.loads(response.strip())
+        result = await get_structured_response(
+            "analyze", ANALYZE_SYSTEM_PROMPT, analyze_message(request.cv_data), CVAnalysis,
+            pro=user.is_pro, user_id=user.user_id
+        )
         logger.info("CV analyzed successfully", extra={"user_id": user.user_id})
-        return result
+        return result.model_dump()
 
-    except json.JSONDecodeError as e:
-        logger.error(f"AI response parsing error: {str(e)}", extra={"user_id": user.user_id})
-        # Return fallback response
-        return {
-            "overall_score": 72,
-            "breakdown": {
-                "content": 75,
-                "formatting": 70,
-                "keywords": 65,
-                "ats_compatibility": 78
-            },
-            "strengths": ["Good structure", "Clear contact information"],
-            "weaknesses": [{
-                "issue": "Limited quantifiable achievements",
-                "suggestion": "Add metrics and numbers to demonstrate impact"
-            }],
-            "missing_keywords": ["leadership", "collaboration", "results-driven"],
-            "recommendations": [
-                "Add more specific achievements with numbers",
-                "Include relevant keywords for your industry"
-            ]
-        }
-    except HTTPException:
-        raise
+    except (StructuredOutputError, HTTPException) as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.warning(f"AI analysis unavailable, returning local score: {detail}", extra={"user_id": user.user_id})
     except Exception as e:
         logger.error(f"AI analysis error: {str(e)}", extra={"user_id": user.user_id, "error_type": type(e).__name__})
-        raise HTTPException(status_code=500, detail="AI analysis temporarily unavailable")
+    return score_cv(request.cv_data).model_dump()
+
+
+@router.post("/analyze/stream")
+async def analyze_cv_stream(
+    request: AIAnalysisRequest,
+    user: User = Depends(get_current_user)
+):
+    """Analyze CV as server-sent events: a local ``prescore`` at once, then ``done``.
+
+    ``done`` carries the AI analysis, or the local score again with
+    ``"fallback": true`` if the AI analysis fails.
+    """
+    async def event_stream():
+        prescore = score_cv(request.cv_data).model_dump()
+        yield f"event: prescore\ndata: {json.dumps(prescore)}\n\n"
+        try:
+            analysis = await get_structured_response(
+                "analyze", ANALYZE_SYSTEM_PROMPT, analyze_message(request.cv_data), CVAnalysis,
+                pro=user.is_pro, user_id=user.user_id
+            )
+            logger.info("CV analyzed successfully", extra={"user_id": user.user_id})
+            result = analysis.model_dump()
+        except Exception as e:
+            logger.error(f"AI analysis stream error: {str(e)}", extra={"user_id": user.user_id, "error_type": type(e).__name__})
+            result = {**prescore, "fallback": True}
+        yield f"event: done\ndata: {json.dumps(result)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("/improve")
@@ -97,16 +143,11 @@ async def improve_section(
     user: User = Depends(get_current_user)
 ):
     """Improve a specific section of the CV."""
-    system_prompt = """You are an expert CV writer. Improve the provided text to be more professional, impactful, and ATS-friendly.
-Use strong action verbs and quantify achievements where possible.
-Return ONLY the improved text, nothing else. Keep it concise."""
-
-    user_message = f"Section type: {request.section}\nOriginal content: {request.content}"
-    if request.context:
-        user_message += f"\nAdditional context: {request.context}"
-
     try:
-        improved = await get_ai_response(system_prompt, user_message)
+        improved = await get_ai_response(
+            IMPROVE_SYSTEM_PROMPT, improve_message(request), endpoint="improve",
+            pro=user.is_pro, user_id=user.user_id
+        )
         logger.info("CV section improved", extra={"user_id": user.user_id, "section": request.section})
         return {"improved": improved.strip()}
 
@@ -118,23 +159,115 @@ Return ONLY the improved text, nothing else. Keep it concise."""
         return {"improved": request.content}
 
 
+@router.post("/improve/stream")
+async def improve_section_stream(
+    request: AIImproveRequest,
+    user: User = Depends(get_current_user)
+):
+    """Improve a section, streaming text as server-sent ``token`` events.
+
+    The stream always ends with a ``done`` event carrying the final text; if the
+    AI call fails, that is the original content with ``"fallback": true``.
+    Like ``/improve``, it fails with 503 before streaming when no provider is available.
+    """
+    ai_router.check("improve")
+
+    async def event_stream():
+        parts = []
+        try:
+            async for text in stream_ai_response(
+                IMPROVE_SYSTEM_PROMPT, improve_message(request), endpoint="improve",
+                pro=user.is_pro, user_id=user.user_id
+            ):
+                parts.append(text)
+                yield f"event: token\ndata: {json.dumps({'text': text})}\n\n"
+        except Exception as e:
+            logger.error(f"AI improve stream error: {str(e)}", extra={"user_id": user.user_id, "error_type": type(e).__name__})
+            parts = []
+
+        improved = "".join(parts).strip()
+        if improved:
+            logger.info("CV section improved", extra={"user_id": user.user_id, "section": request.section})
+            result = {"improved": improved}
+        else:
+            result = {"improved": request.content, "fallback": True}
+        yield f"event: done\ndata: {json.dumps(result)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _improve_group(group: List[dict], user: User) -> dict:
+    """Improve one packed group of items in a single call, returning id -> text."""
+    try:
+        answer = await get_structured_response(
+            "improve-batch", IMPROVE_BATCH_SYSTEM_PROMPT, compact_json(group), ImprovedItems, cache=False,
+            pro=user.is_pro, user_id=user.user_id
+        )
+        ids = {entry["id"] for entry in group}
+        return {item.id: item.improved.strip() for item in answer.items if item.id in ids and item.improved.strip()}
+    except Exception as e:
+        logger.error(f"AI improve batch group error: {str(e)}", extra={"items": len(group), "error_type": type(e).__name__})
+        return {}
+
+
+@router.post("/improve-batch")
+async def improve_sections_batch(
+    request: AIImproveBatchRequest,
+    user: User = Depends(get_current_user)
+):
+    """Improve many sections at once.
+
+    Items are packed into as few upstream calls as the token budget allows,
+    and groups run in parallel. Results keep the request order; an item the
+    AI did not return comes back unchanged with ``"fallback": true``.
+    """
+    payload = [
+        {"id": i, "section": item.section, "content": item.content, **({"context": item.context} if item.context else {})}
+        for i, item in enumerate(request.items)
+    ]
+    groups = pack_by_budget(
+        payload,
+        [estimate_tokens(compact_json(entry)) for entry in payload],
+        settings.ai_batch_token_budget
+    )
+
+    improved = {}
+    for group_result in await asyncio.gather(*(_improve_group(group, user) for group in groups)):
+        improved.update(group_result)
+
+    results = [
+        {"improved": improved[i]} if i in improved else {"improved": item.content, "fallback": True}
+        for i, item in enumerate(request.items)
+    ]
+    logger.info(
+        f"CV sections improved in batch: {len(improved)}/{len(results)} in {len(groups)} calls",
+        extra={"user_id": user.user_id}
+    )
+    return {"results": results}
+
+
 @router.post("/optimize-for-job")
 async def optimize_for_job(
     request: JobOptimizeRequest,
     user: User = Depends(get_current_user)
 ):
-    """Optimize CV for a specific job description."""
-    system_prompt = """You are an expert ATS specialist and CV optimizer. Analyze the CV against the job description and provide:
-1. Match percentage
-2. Matched keywords found in both
-3. Missing keywords that should be added
-4. Specific suggestions to tailor the CV
+    """Optimize CV for a specific job description.
+
+    The match percentage and keyword lists come from the local ATS matcher;
+    the AI only writes the suggestions and the tailored summary. If it
+    fails, the keyword match is still returned.
+    """
+    match = match_cv_to_job(request.cv_data, request.job_description)
+
+    system_prompt = """You are an expert ATS specialist and CV optimizer. You receive a CV, a job description and the job keywords the CV is missing.
+Provide specific suggestions to tailor the CV to the job, working the missing keywords in where the candidate's experience supports them, and an improved summary.
 
 Return ONLY valid JSON in this format:
 {
-    "match_percentage": 65,
-    "matched_keywords": ["python", "leadership"],
-    "missing_keywords": ["agile", "scrum"],
     "suggestions": [
         {"section": "summary", "suggestion": "Add mention of agile methodology experience"},
         {"section": "skills", "suggestion": "Add 'Scrum' and 'Kanban' to skills"}
@@ -142,51 +275,45 @@ Return ONLY valid JSON in this format:
     "optimized_summary": "Improved summary text here..."
 }"""
 
-    cv_text = f"""
-Summary: {request.cv_data.summary}
-Experience: {[f"{e.position} at {e.company}: {e.description}" for e in request.cv_data.experiences]}
-Skills: {[s.name for s in request.cv_data.skills]}
-"""
-
-    user_message = f"CV Content:\n{cv_text}\n\nJob Description:\n{request.job_description}"
+    cv = serialize_cv(request.cv_data, prompt_budget("optimize-for-job"), contact=False)
+    user_message = (
+        f"CV Content:\n{cv.text}\n\n"
+        f"Job Description:\n{clip_text(request.job_description.strip(), settings.ai_job_description_tokens)}\n\n"
+        f"Missing keywords: {', '.join(match.missing_keywords) or 'none'}"
+    )
+    log_prompt_size("optimize-for-job", cv, user_message)
 
     try:
-        response = await get_ai_response(system_prompt, user_message)
-        response = response.strip()
-        if response.startswith("```json"):
-            response = response[7:]
-        if response.startswith("```"):
-            response = response[3:]
-        if response.endswith("```"):
-            response = response[:-3]
-        result = json.loads(response.strip())
-        logger.info("CV optimized for job", extra={"user_id": user.user_id})
-        return result
-
-    except json.JSONDecodeError as e:
-        logger.error(f"AI response parsing error: {str(e)}", extra={"user_id": user.user_id})
-        return {
-            "match_percentage": 60,
-            "matched_keywords": ["communication", "teamwork"],
-            "missing_keywords": ["specific skill 1", "specific skill 2"],
-            "suggestions": [{
-                "section": "skills",
-                "suggestion": "Review the job description and add relevant skills"
-            }],
-            "optimized_summary": request.cv_data.summary
-        }
-    except HTTPException:
-        raise
+        tailoring = await get_structured_response(
+            "optimize-for-job", system_prompt, user_message, JobTailoring,
+            pro=user.is_pro, user_id=user.user_id
+        )
+    except (StructuredOutputError, HTTPException) as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.warning(f"AI tailoring unavailable, returning keyword match only: {detail}", extra={"user_id": user.user_id})
+        tailoring = JobTailoring()
     except Exception as e:
         logger.error(f"AI optimize error: {str(e)}", extra={"user_id": user.user_id, "error_type": type(e).__name__})
-        raise HTTPException(status_code=500, detail="AI optimization temporarily unavailable")
+        tailoring = JobTailoring()
+
+    logger.info("CV optimized for job", extra={"user_id": user.user_id, "match_percentage": match.match_percentage})
+    return JobOptimization(**match._asdict(), **tailoring.model_dump()).model_dump()
 
 
 @router.post("/suggest-skills")
 async def suggest_skills(request: dict, user: User = Depends(get_current_user)):
-    """Suggest skills based on job title."""
+    """Suggest skills based on job title.
+
+    Known titles are answered from the offline skill taxonomy; only unknown
+    ones reach the AI, whose answer is then learned by the taxonomy.
+    """
     job_title = request.get("job_title", "")
 
+    match = skill_taxonomy.lookup(job_title)
+    if match:
+        logger.info("Skills suggested from taxonomy", extra={"user_id": user.user_id, "job_title": job_title, "matched_title": match.title})
+        return match.skills.model_dump()
+
     system_prompt = """You are a career expert. Based on the job title, suggest relevant technical and soft skills.
 Return ONLY valid JSON in this format:
 {
@@ -195,24 +322,22 @@ Return ONLY valid JSON in this format:
 }"""
 
     try:
-        response = await get_ai_response(system_prompt, f"Suggest skills for: {job_title}")
-        response = response.strip()
-        if response.startswith("```json"):
-            response = response[7:]
-        if response.startswith("```"):
-            response = response[3:]
-        if response.endswith("```"):
-            response = response[:-3]
-        result = json.loads(response.strip())
-        logger.info("Skills suggested", extra={"user_id": user.user_id, "job_title": job_title})
-        return result
+        learned = await skill_taxonomy.find_learned(job_title)
+        if learned:
+            logger.info("Skills suggested from taxonomy", extra={"user_id": user.user_id, "job_title": job_title})
+            return learned.model_dump()
 
-    except json.JSONDecodeError as e:
+        result = await get_structured_response(
+            "suggest-skills", system_prompt, f"Suggest skills for: {job_title}", SkillSuggestions,
+            pro=user.is_pro, user_id=user.user_id
+        )
+        if result.technical_skills or result.soft_skills:
+            await skill_taxonomy.learn(job_title, result)
+        logger.info("Skills suggested", extra={"user_id": user.user_id, "job_title": job_title})
+        return result.model_dump()
+    except StructuredOutputError as e:
         logger.error(f"AI response parsing error: {str(e)}", extra={"user_id": user.user_id})
-        return {
-            "technical_skills": ["Microsoft Office", "Data Analysis", "Project Management"],
-            "soft_skills": ["Communication", "Teamwork", "Problem-solving"]
-        }
+        raise HTTPException(status_code=502, detail=INVALID_AI_RESPONSE)
     except HTTPException:
         raise
     except Exception as e:
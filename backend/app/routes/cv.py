@@ -1,12 +1,16 @@
 """CV management routes."""
 from datetime import datetime, timezone
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from app.models.cv import CV, CVCreate, CVUpdate
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import Response
+from typing import List, Optional
+from app.models.cv import CV, CVCreate, CVData, CVUpdate
 from app.models.user import User
 from app.core.database import db
 from app.core.security import get_current_user
 from app.core.logging import logger
+from app.utils.pdf_cache import pdf_cache, etag_matches
+from app.utils.skill_extractor import extract_skills, get_skill_automaton, summarize_skills
+from app.utils.thumbnails import thumbnail_store
 
 router = APIRouter(prefix="/cvs", tags=["CV Management"])
 
@@ -16,7 +20,9 @@ async def get_cvs(user: User = Depends(get_current_user)):
     """Get all CVs for current user."""
     try:
         cvs = await db.cvs.find({"user_id": user.user_id}, {"_id": 0}).to_list(100)
+        thumbnail_keys = await thumbnail_store.keys_for_user(user.user_id)
         for cv in cvs:
+            cv["thumbnail_key"] = thumbnail_keys.get(cv["cv_id"])
             if isinstance(cv.get("created_at"), str):
                 cv["created_at"] = datetime.fromisoformat(cv["created_at"])
             if isinstance(cv.get("updated_at"), str):
@@ -91,6 +97,8 @@ async def update_cv(
 
         await db.cvs.update_one({"cv_id": cv_id}, {"$set": update_data})
         result = await db.cvs.find_one({"cv_id": cv_id}, {"_id": 0})
+        # Autosave calls this every few seconds; the refresh waits until the CV is idle
+        thumbnail_store.schedule(cv_id, user)
         logger.info(f"CV updated: {cv_id}", extra={"user_id": user.user_id})
         return result
 
@@ -109,6 +117,8 @@ async def delete_cv(cv_id: str, user: User = Depends(get_current_user)):
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="CV not found")
 
+        await pdf_cache.evict_cv(cv_id)
+        await thumbnail_store.delete(cv_id)
         logger.info(f"CV deleted: {cv_id}", extra={"user_id": user.user_id})
         return {"message": "CV deleted"}
 
@@ -117,3 +127,77 @@ async def delete_cv(cv_id: str, user: User = Depends(get_current_user)):
     except Exception as e:
         logger.error(f"Delete CV error: {str(e)}", extra={"cv_id": cv_id, "user_id": user.user_id})
         raise HTTPException(status_code=500, detail="Failed to delete CV")
+
+
+def thumbnail_response(png: bytes, key: str, immutable: bool) -> Response:
+    """PNG response; versioned URLs (``?v=<key>``) may be cached indefinitely."""
+    return Response(
+        content=png,
+        media_type="image/png",
+        headers={
+            "ETag": f'"{key}"',
+            "Cache-Control": "private, max-age=31536000, immutable" if immutable else "private, no-cache"
+        }
+    )
+
+
+@router.get("/{cv_id}/thumbnail")
+async def get_cv_thumbnail(
+    cv_id: str,
+    request: Request,
+    v: Optional[str] = None,
+    user: User = Depends(get_current_user)
+):
+    """PNG thumbnail of the CV's first page.
+
+    Pass the ``thumbnail_key`` from the CV list as ``v`` to get a stored,
+    immutable image without loading the CV; otherwise the thumbnail is
+    checked against the current content and, if missing, taken from the
+    cached PDF or drawn as a schematic. A PDF is never rendered here.
+    """
+    try:
+        if v:
+            stored = await thumbnail_store.get_stored(cv_id, user.user_id)
+            if stored and stored["key"] == v:
+                return thumbnail_response(stored["png"], v, immutable=True)
+
+        cv_data = await db.cvs.find_one({"cv_id": cv_id, "user_id": user.user_id}, {"_id": 0})
+        if not cv_data:
+            raise HTTPException(status_code=404, detail="CV not found")
+
+        key, png = await thumbnail_store.get_or_create(CV(**cv_data), user)
+        if etag_matches(request.headers.get("if-none-match"), f'"{key}"'):
+            return Response(status_code=304, headers={"ETag": f'"{key}"', "Cache-Control": "private, no-cache"})
+        return thumbnail_response(png, key, immutable=False)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Thumbnail error: {str(e)}", extra={"cv_id": cv_id, "user_id": user.user_id})
+        raise HTTPException(status_code=500, detail="Failed to generate thumbnail")
+
+
+@router.post("/{cv_id}/extract-skills")
+async def extract_cv_skills(cv_id: str, user: User = Depends(get_current_user)):
+    """Skills mentioned in experience and project descriptions.
+
+    Each skill lists where it occurs (section, item id and character offsets
+    into that item's description); ``new_skills`` are the ones missing from
+    the CV's skills list.
+    """
+    try:
+        cv_data = await db.cvs.find_one({"cv_id": cv_id, "user_id": user.user_id}, {"_id": 0, "data": 1})
+        if not cv_data:
+            raise HTTPException(status_code=404, detail="CV not found")
+
+        data = CVData(**cv_data.get("data", {}))
+        automaton = get_skill_automaton()
+        result = summarize_skills(data, extract_skills(data, automaton), automaton)
+        logger.info(f"Skills extracted: {cv_id}", extra={"user_id": user.user_id, "skills": len(result["skills"])})
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Extract skills error: {str(e)}", extra={"cv_id": cv_id, "user_id": user.user_id})
+        raise HTTPException(status_code=500, detail="Failed to extract skills")
@@ -0,0 +1,37 @@
+"""Bulk CV export routes."""
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from app.models.user import User
+from app.core.config import settings
+from app.core.database import db
+from app.core.security import get_current_user
+from app.utils.pdf_export import stream_cv_zip
+
+# Registered before the CV router so /cvs/export.zip is not taken for a cv_id
+router = APIRouter(prefix="/cvs", tags=["CV Export"])
+
+
+@router.get("/export.zip")
+async def export_cvs_zip(user: User = Depends(get_current_user)):
+    """Download all of the user's CVs as a ZIP of PDFs, streamed as each PDF is ready.
+
+    The first PDF is rendered before the response starts, so a saturated
+    PDF service is reported as 503 rather than as a broken download.
+    """
+    cursor = db.cvs.find({"user_id": user.user_id}, {"_id": 0}).sort("updated_at", -1)
+    chunks = stream_cv_zip(cursor, user, concurrency=settings.pdf_export_concurrency)
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+
+    async def body():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=cvs.zip"}
+    )
@@ -1,46 +1,164 @@
-"""PDF generation route."""
-from io import BytesIO
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
+"""PDF generation routes."""
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from app.models.user import User
 from app.models.cv import CV
 from app.core.database import db
 from app.core.security import get_current_user
-from app.utils.pdf_generator import generate_cv_pdf
+from app.utils.pdf_cache import pdf_cache, pdf_cache_key, etag_matches, get_or_render_pdf
+from app.utils.pdf_jobs import pdf_jobs, JOB_DONE, TERMINAL_STATES
+from app.utils.thumbnails import thumbnail_store
 from app.core.logging import logger
 
 router = APIRouter(tags=["PDF Generation"])
 
+# How long an events stream may stay open before the client has to reconnect
+JOB_EVENTS_MAX_SECONDS = 300
+JOB_EVENTS_POLL_SECONDS = 1.0
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+
+
+async def get_owned_cv(cv_id: str, user: User) -> CV:
+    """Load a CV owned by ``user`` or raise 404."""
+    cv_data = await db.cvs.find_one(
+        {"cv_id": cv_id, "user_id": user.user_id},
+        {"_id": 0}
+    )
+    if not cv_data:
+        raise HTTPException(status_code=404, detail="CV not found")
+    return CV(**cv_data)
+
+
+def pdf_response(pdf_bytes: bytes, title: str, etag: str) -> Response:
+    """Attachment response for a complete PDF with cache validators."""
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={title}.pdf",
+            "ETag": etag,
+            "Cache-Control": "private, no-cache"
+        }
+    )
+
 
 @router.post("/generate-pdf/{cv_id}")
-async def generate_pdf(cv_id: str, user: User = Depends(get_current_user)):
-    """Generate PDF from CV with XSS protection."""
+async def generate_pdf(
+    cv_id: str,
+    run_async: bool = Query(False, alias="async"),
+    user: User = Depends(get_current_user)
+):
+    """Generate PDF from CV with XSS protection, served from cache when unchanged.
+
+    With ``?async=1`` the render is queued and a job id is returned immediately.
+    """
     try:
-        cv_data = await db.cvs.find_one(
-            {"cv_id": cv_id, "user_id": user.user_id},
-            {"_id": 0}
-        )
-        if not cv_data:
-            raise HTTPException(status_code=404, detail="CV not found")
+        cv = await get_owned_cv(cv_id, user)
 
-        # Convert to CV model
-        cv = CV(**cv_data)
+        if run_async:
+            job = await pdf_jobs.submit(cv, user)
+            logger.info(f"PDF job queued: {job['job_id']}", extra={"user_id": user.user_id})
+            return JSONResponse(
+                status_code=202,
+                content=job,
+                headers={"Location": f"/api/pdf-jobs/{job['job_id']}"}
+            )
 
-        # Generate PDF with sanitization
-        pdf_bytes = generate_cv_pdf(cv, user)
+        # POST responses are never revalidated; GET /generate-pdf/{cv_id} answers conditional requests
+        cache_key = pdf_cache_key(cv, user)
+        pdf_bytes = await get_or_render_pdf(cv, user, cache_key)
+        # The PDF is cached now, so a schematic thumbnail can become the real page
+        thumbnail_store.schedule(cv_id, user)
+        return pdf_response(pdf_bytes, cv.title, f'"{cache_key}"')
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"PDF generation error: {str(e)}", extra={"cv_id": cv_id, "user_id": user.user_id, "error_type": type(e).__name__})
+        raise HTTPException(status_code=500, detail="Failed to generate PDF")
+
+
+@router.get("/generate-pdf/{cv_id}")
+async def download_pdf(
+    cv_id: str,
+    request: Request,
+    user: User = Depends(get_current_user)
+):
+    """Cacheable PDF download; answers 304 when If-None-Match has the current version's ETag."""
+    try:
+        cv = await get_owned_cv(cv_id, user)
+        cache_key = pdf_cache_key(cv, user)
+        etag = f'"{cache_key}"'
 
-        logger.info(f"PDF generated: {cv_id}", extra={"user_id": user.user_id})
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
 
-        return StreamingResponse(
-            BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={cv.title}.pdf"
-            }
-        )
+        pdf_bytes = await get_or_render_pdf(cv, user, cache_key)
+        thumbnail_store.schedule(cv_id, user)
+        return pdf_response(pdf_bytes, cv.title, etag)
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"PDF generation error: {str(e)}", extra={"cv_id": cv_id, "user_id": user.user_id, "error_type": type(e).__name__})
+        logger.error(f"PDF download error: {str(e)}", extra={"cv_id": cv_id, "user_id": user.user_id, "error_type": type(e).__name__})
         raise HTTPException(status_code=500, detail="Failed to generate PDF")
+
+
+@router.get("/pdf-jobs/{job_id}")
+async def get_pdf_job(job_id: str, user: User = Depends(get_current_user)):
+    """Return the finished PDF for a job, or its status while it is pending."""
+    try:
+        job = await pdf_jobs.get_job(job_id, user.user_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="PDF job not found")
+
+        if job["status"] != JOB_DONE:
+            return JSONResponse(status_code=200 if job["status"] in TERMINAL_STATES else 202, content=job)
+
+        pdf_bytes = await pdf_cache.get(job["cache_key"])
+        if pdf_bytes is None:
+            raise HTTPException(status_code=410, detail="PDF expired. Please generate it again.")
+
+        cv = await get_owned_cv(job["cv_id"], user)
+        return pdf_response(pdf_bytes, cv.title, f'"{job["cache_key"]}"')
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get PDF job error: {str(e)}", extra={"job_id": job_id, "user_id": user.user_id, "error_type": type(e).__name__})
+        raise HTTPException(status_code=500, detail="Failed to retrieve PDF job")
+
+
+@router.get("/pdf-jobs/{job_id}/events")
+async def pdf_job_events(job_id: str, user: User = Depends(get_current_user)):
+    """Server-sent events stream of job status changes, closed once the job finishes."""
+    job = await pdf_jobs.get_job(job_id, user.user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="PDF job not found")
+
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + JOB_EVENTS_MAX_SECONDS
+        current = job
+        last_status = None
+        last_sent = loop.time()
+        while True:
+            if current["status"] != last_status:
+                last_status = current["status"]
+                last_sent = loop.time()
+                yield f"event: status\ndata: {json.dumps(current)}\n\n"
+            elif loop.time() - last_sent >= JOB_EVENTS_KEEPALIVE_SECONDS:
+                last_sent = loop.time()
+                yield ": keep-alive\n\n"
+            if last_status in TERMINAL_STATES or loop.time() >= deadline:
+                return
+            await pdf_jobs.wait_for_change(job_id, JOB_EVENTS_POLL_SECONDS)
+            current = await pdf_jobs.get_job(job_id, user.user_id) or current
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,74 @@
+"""AI usage and service statistics routes.
+
+Kept outside ``/api/ai`` so reading reports does not count against the AI
+rate limit.
+"""
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from app.core.config import settings
+from app.models.user import User
+from app.core.security import get_current_user
+from app.utils.ai_cache import ai_cache
+from app.utils.ai_service import ai_resilience_stats, ai_scheduler, ai_singleflight
+from app.utils.ai_usage import ai_usage, usage_rollup
+from app.core.logging import logger
+
+router = APIRouter(prefix="/usage", tags=["Usage"])
+
+
+def is_admin(user: User) -> bool:
+    return user.email.lower() in settings.admin_emails
+
+
+@router.get("/ai")
+async def get_ai_usage(
+    period: str = Query("hour", pattern="^(hour|day)$"),
+    days: int = Query(7, ge=1, le=90),
+    user_id: Optional[str] = None,
+    user: User = Depends(get_current_user)
+):
+    """AI calls, cache hits, errors, tokens, cost and latency per endpoint and per user.
+
+    Rolled up by ``period`` (hour or day) over the last ``days``, newest
+    bucket first. Admins (``ADMIN_EMAILS``) see every user and may filter
+    by ``user_id``; other users only see their own usage.
+    """
+    try:
+        if not is_admin(user):
+            if user_id not in (None, user.user_id):
+                raise HTTPException(status_code=403, detail="Not allowed to view other users' usage")
+            user_id = user.user_id
+
+        # Include this worker's events that are still waiting for the next batch
+        await ai_usage.flush()
+        until = datetime.now(timezone.utc)
+        since = until - timedelta(days=days)
+        return {
+            "period": period,
+            "from": since.isoformat(),
+            "to": until.isoformat(),
+            "user_id": user_id,
+            "by_endpoint": await usage_rollup("endpoint", period, since, until, user_id),
+            "by_user": await usage_rollup("user", period, since, until, user_id),
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"AI usage report error: {str(e)}", extra={"user_id": user.user_id})
+        raise HTTPException(status_code=500, detail="Failed to load AI usage")
+
+
+@router.get("/service")
+async def get_service_stats(user: User = Depends(get_current_user)):
+    """This worker's AI cache, request sharing, scheduler, provider and metering statistics (admins only)."""
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Admins only")
+    return {
+        "ai_cache": ai_cache.stats(),
+        "ai_singleflight": ai_singleflight.stats(),
+        "ai_scheduler": ai_scheduler.stats(),
+        "ai_resilience": ai_resilience_stats(),
+        "ai_usage": ai_usage.stats()
+    }
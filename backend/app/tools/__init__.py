@@ -0,0 +1 @@
+# Management and benchmark tools
@@ -0,0 +1,83 @@
+"""Create missing or outdated dashboard thumbnails offline.
+
+The thumbnail route and the post-save refresh never render a PDF, so a CV
+whose PDF was never cached only gets a schematic preview. This tool walks
+``db.cvs`` and stores a thumbnail for every CV whose current version has
+none (or only a schematic), taking page 1 from the cached PDF. With
+``--render`` a missing PDF is rendered in this process's own worker pool
+and stored in the PDF cache, so the web workers' pool is never used.
+
+Usage:
+    python -m app.tools.backfill_thumbnails
+    python -m app.tools.backfill_thumbnails --render --user user_123 --limit 50
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from app.core.database import db
+from app.models.cv import CV
+from app.models.user import User
+from app.utils.pdf_cache import get_or_render_pdf, pdf_cache_key
+from app.utils.pdf_executor import shutdown_pdf_executor
+from app.utils.thumbnails import SOURCE_SCHEMATIC, thumbnail_key, thumbnail_store
+
+
+async def backfill(args: argparse.Namespace):
+    stats: Counter = Counter()
+    users = {}
+    start = time.perf_counter()
+
+    query = {"user_id": args.user} if args.user else {}
+    cursor = db.cvs.find(query, {"_id": 0}).sort("cv_id", 1)
+    if args.limit:
+        cursor = cursor.limit(args.limit)
+
+    async for cv_doc in cursor:
+        stats["seen"] += 1
+        user_id = cv_doc["user_id"]
+        if user_id not in users:
+            users[user_id] = await db.users.find_one({"user_id": user_id}, {"_id": 0})
+        if users[user_id] is None:
+            stats["skipped_orphaned"] += 1
+            continue
+
+        cv, user = CV(**cv_doc), User(**users[user_id])
+        key = thumbnail_key(pdf_cache_key(cv, user), thumbnail_store.width)
+        stored = await db.cv_thumbnails.find_one({"cv_id": cv.cv_id}, {"_id": 0, "key": 1, "source": 1})
+        if stored and stored["key"] == key and stored.get("source") != SOURCE_SCHEMATIC:
+            stats["skipped_current"] += 1
+            continue
+
+        try:
+            pdf_bytes = await get_or_render_pdf(cv, user) if args.render else None
+            await thumbnail_store.get_or_create(cv, user, pdf_bytes=pdf_bytes)
+            stats["created"] += 1
+        except Exception as e:
+            stats["failed"] += 1
+            print(f"FAILED {cv.cv_id}: {type(e).__name__}: {e}")
+
+    print("\nThumbnail backfill summary")
+    print(f"  CVs seen:            {stats['seen']}")
+    print(f"  Created/updated:     {stats['created']}")
+    print(f"  Failed:              {stats['failed']}")
+    print(f"  Skipped (current):   {stats['skipped_current']}")
+    print(f"  Skipped (no owner):  {stats['skipped_orphaned']}")
+    print(f"  Wall time:           {time.perf_counter() - start:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--render", action="store_true", help="Render PDFs missing from the cache")
+    parser.add_argument("--user", help="Only backfill CVs of this user_id")
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(backfill(args))
+    finally:
+        shutdown_pdf_executor()
+
+
+if __name__ == "__main__":
+    main()
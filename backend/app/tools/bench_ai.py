@@ -0,0 +1,105 @@
+"""Resilience drill for the AI call path against the fake provider.
+
+Sends waves of concurrent ``get_ai_response`` calls through the scheduler,
+router, circuit breaker and hedging while ``FakeAIClient`` injects latency
+and errors, in phases: healthy, a slow tail, a full outage and recovery.
+Each phase reports status counts, latency percentiles and the primary
+provider's breaker state, so a config change (AI_BREAKER_*, AI_HEDGE,
+AI_TIMEOUT) can be checked without a Gemini key. ``--failover`` adds a
+second, healthy fake provider that the router falls back to.
+
+Usage: python -m app.tools.bench_ai [--calls 200] [--concurrency 4] [--hedge] [--failover]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+from collections import Counter
+
+
+def _configure(args):
+    # Settings are read at import time, so the environment is set first
+    os.environ["AI_PROVIDERS"] = "fake"
+    os.environ["AI_FAKE_LATENCY"] = str(args.latency)
+    os.environ["AI_TIMEOUT"] = str(args.timeout)
+    os.environ["AI_BREAKER_OPEN_SECONDS"] = str(args.open_seconds)
+    os.environ["AI_HEDGE"] = "true" if args.hedge else "false"
+
+
+async def _wave(ai_service, phase: str, calls: int, concurrency: int):
+    gate = asyncio.Semaphore(concurrency)
+    statuses: Counter = Counter()
+    latencies = []
+
+    async def one(i: int):
+        async with gate:
+            start = time.perf_counter()
+            try:
+                await ai_service.get_ai_response("drill", f"{phase} {i}", endpoint="drill")
+                statuses[200] += 1
+            except ai_service.HTTPException as e:
+                statuses[e.status_code] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    codes = " ".join(f"{code}:{count}" for code, count in sorted(statuses.items()))
+    primary = ai_service.ai_router.providers["fake"]
+    breaker = primary.breaker.stats()
+    fallbacks = sum(provider.fallbacks for provider in ai_service.ai_router.providers.values())
+    print(f"{phase:<10}{codes:<28}{statistics.median(latencies):>9.0f}{p95:>9.0f}"
+          f"  {breaker['state']:<10}{breaker['times_opened']:>7}{ai_service.ai_hedging.hedged:>8}{fallbacks:>10}")
+
+
+async def drill(args):
+    from app.core.logging import logger
+    from app.utils import ai_router, ai_service
+    from app.utils.ai_fake import FakeAIClient
+
+    logger.setLevel(logging.ERROR + 1)  # One log line per call drowns the table
+    fake = ai_service.ai_router.providers["fake"].client
+    if args.failover:
+        backup = FakeAIClient(timeout=args.timeout, latency=args.latency * 2, seed=1)
+        ai_service.ai_router.add(ai_router.Provider("fake-backup", backup, ai_service.new_breaker()))
+    print(f"{'phase':<10}{'status':<28}{'p50 ms':>9}{'p95 ms':>9}  {'breaker':<10}{'opened':>7}{'hedged':>8}{'fallbacks':>10}")
+
+    fake.jitter, fake.error_rate = args.latency * 0.2, 0.0
+    await _wave(ai_service, "healthy", args.calls, args.concurrency)
+
+    # One call in 25 stalls (above p95); a hedged retry usually lands on a fast one
+    fake.tail_rate, fake.tail_latency = 0.04, args.latency * 10
+    await _wave(ai_service, "slow-tail", args.calls, args.concurrency)
+
+    fake.tail_rate, fake.error_rate = 0.0, 1.0
+    await _wave(ai_service, "outage", args.calls, args.concurrency)
+
+    fake.error_rate = 0.0
+    await _wave(ai_service, "cooldown", args.calls // 4, args.concurrency)
+    await asyncio.sleep(args.open_seconds)
+    # One probe is admitted while half-open; the rest of that wave is rejected
+    await _wave(ai_service, "half-open", args.concurrency, args.concurrency)
+    await _wave(ai_service, "recovery", args.calls, args.concurrency)
+    print("upstream calls: " + ", ".join(
+        f"{name} {provider.client.calls}" for name, provider in ai_service.ai_router.providers.items()
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="base fake latency in seconds")
+    parser.add_argument("--timeout", type=float, default=1.0)
+    parser.add_argument("--open-seconds", type=float, default=2.0)
+    parser.add_argument("--hedge", action="store_true")
+    parser.add_argument("--failover", action="store_true", help="add a healthy backup provider")
+    args = parser.parse_args()
+    _configure(args)
+    asyncio.run(drill(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Benchmark CV HTML building: legacy string concatenation vs precompiled templates.
+
+The template engine is measured cold (fragment cache cleared before every
+build), after a single-experience edit (one fragment miss per build, the
+autosave case) and fully warm (unchanged CV).
+
+Usage: python -m app.tools.bench_html [--repeat 200]
+"""
+import argparse
+import statistics
+import time
+from app.core.security import sanitize_html
+from app.models.cv import CV
+from app.models.user import User
+from app.tools.synthetic import make_cv, make_user
+from app.utils.template_engine import fragment_cache, render_cv_html
+
+
+def legacy_build_html(cv: CV, user: User) -> str:
+    """The pre-template builder from pdf_generator, kept verbatim as the baseline."""
+    data = cv.data
+    settings = cv.settings
+    personal = data.personal_info
+
+    # Sanitize all user inputs to prevent XSS
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+            body {{
+                font-family: Arial, Helvetica, sans-serif;
+                font-size: 11pt;
+                line-height: 1.5;
+                color: #1e293b;
+                padding: 40px;
+            }}
+            .header {{
+                text-align: center;
+                margin-bottom: 24px;
+                border-bottom: 2px solid {sanitize_html(settings.primary_color)};
+                padding-bottom: 16px;
+            }}
+            .name {{
+                font-size: 24pt;
+                font-weight: 700;
+                color: {sanitize_html(settings.primary_color)};
+                margin-bottom: 8px;
+            }}
+            .contact {{ font-size: 10pt; color: #64748b; }}
+            .contact span {{ margin: 0 8px; }}
+            .section {{ margin-bottom: 20px; page-break-inside: avoid; }}
+            .section-title {{
+                font-size: 14pt;
+                font-weight: 600;
+                color: {sanitize_html(settings.primary_color)};
+                border-bottom: 1px solid #e2e8f0;
+                padding-bottom: 4px;
+                margin-bottom: 12px;
+            }}
+            .summary {{ color: #475569; }}
+            .exp-item, .edu-item {{ margin-bottom: 16px; page-break-inside: avoid; }}
+            .exp-title {{ font-weight: 600; }}
+            .exp-company {{ color: #64748b; }}
+            .exp-date {{ color: #94a3b8; font-size: 10pt; }}
+            .exp-desc {{ color: #475569; font-size: 10pt; white-space: pre-wrap; }}
+            .skills-list {{ margin-top: 8px; }}
+            .skill-tag {{
+                background: #f1f5f9;
+                padding: 4px 12px;
+                border-radius: 16px;
+                font-size: 10pt;
+                display: inline-block;
+                margin: 4px;
+            }}
+            .watermark {{
+                position: fixed;
+                bottom: 20px;
+                right: 20px;
+                opacity: 0.3;
+                font-size: 10pt;
+                color: #94a3b8;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <div class="name">{sanitize_html(personal.full_name or 'Your Name')}</div>
+            <div class="contact">
+                <span>{sanitize_html(personal.email)}</span>
+                <span>{sanitize_html(personal.phone)}</span>
+                <span>{sanitize_html(personal.location)}</span>
+            </div>
+        </div>
+    """
+
+    # Summary section
+    if data.summary:
+        html_content += f"""
+        <div class="section">
+            <div class="section-title">Professional Summary</div>
+            <div class="summary">{sanitize_html(data.summary)}</div>
+        </div>
+        """
+
+    # Experience section
+    if data.experiences:
+        html_content += '<div class="section"><div class="section-title">Work Experience</div>'
+        for exp in data.experiences:
+            end_date = "Present" if exp.current else sanitize_html(exp.end_date)
+            html_content += f"""
+            <div class="exp-item">
+                <div>
+                    <span class="exp-title">{sanitize_html(exp.position)}</span>
+                    <span class="exp-company"> at {sanitize_html(exp.company)}</span>
+                </div>
+                <div class="exp-date">{sanitize_html(exp.start_date)} - {end_date}</div>
+                <div class="exp-desc">{sanitize_html(exp.description)}</div>
+            </div>
+            """
+        html_content += '</div>'
+
+    # Education section
+    if data.education:
+        html_content += '<div class="section"><div class="section-title">Education</div>'
+        for edu in data.education:
+            html_content += f"""
+            <div class="edu-item">
+                <div>
+                    <span class="exp-title">{sanitize_html(edu.degree)} in {sanitize_html(edu.field)}</span>
+                    <span class="exp-company"> - {sanitize_html(edu.institution)}</span>
+                </div>
+                <div class="exp-date">{sanitize_html(edu.start_date)} - {sanitize_html(edu.end_date)}</div>
+            </div>
+            """
+        html_content += '</div>'
+
+    # Skills section
+    if data.skills:
+        html_content += '<div class="section"><div class="section-title">Skills</div><div class="skills-list">'
+        for skill in data.skills:
+            html_content += f'<span class="skill-tag">{sanitize_html(skill.name)}</span>'
+        html_content += '</div></div>'
+
+    # Add watermark for non-pro users
+    if not user.is_pro:
+        html_content += '<div class="watermark">Created with Smart Resume Builder</div>'
+
+    html_content += '</body></html>'
+
+    return html_content
+
+
+def jinja_cold(cv: CV, user: User) -> str:
+    fragment_cache.clear()
+    return render_cv_html(cv, user)
+
+
+def jinja_one_edit(cv: CV, user: User) -> str:
+    jinja_one_edit.revision += 1
+    cv.data.experiences[0].description = f"Edited description, revision {jinja_one_edit.revision}"
+    return render_cv_html(cv, user)
+
+
+jinja_one_edit.revision = 0
+
+BUILDERS = (
+    ("legacy", legacy_build_html),
+    ("jinja2 cold", jinja_cold),
+    ("jinja2 edit", jinja_one_edit),
+    ("jinja2 warm", render_cv_html),
+)
+
+
+def _time(fn, cv: CV, user: User, repeat: int) -> list:
+    fn(cv, user)  # warm up (first call compiles the template)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(cv, user)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    user = make_user()
+    print(f"{'cv':<14}{'builder':<14}{'median ms':>11}{'p95 ms':>9}{'html KB':>9}")
+    for size in ("small", "medium", "huge"):
+        cv = make_cv(size)
+        for name, fn in BUILDERS:
+            samples = sorted(_time(fn, cv, user, args.repeat))
+            p95 = samples[int(len(samples) * 0.95) - 1]
+            size_kb = len(fn(cv, user).encode("utf-8")) / 1024
+            label = f"{size} ({len(cv.data.experiences)})"
+            print(f"{label:<14}{name:<14}{statistics.median(samples):>11.3f}{p95:>9.3f}{size_kb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
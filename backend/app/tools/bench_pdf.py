@@ -0,0 +1,131 @@
+"""Benchmark PDF rendering backends on the synthetic CV corpus.
+
+Every (backend, size, language) case runs in a fresh process so peak RSS
+is attributable to that case alone. Reports median/p95 wall time per render,
+peak RSS, RSS growth over the bare interpreter (engine imports included) and
+output size, then the size and added time of each optimization level applied
+to that output.
+
+Usage: python -m app.tools.bench_pdf [--backends xhtml2pdf weasyprint] [--levels lossless max] [--repeat 5] [--json out.json]
+"""
+import argparse
+import json
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+from app.tools.synthetic import SIZES, make_cv, make_user
+from app.utils.pdf_optimizer import LEVEL_NONE, OPTIMIZE_LEVELS
+
+LANGUAGES = ("en", "tr")
+
+
+def _timed_median(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _run_case(backend: str, size: str, language: str, levels: List[str], repeat: int) -> dict:
+    """Child process entry point: render one corpus entry ``repeat`` times, then optimize it."""
+    from app.utils.pdf_executor import peak_rss_bytes
+    from app.utils.pdf_generator import generate_cv_pdf
+    from app.utils.pdf_optimizer import optimize_pdf
+    from app.utils.pdf_renderers import RENDERERS, PDFRendererUnavailable
+
+    renderer = RENDERERS[backend]
+    cv = make_cv(size, language)
+    user = make_user()
+    baseline_rss = peak_rss_bytes()
+    result = {"backend": backend, "size": size, "language": language}
+
+    samples: List[float] = []
+    pdf_bytes = b""
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pdf_bytes = generate_cv_pdf(cv, user, renderer=renderer, optimize=LEVEL_NONE)
+            samples.append((time.perf_counter() - start) * 1000)
+    except PDFRendererUnavailable as e:
+        result["error"] = str(e)
+        return result
+
+    samples.sort()
+    result.update({
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[max(0, int(len(samples) * 0.95) - 1)],
+        "peak_rss_mb": peak_rss_bytes() / (1024 * 1024),
+        "render_rss_mb": (peak_rss_bytes() - baseline_rss) / (1024 * 1024),
+        "pdf_kb": len(pdf_bytes) / 1024,
+        "optimized": {
+            level: {
+                "pdf_kb": len(optimize_pdf(pdf_bytes, level)) / 1024,
+                "ms": _timed_median(lambda: optimize_pdf(pdf_bytes, level), repeat),
+            }
+            for level in levels
+        },
+    })
+    return result
+
+
+def run_benchmark(backends: List[str], levels: List[str], repeat: int) -> List[dict]:
+    """Run every corpus case for every backend, each in its own process."""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for backend in backends:
+        for size in SIZES:
+            for language in LANGUAGES:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    results.append(pool.submit(_run_case, backend, size, language, levels, repeat).result())
+    return results
+
+
+def print_report(results: List[dict], levels: List[str]):
+    print(
+        f"{'backend':<12}{'cv':<10}{'lang':<6}{'median ms':>11}{'p95 ms':>9}"
+        f"{'peak RSS MB':>13}{'render RSS MB':>15}{'PDF KB':>9}"
+        + "".join(f"{level + ' KB':>13}{'+ms':>8}" for level in levels)
+    )
+    for r in results:
+        prefix = f"{r['backend']:<12}{r['size']:<10}{r['language']:<6}"
+        if "error" in r:
+            print(f"{prefix}unavailable: {r['error'][:60]}")
+            continue
+        print(
+            f"{prefix}{r['median_ms']:>11.1f}{r['p95_ms']:>9.1f}"
+            f"{r['peak_rss_mb']:>13.1f}{r['render_rss_mb']:>15.1f}{r['pdf_kb']:>9.1f}"
+            + "".join(
+                f"{r['optimized'][level]['pdf_kb']:>13.1f}{r['optimized'][level]['ms']:>8.1f}"
+                for level in levels
+            )
+        )
+
+
+def main():
+    from app.utils.pdf_renderers import RENDERERS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=list(RENDERERS), choices=list(RENDERERS))
+    parser.add_argument(
+        "--levels",
+        nargs="+",
+        default=[level for level in OPTIMIZE_LEVELS if level != LEVEL_NONE],
+        choices=OPTIMIZE_LEVELS
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Also write raw results to this file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.backends, args.levels, args.repeat)
+    print_report(results, args.levels)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark skill extraction: Aho-Corasick automaton vs one regex per skill.
+
+The baseline is the straightforward approach of searching every
+description for every dictionary skill with a word-boundary regex. Both
+scan the synthetic corpus in English and Turkish; ``--scale`` repeats each
+description to model very long CVs.
+
+Usage: python -m app.tools.bench_skills [--repeat 50] [--scale 1 10]
+"""
+import argparse
+import re
+import statistics
+import time
+from typing import List, Pattern, Tuple
+from app.models.cv import CVData
+from app.tools.synthetic import SIZES, make_cv
+from app.utils.skill_extractor import SkillAutomaton, description_segments, extract_skills, get_skill_automaton
+
+
+def compile_baseline(automaton: SkillAutomaton) -> List[Tuple[str, Pattern]]:
+    """``(skill, regex)`` for every spelling in the automaton's dictionary."""
+    return [
+        (automaton.patterns[spelling], re.compile(rf"(?<![\w+#]){re.escape(spelling)}(?![\w+#])", re.IGNORECASE))
+        for spelling in automaton.patterns
+    ]
+
+
+def regex_per_skill(cv_data: CVData, patterns: List[Tuple[str, Pattern]]) -> List[Tuple[str, str, int]]:
+    """Baseline: one case-insensitive word-boundary search per dictionary spelling."""
+    found = []
+    for _, item_id, text in description_segments(cv_data):
+        for skill, pattern in patterns:
+            found.extend((skill, item_id, match.start()) for match in pattern.finditer(text))
+    return found
+
+
+def _scaled(cv_data: CVData, scale: int) -> CVData:
+    scaled = cv_data.model_copy(deep=True)
+    for item in [*scaled.experiences, *scaled.projects]:
+        item.description = "\n".join([item.description] * scale)
+    return scaled
+
+
+def _median_ms(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    automaton = get_skill_automaton()
+    build_ms = (time.perf_counter() - start) * 1000
+    baseline = compile_baseline(automaton)
+    print(f"dictionary: {len(automaton.patterns)} spellings, automaton built in {build_ms:.1f} ms")
+
+    print(f"{'cv':<20}{'chars':>9}{'skills':>8}{'automaton ms':>14}{'regex ms':>10}{'speedup':>9}")
+    for language in ("en", "tr"):
+        for size in SIZES:
+            for scale in args.scale:
+                data = _scaled(make_cv(size, language).data, scale)
+                chars = sum(len(text) + 1 for _, _, text in description_segments(data))
+                found = len(extract_skills(data, automaton))
+                fast = _median_ms(lambda: extract_skills(data, automaton), args.repeat)
+                slow = _median_ms(lambda: regex_per_skill(data, baseline), max(1, args.repeat // 5))
+                label = f"{size} {language} x{scale}"
+                print(f"{label:<20}{chars:>9}{found:>8}{fast:>14.2f}{slow:>10.2f}{slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Re-render every stored CV offline, e.g. after a stylesheet or watermark change.
+
+CVs are streamed from ``db.cvs`` with a cursor and rendered on all cores.
+Results go to the PDF cache's GridFS bucket (pre-warming it for downloads)
+and/or to a directory for auditing. With ``--checkpoint`` every finished CV
+is appended to a log, so an interrupted run picks up where it stopped.
+A CV whose render or store fails is counted as failed and the run goes on;
+if a worker crash breaks the pool, no more CVs are submitted and the run
+ends early (resume it with ``--checkpoint``).
+
+Usage:
+    python -m app.tools.render_all --gridfs
+    python -m app.tools.render_all --out ./renders --user user_123 --limit 50
+    python -m app.tools.render_all --gridfs --checkpoint render_all.ckpt
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional, Set
+from gridfs import GridFSBucket
+from pymongo import MongoClient
+from app.core.config import settings
+from app.models.cv import CV
+from app.models.user import User
+from app.utils.pdf_cache import cache_metadata, pdf_cache, pdf_cache_key
+
+
+def _render_one(cv_doc: dict, user_doc: dict) -> dict:
+    """Worker entry point: render one CV, never raising."""
+    from app.utils.pdf_generator import generate_cv_pdf
+
+    start = time.perf_counter()
+    try:
+        pdf_bytes = generate_cv_pdf(CV(**cv_doc), User(**user_doc))
+        return {"cv_id": cv_doc["cv_id"], "pdf": pdf_bytes, "ms": (time.perf_counter() - start) * 1000}
+    except Exception as e:
+        return {"cv_id": cv_doc["cv_id"], "error": f"{type(e).__name__}: {e}"}
+
+
+class Checkpoint:
+    """Append-only log of finished cv_ids."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done: Set[str] = set()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.done = {line.strip() for line in f if line.strip()}
+        self._file = open(path, "a") if path else None
+
+    def mark(self, cv_id: str):
+        if self._file:
+            self._file.write(cv_id + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+class RenderAll:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.db = MongoClient(settings.mongo_url)[settings.db_name]
+        self.bucket = GridFSBucket(self.db, bucket_name=pdf_cache.bucket_name) if args.gridfs else None
+        self.out_dir = Path(args.out) if args.out else None
+        self.checkpoint = Checkpoint(args.checkpoint)
+        self.users: Dict[str, Optional[dict]] = {}
+        self.keys: Dict[str, str] = {}
+        self.stats: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.render_ms = 0.0
+        self.pool_broken = False
+
+    def _user(self, user_id: str) -> Optional[dict]:
+        if user_id not in self.users:
+            if len(self.users) > 10000:
+                self.users.clear()
+            self.users[user_id] = self.db.users.find_one({"user_id": user_id}, {"_id": 0})
+        return self.users[user_id]
+
+    def _already_cached(self, key: str) -> bool:
+        return any(True for _ in self.bucket.find({"filename": key}).limit(1))
+
+    def _store(self, cv_doc: dict, key: str, pdf_bytes: bytes):
+        cv_id, user_id = cv_doc["cv_id"], cv_doc["user_id"]
+        if self.bucket is not None:
+            self.bucket.upload_from_stream(key, pdf_bytes, metadata=cache_metadata(cv_id, user_id))
+            for stale in self.bucket.find({"metadata.cv_id": cv_id, "filename": {"$ne": key}}):
+                self.bucket.delete(stale._id)
+        if self.out_dir is not None:
+            user_dir = self.out_dir / user_id
+            user_dir.mkdir(parents=True, exist_ok=True)
+            (user_dir / f"{cv_id}.pdf").write_bytes(pdf_bytes)
+        self.stats["bytes"] += len(pdf_bytes)
+
+    def _fail(self, cv_id: str, error: str):
+        self.stats["failed"] += 1
+        self.errors[error.split(":", 1)[0]] += 1
+        print(f"FAILED {cv_id}: {error}")
+
+    def _collect(self, future: Future, cv_id: str, cv_docs: Dict[str, dict]):
+        cv_doc = cv_docs.pop(cv_id)
+        key = self.keys.pop(cv_id)
+        try:
+            result = future.result()
+        except BrokenProcessPool as e:
+            self.pool_broken = True
+            result = {"cv_id": cv_id, "error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            result = {"cv_id": cv_id, "error": f"{type(e).__name__}: {e}"}
+        if "error" in result:
+            self._fail(cv_id, result["error"])
+            return
+        try:
+            self._store(cv_doc, key, result["pdf"])
+        except Exception as e:
+            self._fail(cv_id, f"{type(e).__name__}: {e}")
+            return
+        self.render_ms += result["ms"]
+        self.stats["rendered"] += 1
+        self.checkpoint.mark(cv_id)
+
+    def run(self):
+        query = {"user_id": self.args.user} if self.args.user else {}
+        cursor = self.db.cvs.find(query, {"_id": 0}, batch_size=100).sort("cv_id", 1)
+        if self.args.limit:
+            cursor = cursor.limit(self.args.limit)
+
+        workers = self.args.workers
+        context = multiprocessing.get_context("spawn")
+        in_flight: Dict[Future, str] = {}
+        cv_docs: Dict[str, dict] = {}
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for cv_doc in cursor:
+                self.stats["seen"] += 1
+                if cv_doc["cv_id"] in self.checkpoint.done:
+                    self.stats["skipped_checkpoint"] += 1
+                    continue
+                user_doc = self._user(cv_doc["user_id"])
+                if user_doc is None:
+                    self.stats["skipped_orphaned"] += 1
+                    continue
+
+                key = pdf_cache_key(CV(**cv_doc), User(**user_doc))
+                if self.bucket is not None and not self.args.force and self._already_cached(key):
+                    self.stats["skipped_cached"] += 1
+                    self.checkpoint.mark(cv_doc["cv_id"])
+                    continue
+
+                # Keep a bounded window in flight so the cursor is consumed lazily
+                if len(in_flight) >= workers * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._collect(future, in_flight.pop(future), cv_docs)
+                if self.pool_broken:
+                    self.stats["not_submitted"] += 1
+                    print("Worker pool broke; not submitting more CVs")
+                    break
+
+                cv_docs[cv_doc["cv_id"]] = cv_doc
+                self.keys[cv_doc["cv_id"]] = key
+                in_flight[pool.submit(_render_one, cv_doc, user_doc)] = cv_doc["cv_id"]
+
+            for future in wait(in_flight).done:
+                self._collect(future, in_flight[future], cv_docs)
+
+        self.checkpoint.close()
+        self._print_summary(time.perf_counter() - start, workers)
+
+    def _print_summary(self, elapsed: float, workers: int):
+        rendered = self.stats["rendered"]
+        print("\nRender summary")
+        print(f"  CVs seen:            {self.stats['seen']}")
+        print(f"  Rendered:            {rendered}")
+        print(f"  Failed:              {self.stats['failed']}")
+        print(f"  Skipped (cached):    {self.stats['skipped_cached']}")
+        print(f"  Skipped (resumed):   {self.stats['skipped_checkpoint']}")
+        print(f"  Skipped (no owner):  {self.stats['skipped_orphaned']}")
+        if self.pool_broken:
+            print(f"  Stopped early:       worker pool broke after {self.stats['seen'] - self.stats['not_submitted']} CVs")
+        print(f"  Output:              {self.stats['bytes'] / (1024 * 1024):.1f} MB")
+        print(f"  Wall time:           {elapsed:.1f} s on {workers} workers")
+        if rendered:
+            print(f"  Throughput:          {rendered / elapsed:.1f} CVs/s")
+            print(f"  Mean render time:    {self.render_ms / rendered:.0f} ms")
+        for error_type, count in self.errors.most_common():
+            print(f"  Error {error_type}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gridfs", action="store_true", help="Write renders into the PDF cache bucket")
+    parser.add_argument("--out", help="Also write renders to <out>/<user_id>/<cv_id>.pdf")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--checkpoint", help="Resume log of finished cv_ids")
+    parser.add_argument("--force", action="store_true", help="Re-render even if the cache already has this version")
+    parser.add_argument("--user", help="Only render CVs of this user_id")
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.gridfs and not args.out:
+        parser.error("choose an output: --gridfs and/or --out DIR")
+
+    RenderAll(args).run()
+
+
+if __name__ == "__main__":
+    main()
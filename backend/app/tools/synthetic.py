@@ -0,0 +1,130 @@
+"""Synthetic CV corpus for benchmarks and load tests."""
+import random
+from typing import Dict
+from app.models.cv import (
+    CV, CVData, PersonalInfo, Experience, Education, Skill,
+    Language, Certificate, Project
+)
+from app.models.user import User
+
+SIZES: Dict[str, int] = {"small": 3, "medium": 12, "huge": 50}
+
+_TEXT = {
+    "en": {
+        "name": "Alexandra Johnson",
+        "location": "London, United Kingdom",
+        "summary": (
+            "Results-driven software engineer with a track record of shipping reliable "
+            "distributed systems. Led teams of up to 8 engineers and cut infrastructure "
+            "costs by 30% through careful capacity planning."
+        ),
+        "positions": ["Senior Software Engineer", "Backend Developer", "Data Engineer", "Tech Lead"],
+        "companies": ["Acme Corp", "Globex", "Initech", "Umbrella Analytics"],
+        "bullets": [
+            "Built data pipelines in Python on AWS processing 2M events per day.",
+            "Reduced p95 API latency by 45% by introducing Redis caching and query tuning.",
+            "Mentored 4 junior engineers and introduced code review guidelines.",
+            "Migrated a monolith to Docker and Kubernetes with zero downtime.",
+            "Designed PostgreSQL schemas and automated CI/CD with GitHub Actions.",
+        ],
+        "degree": "Bachelor of Science",
+        "field": "Computer Science",
+        "institution": "University of Manchester",
+    },
+    "tr": {
+        "name": "Şükrü Özgür Çağlayan",
+        "location": "İstanbul, Türkiye",
+        "summary": (
+            "Güvenilir dağıtık sistemler geliştirme konusunda deneyimli, sonuç odaklı yazılım "
+            "mühendisi. 8 kişiye kadar ekiplere liderlik etti ve altyapı maliyetlerini %30 düşürdü."
+        ),
+        "positions": ["Kıdemli Yazılım Mühendisi", "Arka Uç Geliştirici", "Veri Mühendisi", "Teknik Lider"],
+        "companies": ["Ağaç Teknoloji", "Göktürk Yazılım", "İleri Çözümler", "Şimşek Analitik"],
+        "bullets": [
+            "AWS üzerinde Python ile günde 2 milyon olay işleyen veri hatları kurdu.",
+            "Redis önbelleği ve sorgu iyileştirmeleriyle p95 gecikmesini %45 azalttı.",
+            "4 genç mühendise mentorluk yaptı ve kod inceleme yönergeleri oluşturdu.",
+            "Monolitik uygulamayı kesintisiz olarak Docker ve Kubernetes'e taşıdı.",
+            "PostgreSQL şemaları tasarladı ve GitHub Actions ile CI/CD süreçlerini otomatikleştirdi.",
+        ],
+        "degree": "Lisans",
+        "field": "Bilgisayar Mühendisliği",
+        "institution": "Orta Doğu Teknik Üniversitesi",
+    },
+}
+
+_SKILLS = [
+    "Python", "FastAPI", "PostgreSQL", "MongoDB", "AWS", "Docker", "Kubernetes",
+    "React", "TypeScript", "Redis", "Terraform", "GraphQL", "Kafka", "Go",
+]
+
+
+def make_cv(size: str = "medium", language: str = "en", seed: int = 0) -> CV:
+    """Build a deterministic CV with ``SIZES[size]`` experiences in English or Turkish."""
+    text = _TEXT[language]
+    rng = random.Random(f"{size}-{language}-{seed}")
+    count = SIZES[size]
+
+    experiences = []
+    for i in range(count):
+        bullets = rng.sample(text["bullets"], k=3)
+        experiences.append(Experience(
+            id=f"exp-{i}",
+            company=rng.choice(text["companies"]),
+            position=rng.choice(text["positions"]),
+            location=text["location"],
+            start_date=f"{2024 - 2 * i - 2}-01",
+            end_date=f"{2024 - 2 * i}-01",
+            current=i == 0,
+            description="\n".join(f"- {b}" for b in bullets),
+        ))
+
+    return CV(
+        cv_id=f"cv_bench_{size}_{language}",
+        user_id="bench_user",
+        title=f"Benchmark CV ({size}, {language})",
+        data=CVData(
+            personal_info=PersonalInfo(
+                full_name=text["name"],
+                email="candidate@example.com",
+                phone="+44 20 7946 0000",
+                location=text["location"],
+                linkedin="linkedin.com/in/candidate",
+            ),
+            summary=text["summary"],
+            experiences=experiences,
+            education=[
+                Education(
+                    id=f"edu-{i}",
+                    institution=text["institution"],
+                    degree=text["degree"],
+                    field=text["field"],
+                    start_date=f"{2010 - 4 * i}-09",
+                    end_date=f"{2014 - 4 * i}-06",
+                )
+                for i in range(max(1, count // 10))
+            ],
+            skills=[Skill(id=f"skill-{i}", name=name) for i, name in enumerate(_SKILLS)],
+            languages=[
+                Language(id="lang-en", name="English", proficiency="native"),
+                Language(id="lang-tr", name="Türkçe", proficiency="professional"),
+            ],
+            certificates=[
+                Certificate(id="cert-0", name="AWS Solutions Architect", issuer="Amazon", date="2022"),
+            ],
+            projects=[
+                Project(
+                    id=f"proj-{i}",
+                    name=f"Project {i}",
+                    description=rng.choice(text["bullets"]),
+                    technologies=rng.sample(_SKILLS, k=3),
+                )
+                for i in range(max(1, count // 5))
+            ],
+        ),
+    )
+
+
+def make_user(is_pro: bool = False) -> User:
+    """User that owns the synthetic CVs."""
+    return User(user_id="bench_user", email="bench@example.com", name="Bench", is_pro=is_pro)
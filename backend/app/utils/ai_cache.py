@@ -0,0 +1,125 @@
+"""Cache of AI responses keyed by endpoint, prompt and normalized input.
+
+Autosave re-runs analyses with unchanged CV text, so identical requests are
+answered from an in-process LRU (per worker) backed by a Mongo collection
+shared by all workers. Both tiers expire entries after ``AI_CACHE_TTL``;
+Mongo does so with a TTL index.
+
+The key includes a hash of the system prompt and the provider/model that
+produced the answer, so editing a prompt or switching models invalidates
+earlier answers automatically, and an answer from a fallback provider is
+never served as the primary model's. A lookup tries the keys of all the
+endpoint's providers, in preference order.
+"""
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+from app.core.database import db
+from app.core.logging import logger
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def ai_cache_key(endpoint: str, system_message: str, user_message: str, model: str) -> str:
+    """Hash of (endpoint, prompt version, provider/model, normalized user message)."""
+    prompt_version = hashlib.sha256(system_message.encode("utf-8")).hexdigest()[:16]
+    payload = "\x1f".join((endpoint, prompt_version, model, normalize_message(user_message)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AICache:
+    """Two-tier response cache: TTL-bounded in-memory LRU backed by Mongo."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.mongo_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "mongo_hits": self.mongo_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.mongo_hits) / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def _remember(self, key: str, text: str, expires_at: float):
+        self._entries[key] = (expires_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, keys: List[str]) -> Optional[str]:
+        """Return the cached response of the first of ``keys`` that has one, or None on a miss."""
+        now = time.monotonic()
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            expires_at, text = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return text
+            del self._entries[key]
+
+        try:
+            # The TTL monitor runs about once a minute, so check the age here too
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+            docs = await db.ai_cache.find({"key": {"$in": keys}, "created_at": {"$gt": cutoff}}, {"_id": 0}).to_list(len(keys))
+        except Exception as e:
+            logger.warning(f"AI cache read failed: {str(e)}", extra={"error_type": type(e).__name__})
+            docs = []
+
+        if not docs:
+            self.misses += 1
+            return None
+
+        doc = min(docs, key=lambda d: keys.index(d["key"]))
+        created_at = doc["created_at"]
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        remaining = self.ttl_seconds - (datetime.now(timezone.utc) - created_at).total_seconds()
+        self._remember(doc["key"], doc["response"], time.monotonic() + remaining)
+        self.mongo_hits += 1
+        return doc["response"]
+
+    async def put(self, key: str, text: str, endpoint: str):
+        """Store a response in both tiers."""
+        self._remember(key, text, time.monotonic() + self.ttl_seconds)
+        try:
+            await db.ai_cache.update_one(
+                {"key": key},
+                {"$set": {"endpoint": endpoint, "response": text, "created_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"AI cache write failed: {str(e)}", extra={"endpoint": endpoint, "error_type": type(e).__name__})
+
+
+ai_cache = AICache(max_entries=settings.ai_cache_size, ttl_seconds=settings.ai_cache_ttl)
+
+
+async def create_ai_cache_indexes():
+    """Unique key lookup plus TTL expiry of the Mongo tier."""
+    await db.ai_cache.create_index("key", unique=True)
+    try:
+        await db.ai_cache.create_index("created_at", expireAfterSeconds=settings.ai_cache_ttl)
+    except OperationFailure:
+        # AI_CACHE_TTL changed since the index was created
+        await db.command("collMod", "ai_cache", index={"keyPattern": {"created_at": 1}, "expireAfterSeconds": settings.ai_cache_ttl})
@@ -0,0 +1,90 @@
+"""Local fake AI provider for tests and resilience drills.
+
+``FakeAIClient`` has the same interface as ``GeminiClient`` but never leaves
+the process: every call sleeps for a configurable latency (plus jitter, plus
+``tail_latency`` for a ``tail_rate`` share of calls) and fails with a
+configurable probability, so timeouts, the circuit breaker and
+hedging can be exercised without a Gemini key. Select it with
+``AI_PROVIDERS=fake``; the attributes can also be changed at runtime.
+"""
+import asyncio
+import json
+import random
+from typing import AsyncIterator, Callable, Optional
+from google.api_core import exceptions as google_exceptions
+from app.utils.ai_usage import Completion
+
+
+def _default_responder(system_message: str, user_message: str, json_mode: bool) -> str:
+    if json_mode:
+        return json.dumps({"fake": True})
+    return f"Fake response to: {user_message[:200]}"
+
+
+class FakeAIClient:
+    """Stand-in for ``GeminiClient`` that injects latency and errors."""
+
+    model_name = "fake"
+    supports_json_mode = True
+    configured = True
+
+    def __init__(
+        self,
+        timeout: float,
+        latency: float = 0.5,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        tail_rate: float = 0.0,
+        tail_latency: float = 0.0,
+        seed: Optional[int] = None,
+        responder: Callable[[str, str, bool], str] = _default_responder
+    ):
+        self.timeout = timeout
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.responder = responder
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def _delay(self, timeout: float):
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if self._random.random() < self.tail_rate:
+            delay += self.tail_latency
+        if delay > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        await asyncio.sleep(delay)
+        if self._random.random() < self.error_rate:
+            raise google_exceptions.ServiceUnavailable("Injected fake provider error")
+
+    async def generate(
+        self,
+        system_message: str,
+        user_message: str,
+        timeout: Optional[float] = None,
+        json_mode: bool = False,
+        running: Optional[list] = None
+    ) -> Completion:
+        # Cancelling the sleep ends the call, so nothing is left in ``running``
+        self.calls += 1
+        await self._delay(timeout or self.timeout)
+        # No token counts, like a provider that reports none
+        return Completion(self.responder(system_message, user_message, json_mode))
+
+    async def stream(
+        self,
+        system_message: str,
+        user_message: str,
+        timeout: Optional[float] = None,
+        usage: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        self.calls += 1
+        await self._delay(timeout or self.timeout)
+        for i, word in enumerate(self.responder(system_message, user_message, False).split(" ")):
+            yield word if i == 0 else f" {word}"
+
+    def shutdown(self):
+        pass
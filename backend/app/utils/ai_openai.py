@@ -0,0 +1,140 @@
+"""OpenAI-compatible chat completions provider.
+
+Works with OpenAI itself and with anything that speaks its API (Azure
+OpenAI proxies, vLLM, Ollama, LiteLLM proxy) through ``OPENAI_BASE_URL``.
+The ``openai`` package is imported on first use, so it is only needed when
+this provider is configured. Errors are translated to the ones the router
+and ``ai_service`` already understand: ``asyncio.TimeoutError`` past the
+deadline and ``ProviderBusy`` for rate limits and 5xx responses.
+"""
+import asyncio
+from typing import AsyncIterator, Optional
+from app.utils.ai_resilience import ProviderBusy
+from app.utils.ai_usage import Completion
+
+
+class OpenAIClient:
+    """Async client for an OpenAI-compatible ``/chat/completions`` endpoint."""
+
+    supports_json_mode = True
+
+    def __init__(self, model_name: str, api_key: str, base_url: str, timeout: float):
+        self.model_name = model_name
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client = None
+
+    @property
+    def configured(self) -> bool:
+        # Self-hosted endpoints usually need no key
+        return bool(self.api_key or self.base_url)
+
+    def _get_client(self):
+        if self._client is None:
+            import openai
+
+            self._client = openai.AsyncOpenAI(
+                api_key=self.api_key or "unused",
+                base_url=self.base_url or None,
+                max_retries=0  # Retries are the router's job
+            )
+        return self._client
+
+    @staticmethod
+    def _translate(e: Exception) -> Exception:
+        import openai
+
+        if isinstance(e, openai.APITimeoutError):
+            return asyncio.TimeoutError()
+        if isinstance(e, (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)):
+            return ProviderBusy(str(e))
+        return e
+
+    def _messages(self, system_message: str, user_message: str) -> list:
+        return [{"role": "system", "content": system_message}, {"role": "user", "content": user_message}]
+
+    async def generate(
+        self,
+        system_message: str,
+        user_message: str,
+        timeout: Optional[float] = None,
+        json_mode: bool = False,
+        running: Optional[list] = None
+    ) -> Completion:
+        # Cancellation closes the HTTP request, so nothing is left in ``running``
+        timeout = timeout or self.timeout
+        client = self._get_client()
+        options = {"response_format": {"type": "json_object"}} if json_mode else {}
+        try:
+            response = await asyncio.wait_for(
+                client.chat.completions.create(
+                    model=self.model_name,
+                    messages=self._messages(system_message, user_message),
+                    timeout=timeout,
+                    **options
+                ),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            raise self._translate(e) from e
+
+        text = response.choices[0].message.content if response.choices else None
+        if not text:
+            raise Exception("Empty response from AI service")
+        usage = response.usage
+        if usage is None:
+            return Completion(text)
+        return Completion(text, usage.prompt_tokens, usage.completion_tokens)
+
+    async def stream(
+        self,
+        system_message: str,
+        user_message: str,
+        timeout: Optional[float] = None,
+        usage: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """Yield response text chunks as they arrive; ``timeout`` bounds the whole stream.
+
+        Token counts from the final chunk are stored in ``usage`` if given.
+        """
+        timeout = timeout or self.timeout
+        client = self._get_client()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        stream = None
+        try:
+            stream = await asyncio.wait_for(
+                client.chat.completions.create(
+                    model=self.model_name,
+                    messages=self._messages(system_message, user_message),
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    timeout=timeout
+                ),
+                timeout=timeout
+            )
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    return
+                if usage is not None and getattr(chunk, "usage", None) is not None:
+                    usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                    usage["completion_tokens"] = chunk.usage.completion_tokens
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    yield text
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            raise self._translate(e) from e
+        finally:
+            if stream is not None:
+                await stream.close()
+
+    def shutdown(self):
+        pass
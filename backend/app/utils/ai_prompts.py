@@ -0,0 +1,192 @@
+"""Prompt building helpers for AI endpoints.
+
+``serialize_cv`` renders ``CVData`` as compact, deterministic plain text (no
+JSON or Python list punctuation; one line per role header, followed by its
+description lines as written) and, given a token budget, trims it by
+priority: project and older experience descriptions are shortened first,
+then languages and certificates dropped, then older roles cut down to their
+title line. The most recent role is kept in full as long as anything is.
+"""
+import json
+from typing import Dict, List, NamedTuple, Optional, Sequence, TypeVar
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.cv import CVData, Experience
+
+T = TypeVar("T")
+
+# Gemini averages roughly four characters per token for English prose
+CHARS_PER_TOKEN = 4
+
+# Description length kept for an item that has been shortened
+SHORT_DESCRIPTION_TOKENS = 40
+
+# Detail levels of an experience or project
+FULL, SHORT, HEADER = 2, 1, 0
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, good enough for budgeting prompts."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_json(value) -> str:
+    """JSON without insignificant whitespace, to keep prompts small."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def pack_by_budget(items: Sequence[T], sizes: Sequence[int], budget: int) -> List[List[T]]:
+    """Split ``items`` into consecutive groups whose total size stays within ``budget``.
+
+    An item larger than the budget on its own gets a group of its own.
+    """
+    groups: List[List[T]] = []
+    current: List[T] = []
+    used = 0
+    for item, size in zip(items, sizes):
+        if current and used + size > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+def clip_text(text: str, max_tokens: int) -> str:
+    """``text`` cut at a word boundary to roughly ``max_tokens``, marked with an ellipsis."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def prompt_budget(endpoint: str) -> int:
+    """Token budget for the CV text in ``endpoint``'s prompt."""
+    return settings.ai_prompt_budgets.get(endpoint, settings.ai_prompt_budget)
+
+
+class SerializedCV(NamedTuple):
+    text: str
+    tokens: int
+    # Size before trimming to the budget
+    full_tokens: int
+
+
+def _lines(text: str) -> List[str]:
+    return [" ".join(line.split()) for line in text.splitlines() if line.strip()]
+
+
+def _dates(start: str, end: str, current: bool = False) -> str:
+    end = "present" if current else end
+    if start and end:
+        return f" ({start}–{end})"
+    return f" ({start or end})" if start or end else ""
+
+
+def _join(*parts: str, sep: str = ", ") -> str:
+    return sep.join(part.strip() for part in parts if part and part.strip())
+
+
+def _description(text: str, level: int) -> List[str]:
+    if level == HEADER:
+        return []
+    lines = _lines(text)
+    if level == SHORT:
+        lines = [clip_text(" ".join(lines), SHORT_DESCRIPTION_TOKENS)] if lines else []
+    return lines
+
+
+def by_recency(experiences: List[Experience]) -> List[Experience]:
+    """Most recent role first; CV order when some roles have no start date."""
+    if not all(e.start_date for e in experiences):
+        return list(experiences)
+    return sorted(experiences, key=lambda e: (e.current, e.end_date, e.start_date), reverse=True)
+
+
+def _render(cv_data: CVData, experiences: List[Experience], levels: Dict[object, int], contact: bool) -> str:
+    personal = cv_data.personal_info
+    out: List[str] = []
+    if contact:
+        details = _join(personal.full_name, personal.email, personal.phone, personal.location,
+                        personal.linkedin, personal.website)
+        if details:
+            out.append(f"Contact: {details}")
+    if cv_data.summary.strip():
+        out.append(f"Summary: {' '.join(_lines(cv_data.summary))}")
+
+    if experiences:
+        out.append("Experience:")
+        for e in experiences:
+            out.append(f"{_join(e.position, e.company, sep=' at ')}{_dates(e.start_date, e.end_date, e.current)}:")
+            out.extend(_description(e.description, levels[id(e)]))
+
+    if cv_data.education:
+        out.append("Education:")
+        for e in cv_data.education:
+            degree = _join(e.degree, e.field, sep=" in ")
+            gpa = f", GPA {e.gpa}" if e.gpa else ""
+            out.append(f"{_join(degree, e.institution)}{_dates(e.start_date, e.end_date)}{gpa}")
+
+    skills = [s.name.strip() for s in cv_data.skills if s.name.strip()]
+    if skills:
+        out.append(f"Skills: {', '.join(skills)}")
+
+    if levels["extras"]:
+        languages = [_join(l.name, f"({l.proficiency})" if l.proficiency else "", sep=" ") for l in cv_data.languages if l.name]
+        if languages:
+            out.append(f"Languages: {', '.join(languages)}")
+        certificates = [_join(c.name, c.issuer, c.date) for c in cv_data.certificates if c.name]
+        if certificates:
+            out.append(f"Certificates: {'; '.join(certificates)}")
+
+    if cv_data.projects:
+        out.append("Projects:")
+        for p in cv_data.projects:
+            tech = f" [{', '.join(p.technologies)}]" if p.technologies else ""
+            out.append(f"{p.name.strip() or 'Project'}{tech}:")
+            out.extend(_description(p.description, levels[id(p)]))
+    return "\n".join(out)
+
+
+def serialize_cv(cv_data: CVData, budget: Optional[int] = None, contact: bool = True) -> SerializedCV:
+    """Plain-text CV for a prompt, trimmed by priority to ``budget`` tokens if given."""
+    experiences = by_recency(cv_data.experiences)
+    # Keyed by object identity: item ids are not guaranteed unique
+    levels: Dict[object, int] = {id(item): FULL for item in [*experiences, *cv_data.projects]}
+    levels["extras"] = True
+    text = _render(cv_data, experiences, levels, contact)
+    full_tokens = estimate_tokens(text)
+    if budget is None or full_tokens <= budget:
+        return SerializedCV(text, full_tokens, full_tokens)
+
+    older = experiences[:0:-1]  # Oldest first, the most recent role excluded
+    steps = [
+        *((id(p), SHORT) for p in reversed(cv_data.projects)),
+        *((id(e), SHORT) for e in older),
+        *((id(p), HEADER) for p in reversed(cv_data.projects)),
+        ("extras", False),
+        *((id(e), HEADER) for e in older),
+    ]
+    for key, level in steps:
+        levels[key] = level
+        text = _render(cv_data, experiences, levels, contact)
+        if estimate_tokens(text) <= budget:
+            break
+    else:
+        text = clip_text(text, budget)
+    return SerializedCV(text, estimate_tokens(text), full_tokens)
+
+
+def log_prompt_size(endpoint: str, cv: SerializedCV, message: str):
+    """Log the size of a CV prompt and how much trimming saved."""
+    saved = cv.full_tokens - cv.tokens
+    logger.info(
+        f"AI prompt for {endpoint}: ~{estimate_tokens(message)} tokens, CV {cv.tokens}/{cv.full_tokens}"
+        + (f" (trimmed {saved} to fit {prompt_budget(endpoint)})" if saved else "")
+    )
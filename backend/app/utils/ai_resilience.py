@@ -0,0 +1,210 @@
+"""Resilience primitives for the AI provider: circuit breaker, latency tracking, hedging.
+
+When the provider degrades, failing fast beats piling requests up behind
+it. ``CircuitBreaker`` opens once the recent error rate crosses a threshold
+and rejects calls with 503 until a cool-down passes; then a limited number
+of probe calls decide whether it closes again (half-open state).
+
+``hedged`` races a second attempt against a slow first one after a delay
+derived from the observed p95 latency, trading a little extra load for a
+shorter tail.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+from fastapi import HTTPException
+from app.core.logging import logger
+
+T = TypeVar("T")
+
+
+class ProviderBusy(Exception):
+    """A provider is rate limiting or overloaded; try another or come back later."""
+
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker over the last ``window`` call outcomes.
+
+    Usage: ``probe = breaker.acquire()`` before the call (raises 503 while
+    open), then ``breaker.record(ok, probe)`` with ``ok`` True/False, or
+    None if the call never reached the provider.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: float,
+        min_calls: int,
+        window: int,
+        open_seconds: float,
+        half_open_probes: int = 1
+    ):
+        self.failure_threshold = failure_threshold
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._outcomes: Deque[bool] = deque(maxlen=max(self.min_calls, window))
+        self._opened_at: Optional[float] = None
+        self._probes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return STATE_CLOSED
+        if time.monotonic() - self._opened_at < self.open_seconds:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate(), 3),
+            "calls": len(self._outcomes),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+    def _reject(self, retry_after: float):
+        self.rejected += 1
+        raise HTTPException(
+            status_code=503,
+            detail="AI service temporarily unavailable. Please try again shortly.",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+        )
+
+    def acquire(self) -> bool:
+        """Admit a call; returns True if it is a half-open probe."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return False
+        if state == STATE_OPEN:
+            self._reject(self.open_seconds - (time.monotonic() - self._opened_at))
+        if self._probes >= self.half_open_probes:
+            self._reject(1)
+        self._probes += 1
+        return True
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        logger.warning(f"AI circuit breaker opened, error rate {self.error_rate():.0%}")
+
+    def record(self, ok: Optional[bool], probe: bool = False):
+        """Record a call outcome; ``ok=None`` only releases a probe slot."""
+        if probe:
+            self._probes -= 1
+            if ok is None:
+                return
+            if ok:
+                self._opened_at = None
+                self._outcomes.clear()
+                logger.info("AI circuit breaker closed after successful probe")
+            else:
+                self._open()
+            return
+
+        if ok is None or self._opened_at is not None:
+            # Calls admitted before the breaker opened don't change its state
+            return
+        self._outcomes.append(ok)
+        if len(self._outcomes) >= self.min_calls and self.error_rate() >= self.failure_threshold:
+            self._open()
+
+
+class LatencyTracker:
+    """Latencies of recent successful calls, optionally only the last ``max_age`` seconds."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20, max_age: Optional[float] = None):
+        self.min_samples = min_samples
+        self.max_age = max_age
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self._samples.append((time.monotonic(), seconds))
+
+    def _recent(self) -> List[float]:
+        if self.max_age is None:
+            return [seconds for _, seconds in self._samples]
+        cutoff = time.monotonic() - self.max_age
+        return [seconds for at, seconds in self._samples if at >= cutoff]
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """``fraction`` percentile in seconds, or None until ``min_samples`` are in."""
+        samples = self._recent()
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "samples": len(self._recent()),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+class HedgeStats:
+    def __init__(self):
+        self.hedged = 0
+        self.backup_wins = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hedged": self.hedged, "backup_wins": self.backup_wins}
+
+
+async def hedged(
+    primary: Awaitable[T],
+    delay: Optional[float],
+    backup: Callable[[], Optional[Awaitable[T]]],
+    stats: Optional[HedgeStats] = None
+) -> T:
+    """Await ``primary``; if it is still running after ``delay``, race ``backup()`` against it.
+
+    ``backup`` returns None when a second attempt is not allowed right now.
+    The first successful result wins and the other attempt is cancelled; an
+    error is only raised once both attempts have failed.
+    """
+    first = asyncio.ensure_future(primary)
+    if delay is None:
+        return await first
+
+    pending = {first}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return first.result()
+        second = backup()
+        if second is None:
+            return await first
+
+        second = asyncio.ensure_future(second)
+        pending.add(second)
+        if stats is not None:
+            stats.hedged += 1
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second and stats is not None:
+                        stats.backup_wins += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
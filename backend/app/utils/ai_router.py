@@ -0,0 +1,132 @@
+"""Latency- and health-aware routing across AI providers.
+
+Each registered provider gets its own circuit breaker and latency tracker.
+For every call the router ranks the candidates of the endpoint (the
+endpoint's preference list from ``AI_ROUTES``, else all providers in
+``AI_PROVIDERS`` order): providers whose breaker is open or that are not
+configured are skipped, and the rest are ordered by recent p95 latency
+penalized by error rate. A provider keeps its preferred position unless
+another is clearly better (by more than ``tolerance``), so traffic does not
+flap between providers of similar speed. ``ai_service`` tries the ranked
+providers in turn until one succeeds.
+
+A demoted provider would never be measured again, so one call in
+``explore_every`` goes first to the provider used least recently.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from fastapi import HTTPException
+from app.utils.ai_resilience import STATE_OPEN, CircuitBreaker, LatencyTracker
+
+# How much each unit of error rate inflates a provider's latency score
+ERROR_PENALTY = 4.0
+
+# Seconds a latency sample counts towards a provider's score
+LATENCY_MAX_AGE = 300.0
+
+
+class Provider:
+    """A client (``GeminiClient``, ``OpenAIClient``, ``FakeAIClient``) with its health."""
+
+    def __init__(self, name: str, client: Any, breaker: CircuitBreaker, latency: Optional[LatencyTracker] = None):
+        self.name = name
+        self.client = client
+        self.breaker = breaker
+        # Recent samples only, so a recovered provider's old slow calls age out
+        self.latency = latency or LatencyTracker(size=100, min_samples=10, max_age=LATENCY_MAX_AGE)
+        self.calls = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self.last_used = 0.0
+
+    @property
+    def model(self) -> str:
+        """Provider and model name, identifying who produced an answer (e.g. for the response cache)."""
+        return f"{self.name}/{self.client.model_name}"
+
+    @property
+    def available(self) -> bool:
+        return self.client.configured and self.breaker.state != STATE_OPEN
+
+    def score(self) -> Optional[float]:
+        """p95 latency inflated by the error rate; None until enough calls are measured."""
+        p95 = self.latency.percentile(0.95)
+        if p95 is None:
+            return None
+        return p95 * (1 + ERROR_PENALTY * self.breaker.error_rate())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.client.model_name,
+            "configured": self.client.configured,
+            "calls": self.calls,
+            "failures": self.failures,
+            "fallbacks": self.fallbacks,
+            "breaker": self.breaker.stats(),
+            "latency": self.latency.stats(),
+        }
+
+
+class AIRouter:
+    """Orders providers per endpoint by preference, health and measured latency."""
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, Sequence[str]]] = None,
+        tolerance: float = 0.2,
+        explore_every: int = 20
+    ):
+        self.providers: Dict[str, Provider] = {}
+        self.routes = {endpoint: list(names) for endpoint, names in (routes or {}).items()}
+        self.tolerance = tolerance
+        self.explore_every = explore_every
+        self._ranked = 0
+
+    def add(self, provider: Provider):
+        self.providers[provider.name] = provider
+
+    def candidates(self, endpoint: str) -> List[Provider]:
+        names = self.routes.get(endpoint) or list(self.providers)
+        return [self.providers[name] for name in names if name in self.providers]
+
+    def check(self, endpoint: str) -> List[Provider]:
+        """Available providers for ``endpoint`` in preference order.
+
+        Raises 500 when no provider is configured and 503 when every
+        configured provider's breaker is open.
+        """
+        configured = [p for p in self.candidates(endpoint) if p.client.configured]
+        if not configured:
+            raise HTTPException(status_code=500, detail="AI service not configured")
+        available = [p for p in configured if p.available]
+        if not available:
+            raise HTTPException(
+                status_code=503,
+                detail="AI service temporarily unavailable. Please try again shortly.",
+                headers={"Retry-After": str(max(1, int(min(p.breaker.open_seconds for p in configured))))}
+            )
+        return available
+
+    def rank(self, endpoint: str) -> List[Provider]:
+        """Available providers for ``endpoint``, best first; raises like ``check``."""
+        remaining = self.check(endpoint)
+
+        ranked: List[Provider] = []
+        while remaining:
+            # Unmeasured providers score 0 so they get traffic and a measurement
+            scores = [p.score() or 0.0 for p in remaining]
+            best = min(scores)
+            chosen = next(i for i, score in enumerate(scores) if score <= best * (1 + self.tolerance))
+            ranked.append(remaining.pop(chosen))
+
+        self._ranked += 1
+        if self.explore_every and self._ranked % self.explore_every == 0 and len(ranked) > 1:
+            stale = min(ranked, key=lambda p: p.last_used)
+            ranked.remove(stale)
+            ranked.insert(0, stale)
+        return ranked
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "providers": {name: provider.stats() for name, provider in self.providers.items()},
+            "routes": self.routes,
+        }
@@ -1,7 +1,46 @@
-"""AI service integration utilities using Google Gemini."""
+"""AI service integration: Gemini, OpenAI-compatible and stub providers behind a router.
+
+The Gemini SDK call is blocking, so it runs on a dedicated thread pool
+instead of the event loop; a slow LLM round trip then only ties up one of
+those threads, not every other request on the worker. One model instance is
+kept per distinct system prompt, and every call has a deadline.
+Concurrent identical requests (double-clicks, client retries) share a
+single upstream call. Deterministic endpoints also go through
+``get_cached_ai_response`` (see ``ai_cache``); ``stream_ai_response`` yields
+text chunks as the provider produces them.
+
+Upstream calls are admitted by ``ai_scheduler``, which caps them globally
+and per endpoint so a traffic spike queues (briefly) instead of tripping
+provider quotas for everyone; Pro users wait in a priority lane.
+
+Every upstream attempt, cache hit and shared request is metered by ``ai_usage``.
+
+``ai_router`` picks the provider for each call from ``AI_PROVIDERS`` /
+``AI_ROUTES`` by health and recent latency, and falls back to the next one
+when a call fails. Every provider has a circuit breaker that fails it fast
+while it is erroring (see ``ai_resilience``), and with ``AI_HEDGE`` enabled
+a call still running after the provider's recent p95 latency gets a
+second, racing attempt.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from app.core.config import settings
 from app.core.logging import logger
+from app.utils.ai_cache import ai_cache, ai_cache_key
+from app.utils.ai_fake import FakeAIClient
+from app.utils.ai_openai import OpenAIClient
+from app.utils.ai_prompts import estimate_tokens
+from app.utils.ai_resilience import CircuitBreaker, HedgeStats, ProviderBusy, hedged
+from app.utils.ai_router import AIRouter, Provider
+from app.utils.ai_usage import CACHE_PROVIDER, SHARED_PROVIDER, Completion, ai_usage
 from fastapi import HTTPException
 
 
@@ -10,32 +49,716 @@ if settings.google_api_key:
     genai.configure(api_key=settings.google_api_key)
 
 
-async def get_ai_response(system_message: str, user_message: str) -> str:
-    """Get AI response using Google Gemini API."""
-    if not settings.google_api_key:
-        logger.error("AI service not configured: GOOGLE_API_KEY missing")
-        raise HTTPException(status_code=500, detail="AI service not configured")
+# Models that predate JSON mode
+LEGACY_MODEL_PREFIXES = ("gemini-pro", "gemini-1.0")
 
-    try:
-        logger.info("Initializing Gemini model: gemini-pro")
 
-        # Use Gemini Pro for responses
-        model = genai.GenerativeModel(
-            model_name='gemini-pro',
-            system_instruction=system_message
-        )
+class GeminiClient:
+    """Gemini calls off the event loop with cached model instances and timeouts."""
+
+    def __init__(self, model_name: str, max_threads: int, timeout: float, max_models: int = 32):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.max_models = max_models
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_threads), thread_name_prefix="gemini")
+        self._models: "OrderedDict[str, genai.GenerativeModel]" = OrderedDict()
 
-        logger.info("Sending request to Gemini API")
-        # Generate response
-        response = model.generate_content(user_message)
+    def get_model(self, system_message: str) -> genai.GenerativeModel:
+        """Model instance for ``system_message``, created once and reused."""
+        model = self._models.get(system_message)
+        if model is not None:
+            self._models.move_to_end(system_message)
+            return model
 
+        logger.info(f"Initializing Gemini model: {self.model_name}")
+        model = genai.GenerativeModel(model_name=self.model_name, system_instruction=system_message)
+        self._models[system_message] = model
+        if len(self._models) > self.max_models:
+            self._models.popitem(last=False)
+        return model
+
+    @property
+    def configured(self) -> bool:
+        return bool(settings.google_api_key)
+
+    @property
+    def supports_json_mode(self) -> bool:
+        """Whether the model accepts ``response_mime_type`` (Gemini 1.5 and later)."""
+        return not self.model_name.startswith(LEGACY_MODEL_PREFIXES)
+
+    def _generate(self, model: genai.GenerativeModel, user_message: str, timeout: float, json_mode: bool) -> Completion:
+        generation_config = {"response_mime_type": "application/json"} if json_mode and self.supports_json_mode else None
+        # The SDK deadline stops the upstream call; wait_for below only stops the wait
+        response = model.generate_content(
+            user_message,
+            generation_config=generation_config,
+            request_options={"timeout": timeout}
+        )
         if not response or not response.text:
-            logger.error("Empty response from Gemini API")
             raise Exception("Empty response from AI service")
+        metadata = getattr(response, "usage_metadata", None)
+        if not metadata:
+            return Completion(response.text)
+        return Completion(response.text, metadata.prompt_token_count, metadata.candidates_token_count)
+
+    async def generate(
+        self,
+        system_message: str,
+        user_message: str,
+        timeout: Optional[float] = None,
+        json_mode: bool = False,
+        running: Optional[List[Future]] = None
+    ) -> Completion:
+        """Generate a response in the thread pool, raising ``asyncio.TimeoutError`` past the deadline.
+
+        ``json_mode`` asks the model for a JSON response where it supports that.
+        The thread cannot be stopped once started, so its future is appended to
+        ``running`` for callers that account for calls outliving a cancellation.
+        """
+        timeout = timeout or self.timeout
+        model = self.get_model(system_message)
+        future = self._executor.submit(self._generate, model, user_message, timeout, json_mode)
+        if running is not None:
+            running.append(future)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+
+    def _produce_stream(
+        self,
+        model: genai.GenerativeModel,
+        user_message: str,
+        timeout: float,
+        emit: Callable[[Optional[str], Optional[Exception]], None],
+        stop: threading.Event,
+        usage: Optional[dict]
+    ):
+        """Thread body: forward chunks to ``emit``, ending with ``(None, None)`` or ``(None, error)``."""
+        try:
+            for chunk in model.generate_content(user_message, stream=True, request_options={"timeout": timeout}):
+                if stop.is_set():
+                    return
+                metadata = getattr(chunk, "usage_metadata", None)
+                if usage is not None and metadata:
+                    # Running totals; the last chunk has the final counts
+                    usage["prompt_tokens"] = metadata.prompt_token_count
+                    usage["completion_tokens"] = metadata.candidates_token_count
+                if chunk.text:
+                    emit(chunk.text, None)
+        except Exception as e:
+            emit(None, e)
+            return
+        emit(None, None)
+
+    async def stream(
+        self,
+        system_message: str,
+        user_message: str,
+        timeout: Optional[float] = None,
+        usage: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """Yield response text chunks as they arrive; ``timeout`` bounds the whole stream.
+
+        Token counts reported with the chunks are stored in ``usage`` if given.
+        """
+        timeout = timeout or self.timeout
+        model = self.get_model(system_message)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def emit(text: Optional[str], error: Optional[Exception]):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(queue.put_nowait, (text, error))
+
+        self._executor.submit(self._produce_stream, model, user_message, timeout, emit, stop, usage)
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                text, error = await asyncio.wait_for(queue.get(), timeout=max(0.0, deadline - loop.time()))
+                if error is not None:
+                    raise error
+                if text is None:
+                    return
+                yield text
+        finally:
+            # Consumer finished or went away: let the thread drop the rest of the stream
+            stop.set()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one in-flight call."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "coalesced": self.coalesced}
+
+    def _finished(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved even if every caller went away
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """The result of ``call``, and whether it came from another caller's call."""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            # A task of its own, so one caller disconnecting doesn't cancel the others
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task), shared
+
+
+class _Waiter:
+    __slots__ = ("endpoint", "lane", "future", "enqueued_at")
+
+    def __init__(self, endpoint: str, lane: str, future: asyncio.Future):
+        self.endpoint = endpoint
+        self.lane = lane
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class AIScheduler:
+    """Admission control for upstream AI calls.
+
+    At most ``max_concurrency`` calls are in flight, and at most
+    ``endpoint_concurrency`` (or the endpoint's entry in ``endpoint_limits``)
+    per endpoint. Excess calls wait FIFO in a "pro" or "free" lane; a freed
+    slot goes to the Pro lane first, except that after ``pro_burst`` Pro
+    grants in a row a waiting free call is served, so that lane cannot
+    starve. Waits are bounded by ``queue_timeout`` and the lanes together by
+    ``max_queue``; past either limit the call fails with 503.
+
+    All bookkeeping happens on the event loop thread, so no locking is needed.
+    """
+
+    LANES = ("pro", "free")
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        endpoint_concurrency: int,
+        endpoint_limits: Dict[str, int],
+        max_queue: int,
+        queue_timeout: float,
+        pro_burst: int = 4
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.endpoint_concurrency = max(1, endpoint_concurrency)
+        self.endpoint_limits = endpoint_limits
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.pro_burst = max(1, pro_burst)
+        self.in_flight = 0
+        self._endpoint_in_flight: Dict[str, int] = {}
+        self._lanes: Dict[str, Deque[_Waiter]] = {lane: deque() for lane in self.LANES}
+        self._pro_streak = 0
+        self._waits: Dict[str, Deque[float]] = {lane: deque(maxlen=500) for lane in self.LANES}
+        self._counters: Dict[str, Dict[str, int]] = {
+            name: dict.fromkeys(self.LANES, 0) for name in ("admitted", "queued", "timed_out", "rejected")
+        }
+
+    def endpoint_limit(self, endpoint: str) -> int:
+        return self.endpoint_limits.get(endpoint, self.endpoint_concurrency)
+
+    def queue_depth(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def stats(self) -> Dict[str, Any]:
+        wait_ms = {}
+        for lane, samples in self._waits.items():
+            wait_ms[lane] = {
+                "p50": round(_percentile(list(samples), 0.5) * 1000, 1),
+                "p95": round(_percentile(list(samples), 0.95) * 1000, 1),
+                "max": round(max(samples) * 1000, 1),
+            } if samples else {"p50": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "in_flight_by_endpoint": {k: v for k, v in self._endpoint_in_flight.items() if v},
+            "queue_depth": {lane: len(waiters) for lane, waiters in self._lanes.items()},
+            "wait_ms": wait_ms,
+            **{name: dict(counts) for name, counts in self._counters.items()},
+        }
+
+    def _has_capacity(self, endpoint: str) -> bool:
+        return (
+            self.in_flight < self.max_concurrency
+            and self._endpoint_in_flight.get(endpoint, 0) < self.endpoint_limit(endpoint)
+        )
+
+    def _take(self, endpoint: str, lane: str):
+        self.in_flight += 1
+        self._endpoint_in_flight[endpoint] = self._endpoint_in_flight.get(endpoint, 0) + 1
+        self._counters["admitted"][lane] += 1
+
+    def hold(self, endpoint: str):
+        """Count a call that outlived its slot (a cancelled provider thread) as in flight until ``release``."""
+        self.in_flight += 1
+        self._endpoint_in_flight[endpoint] = self._endpoint_in_flight.get(endpoint, 0) + 1
+
+    def release_when_done(self, endpoint: str, running: List[Future]):
+        """``release`` once every future in ``running`` has finished."""
+        pending = [future for future in running if not future.done()]
+        if not pending:
+            self.release(endpoint)
+            return
+        loop = asyncio.get_running_loop()
+        remaining = [len(pending)]
+
+        def finished(_):
+            remaining[0] -= 1
+            if not remaining[0] and not loop.is_closed():
+                loop.call_soon_threadsafe(self.release, endpoint)
+
+        for future in pending:
+            future.add_done_callback(finished)
+
+    def release(self, endpoint: str):
+        """Return a slot taken by ``acquire``, ``try_acquire`` or ``hold``."""
+        self.in_flight -= 1
+        self._endpoint_in_flight[endpoint] -= 1
+        self._dispatch()
+
+    def _eligible(self, lane: str) -> Optional[_Waiter]:
+        """First waiter in ``lane`` whose endpoint has a free slot."""
+        for waiter in self._lanes[lane]:
+            if not waiter.future.done() and self._has_capacity(waiter.endpoint):
+                return waiter
+        return None
+
+    def _dispatch(self):
+        """Hand freed slots to waiting calls."""
+        while self.in_flight < self.max_concurrency:
+            pro, free = self._eligible("pro"), self._eligible("free")
+            if pro and (not free or self._pro_streak < self.pro_burst):
+                waiter = pro
+                self._pro_streak = self._pro_streak + 1 if free else 0
+            elif free:
+                waiter = free
+                self._pro_streak = 0
+            else:
+                return
+            self._lanes[waiter.lane].remove(waiter)
+            self._take(waiter.endpoint, waiter.lane)
+            self._waits[waiter.lane].append(time.monotonic() - waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    def try_acquire(self, endpoint: str, pro: bool = False) -> bool:
+        """Take a slot only if one is free right now, without queueing."""
+        if not self._has_capacity(endpoint) or self.queue_depth():
+            return False
+        self._take(endpoint, "pro" if pro else "free")
+        return True
+
+    async def acquire(self, endpoint: str, pro: bool = False):
+        """Wait for a slot for ``endpoint``; raises 503 if the queue is full or the wait too long."""
+        lane = "pro" if pro else "free"
+        # Waiters are only left behind when their own endpoint is at its cap
+        if self._has_capacity(endpoint):
+            self._take(endpoint, lane)
+            return
+
+        if self.queue_depth() >= self.max_queue:
+            self._counters["rejected"][lane] += 1
+            logger.warning("AI queue full", extra={"endpoint": endpoint, "lane": lane})
+            raise HTTPException(
+                status_code=503,
+                detail="AI service is busy. Please try again shortly.",
+                headers={"Retry-After": "5"}
+            )
+
+        waiter = _Waiter(endpoint, lane, asyncio.get_running_loop().create_future())
+        self._lanes[lane].append(waiter)
+        self._counters["queued"][lane] += 1
+        try:
+            await asyncio.wait_for(waiter.future, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._lanes[lane].remove(waiter)
+            self._counters["timed_out"][lane] += 1
+            logger.warning(f"AI queue wait exceeded {self.queue_timeout}s", extra={"endpoint": endpoint, "lane": lane})
+            raise HTTPException(
+                status_code=503,
+                detail="AI service is busy. Please try again shortly.",
+                headers={"Retry-After": "5"}
+            )
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(endpoint)  # Granted just as the caller went away
+            elif waiter in self._lanes[lane]:
+                self._lanes[lane].remove(waiter)
+            raise
+
+    @asynccontextmanager
+    async def slot(self, endpoint: str, pro: bool = False):
+        """Hold an upstream call slot for the duration of the block."""
+        await self.acquire(endpoint, pro)
+        try:
+            yield
+        finally:
+            self.release(endpoint)
+
+
+def flight_key(endpoint: str, pro: bool, system_message: str, user_message: str, json_mode: bool = False) -> str:
+    """Requests share a call only within one endpoint (route, scheduler cap) and scheduler lane."""
+    payload = f"{endpoint}\x1f{pro}\x1f{system_message}\x1f{user_message}\x1f{json_mode}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+ai_singleflight = SingleFlight()
+
+ai_scheduler = AIScheduler(
+    max_concurrency=settings.ai_max_concurrency,
+    endpoint_concurrency=settings.ai_endpoint_concurrency,
+    endpoint_limits=settings.ai_endpoint_limits,
+    max_queue=settings.ai_queue_size,
+    queue_timeout=settings.ai_queue_timeout
+)
+
+gemini_client = GeminiClient(
+    model_name=settings.ai_model,
+    max_threads=settings.ai_max_threads,
+    timeout=settings.ai_timeout
+)
+
+
+def _build_client(name: str):
+    if name == "gemini":
+        return gemini_client
+    if name == "openai":
+        return OpenAIClient(
+            model_name=settings.openai_model,
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            timeout=settings.ai_timeout
+        )
+    if name == "fake":
+        return FakeAIClient(
+            timeout=settings.ai_timeout,
+            latency=settings.ai_fake_latency,
+            jitter=settings.ai_fake_jitter,
+            error_rate=settings.ai_fake_error_rate
+        )
+    raise ValueError(f"Unknown AI provider: {name}")
+
+
+def new_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=settings.ai_breaker_threshold,
+        min_calls=settings.ai_breaker_min_calls,
+        window=settings.ai_breaker_window,
+        open_seconds=settings.ai_breaker_open_seconds
+    )
+
+
+ai_router = AIRouter(routes=settings.ai_routes)
+for _name in settings.ai_providers:
+    ai_router.add(Provider(_name, _build_client(_name), new_breaker()))
+ai_hedging = HedgeStats()
+
+# Provider errors that mean "overloaded, come back later" rather than "broken"
+OVERLOAD_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable, ProviderBusy)
+
+
+def ai_resilience_stats() -> Dict[str, Any]:
+    return {
+        **ai_router.stats(),
+        "hedging": {"enabled": settings.ai_hedge, **ai_hedging.stats()},
+    }
+
+
+def _map_error(e: Exception, timeout: float) -> HTTPException:
+    """HTTP error for a failed upstream call."""
+    if isinstance(e, (asyncio.TimeoutError, google_exceptions.DeadlineExceeded)):
+        logger.error(f"AI service timed out after {timeout}s")
+        return HTTPException(status_code=504, detail="AI service timed out")
+    logger.error(f"AI service error: {str(e)}", extra={"error_type": type(e).__name__})
+    if isinstance(e, OVERLOAD_ERRORS):
+        return HTTPException(
+            status_code=503,
+            detail="AI service is busy. Please try again shortly.",
+            headers={"Retry-After": "10"}
+        )
+    return HTTPException(status_code=500, detail="AI service temporarily unavailable")
+
+
+def _reported(tokens: Optional[int], estimate: int) -> int:
+    """A provider's token count, or ``estimate`` where it reported none."""
+    return estimate if tokens is None else tokens
+
+
+async def _attempt(
+    provider: Provider,
+    system_message: str,
+    user_message: str,
+    deadline: float,
+    json_mode: bool,
+    endpoint: str,
+    pro: bool
+) -> Completion:
+    """One call to ``provider`` before ``deadline``, hedged when enabled.
+
+    Called with a scheduler slot held; a hedge takes a second slot only if
+    one is free without queueing. A provider thread left running by a lost
+    hedge or the deadline keeps counting as in flight until it returns.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    def attempt(running: List[Future]) -> Awaitable[Completion]:
+        return provider.client.generate(
+            system_message, user_message, max(0.0, deadline - loop.time()), json_mode, running=running
+        )
+
+    def backup() -> Optional[Awaitable[Completion]]:
+        if deadline - loop.time() <= 0 or not ai_scheduler.try_acquire(endpoint, pro):
+            return None
+
+        async def run() -> Completion:
+            running: List[Future] = []
+            try:
+                return await attempt(running)
+            finally:
+                ai_scheduler.release_when_done(endpoint, running)
+        return run()
+
+    delay = provider.latency.percentile(0.95) if settings.ai_hedge else None
+    running: List[Future] = []
+    try:
+        completion = await hedged(attempt(running), delay, backup, ai_hedging)
+    finally:
+        # The caller's slot is released when it returns; hold one for a thread still running
+        if any(not future.done() for future in running):
+            ai_scheduler.hold(endpoint)
+            ai_scheduler.release_when_done(endpoint, running)
+    provider.latency.record(loop.time() - started)
+    return completion
+
+
+class _Failover:
+    """The ranked providers for one call, tried in turn until ``deadline``.
+
+    Shared by ``_generate`` and ``stream_ai_response`` so both route, probe
+    breakers and count fallbacks the same way. Iterating yields each
+    provider whose breaker admits the call, with the breaker's probe flag.
+    """
+
+    def __init__(self, endpoint: str, deadline: float):
+        self.providers = ai_router.rank(endpoint)
+        self.deadline = deadline
+        self.error: Optional[Exception] = None
+
+    def __iter__(self) -> Iterator[Tuple[Provider, bool]]:
+        loop = asyncio.get_running_loop()
+        for provider in self.providers:
+            if self.deadline - loop.time() <= 0:
+                break
+            try:
+                probe = provider.breaker.acquire()
+            except HTTPException as rejected:
+                # Opened or out of probes since ranking
+                self.error = self.error or rejected
+                continue
+            if self.error is not None:
+                provider.fallbacks += 1
+            provider.calls += 1
+            provider.last_used = time.monotonic()
+            yield provider, probe
+
+    def failed(self, provider: Provider, e: Exception):
+        provider.failures += 1
+        self.error = e
+
+
+async def _generate(
+    system_message: str,
+    user_message: str,
+    timeout: float,
+    json_mode: bool,
+    endpoint: str,
+    pro: bool,
+    user_id: str
+) -> Tuple[str, str]:
+    """Try the ranked providers in turn until one answers, all within one ``timeout`` deadline.
+
+    Returns the answer and the ``Provider.model`` that gave it.
+    """
+    loop = asyncio.get_running_loop()
+    failover = _Failover(endpoint, loop.time() + timeout)
+    prompt_tokens = estimate_tokens(system_message + user_message)
+    for provider, probe in failover:
+        started = loop.time()
+        ok = None
+        completion = Completion("")
+        try:
+            completion = await _attempt(provider, system_message, user_message, failover.deadline, json_mode, endpoint, pro)
+            ok = True
+            return completion.text, provider.model
+        except Exception as e:
+            ok = False
+            failover.failed(provider, e)
+            logger.warning(f"AI provider {provider.name} failed for {endpoint}: {type(e).__name__}: {str(e)}")
+        finally:
+            provider.breaker.record(ok, probe)
+            if ok is not None:
+                ai_usage.record(
+                    endpoint, user_id, provider.name,
+                    _reported(completion.prompt_tokens, prompt_tokens),
+                    _reported(completion.completion_tokens, estimate_tokens(completion.text)),
+                    (loop.time() - started) * 1000, ok=ok
+                )
+    raise failover.error or asyncio.TimeoutError()
+
+
+async def get_ai_response(
+    system_message: str,
+    user_message: str,
+    timeout: Optional[float] = None,
+    json_mode: bool = False,
+    endpoint: str = "default",
+    pro: bool = False,
+    user_id: str = "",
+    served: Optional[dict] = None
+) -> str:
+    """Get an AI response from the best available provider.
+
+    ``timeout`` overrides the default deadline (``AI_TIMEOUT``) in seconds,
+    covering fallbacks; ``json_mode`` requests JSON output where the model
+    supports it. ``endpoint`` selects the provider route and the
+    scheduler's per-endpoint cap, ``pro`` the scheduler lane; usage is
+    metered under ``endpoint`` and ``user_id``. If given, ``served["model"]``
+    is set to the ``Provider.model`` that answered.
+    """
+    ai_router.check(endpoint)  # Fail fast when nothing is configured or every breaker is open
+    timeout = timeout or settings.ai_timeout
+
+    async def call() -> Tuple[str, str]:
+        try:
+            async with ai_scheduler.slot(endpoint, pro):
+                return await _generate(system_message, user_message, timeout, json_mode, endpoint, pro, user_id)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise _map_error(e, timeout)
+
+    logger.info(
+        f"Sending request to AI provider ({endpoint}), ~{estimate_tokens(system_message + user_message)} prompt tokens"
+    )
+    started = time.perf_counter()
+    (text, model), shared = await ai_singleflight.do(flight_key(endpoint, pro, system_message, user_message, json_mode), call)
+    if served is not None:
+        served["model"] = model
+    if shared:
+        # The upstream call is metered under the caller that made it
+        ai_usage.record(endpoint, user_id, SHARED_PROVIDER, 0, 0, (time.perf_counter() - started) * 1000, cache_hit=True)
+    logger.info(f"Received response from AI provider, length: {len(text)}")
+    return text
+
+
+async def stream_ai_response(
+    system_message: str,
+    user_message: str,
+    timeout: Optional[float] = None,
+    endpoint: str = "default",
+    pro: bool = False,
+    user_id: str = ""
+) -> AsyncIterator[str]:
+    """Stream an AI response chunk by chunk, with the same error mapping as ``get_ai_response``.
+
+    Providers are chosen like ``get_ai_response``'s; a call falls back to
+    the next one only while nothing has been yielded yet. Routes should
+    call ``ai_router.check`` before starting a streaming response, so an
+    unavailable service is still reported with a proper status code.
+    """
+    timeout = timeout or settings.ai_timeout
+    loop = asyncio.get_running_loop()
+    prompt_tokens = estimate_tokens(system_message + user_message)
+    logger.info(f"Sending streaming request to AI provider ({endpoint})")
+    async with ai_scheduler.slot(endpoint, pro):
+        failover = _Failover(endpoint, loop.time() + timeout)
+        for provider, probe in failover:
+            started = loop.time()
+            ok = None
+            length = 0
+            usage: Dict[str, int] = {}
+            try:
+                async for text in provider.client.stream(system_message, user_message, failover.deadline - loop.time(), usage):
+                    length += len(text)
+                    yield text
+                ok = True
+                logger.info(f"Streamed response from AI provider {provider.name}, length: {length}")
+                return
+            except Exception as e:
+                ok = False
+                failover.failed(provider, e)
+                logger.warning(f"AI provider {provider.name} stream failed for {endpoint}: {type(e).__name__}: {str(e)}")
+                if length:
+                    break
+            finally:
+                provider.breaker.record(ok, probe)
+                if ok is not None:
+                    ai_usage.record(
+                        endpoint, user_id, provider.name,
+                        _reported(usage.get("prompt_tokens"), prompt_tokens),
+                        _reported(usage.get("completion_tokens"), (length + 3) // 4),
+                        (loop.time() - started) * 1000, ok=ok
+                    )
+
+    if isinstance(failover.error, HTTPException):
+        raise failover.error
+    raise _map_error(failover.error or asyncio.TimeoutError(), timeout)
+
+
+async def get_cached_ai_response(
+    endpoint: str,
+    system_message: str,
+    user_message: str,
+    validate: Optional[Callable[[str], Any]] = None,
+    timeout: Optional[float] = None,
+    json_mode: bool = False,
+    pro: bool = False,
+    user_id: str = ""
+) -> str:
+    """``get_ai_response`` through the response cache.
+
+    ``validate`` is called on a fresh response before it is cached; if it
+    raises, the response is returned uncached so a malformed answer is
+    not replayed.
+    """
+    keys = [ai_cache_key(endpoint, system_message, user_message, p.model) for p in ai_router.candidates(endpoint)]
+    started = time.perf_counter()
+    cached = await ai_cache.get(keys)
+    if cached is not None:
+        logger.info("AI cache hit", extra={"endpoint": endpoint})
+        ai_usage.record(endpoint, user_id, CACHE_PROVIDER, 0, 0, (time.perf_counter() - started) * 1000, cache_hit=True)
+        return cached
+
+    served: Dict[str, str] = {}
+    text = await get_ai_response(system_message, user_message, timeout, json_mode, endpoint, pro, user_id, served)
+    try:
+        if validate is not None:
+            validate(text)
+    except Exception:
+        return text
+    await ai_cache.put(ai_cache_key(endpoint, system_message, user_message, served["model"]), text, endpoint)
+    return text
 
-        logger.info(f"Received response from Gemini API, length: {len(response.text)}")
-        return response.text
 
-    except Exception as e:
-        logger.error(f"AI service error: {str(e)}", extra={"error_type": type(e).__name__})
-        raise HTTPException(status_code=500, detail="AI service temporarily unavailable")
+def shutdown_ai_client():
+    """Stop AI worker threads on application shutdown."""
+    for provider in ai_router.providers.values():
+        provider.client.shutdown()
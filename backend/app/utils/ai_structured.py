@@ -0,0 +1,192 @@
+"""Structured (JSON) output from the AI provider, validated against pydantic models.
+
+Responses are requested in JSON mode where the model supports it and then
+parsed leniently: prose or Markdown fences around the JSON (braces in the
+prose included), trailing commas, raw newlines inside strings and truncated
+output are all tolerated; a truncated answer is cut back to its last
+complete element rather than keeping a value that may have been cut short. The
+result is validated against a response model; only if that fails is the
+model asked once to repair its answer.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel, ValidationError
+from app.core.logging import logger
+from app.utils.ai_cache import ai_cache, ai_cache_key
+from app.utils.ai_service import get_ai_response, get_cached_ai_response
+
+M = TypeVar("M", bound=BaseModel)
+
+REPAIR_SYSTEM_PROMPT = """You fix malformed JSON produced by another assistant.
+You receive a JSON schema, the validation errors and the original response.
+Return ONLY valid JSON that matches the schema, keeping the original content wherever it is valid."""
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+# A truncated value ending in a number may have been cut short ("80" -> "8")
+_NUMBER_TAIL = re.compile(r"-?\d[\d.eE+-]*$")
+
+# Opening brackets tried as the start of the JSON value
+MAX_JSON_STARTS = 20
+
+
+class StructuredOutputError(ValueError):
+    """The AI response could not be turned into the expected structure."""
+
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _close(out: List[str], stack: List[str]) -> str:
+    closed = list(out)
+    _strip_trailing_comma(closed)
+    return "".join(closed) + "".join(reversed(stack))
+
+
+def _repair(text: str, start: int) -> Any:
+    """Parse the JSON value opening at ``text[start]``, repairing common defects.
+
+    Scans once, dropping trailing commas as it goes. If the input ends before
+    the value is closed, open brackets are closed, unless the input stops
+    inside a string or a number (which may be cut short); otherwise, or if
+    that is still invalid, the value is cut back to the last complete element.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # Positions just before each element separator, with the brackets open there
+    cut_points: List[Tuple[int, List[str]]] = []
+    in_string = escaped = False
+
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                raise StructuredOutputError("Mismatched brackets in AI response")
+            _strip_trailing_comma(out)
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                try:
+                    return json.loads("".join(out), strict=False)
+                except json.JSONDecodeError as e:
+                    raise StructuredOutputError(f"Invalid JSON in AI response: {e}")
+            continue
+        elif ch == ",":
+            cut_points.append((len(out), list(stack)))
+        out.append(ch)
+
+    # Truncated response
+    cut_short = in_string or _NUMBER_TAIL.search("".join(out).rstrip())
+    candidates = [] if cut_short else [_close(out, stack)]
+    candidates += [_close(out[:pos], open_) for pos, open_ in reversed(cut_points)]
+    for candidate in candidates:
+        try:
+            return json.loads(candidate, strict=False)
+        except json.JSONDecodeError:
+            continue
+    raise StructuredOutputError("Truncated JSON in AI response could not be recovered")
+
+
+def extract_json(text: str) -> Any:
+    """Parse the first JSON object or array in ``text``, repairing common defects.
+
+    Braces in the surrounding prose are skipped: each ``{`` or ``[`` is tried
+    in turn, as valid JSON and then with repairs (see ``_repair``), and the
+    first that parses wins.
+    """
+    starts = [i for i, ch in enumerate(text) if ch in _CLOSERS][:MAX_JSON_STARTS]
+    if not starts:
+        raise StructuredOutputError("No JSON found in AI response")
+
+    decoder = json.JSONDecoder(strict=False)
+    error: Optional[StructuredOutputError] = None
+    for start in starts:
+        try:
+            return decoder.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            pass
+        try:
+            return _repair(text, start)
+        except StructuredOutputError as e:
+            error = error or e
+    raise error
+
+
+def parse_structured(text: str, model: Type[M]) -> M:
+    """Leniently parse ``text`` and validate it as ``model``."""
+    try:
+        return model.model_validate(extract_json(text))
+    except ValidationError as e:
+        raise StructuredOutputError(f"AI response does not match {model.__name__}: {e}")
+
+
+async def get_structured_response(
+    endpoint: str,
+    system_message: str,
+    user_message: str,
+    model: Type[M],
+    cache: bool = True,
+    timeout: Optional[float] = None,
+    pro: bool = False,
+    user_id: str = ""
+) -> M:
+    """Ask for JSON matching ``model`` and return it validated.
+
+    Raises ``StructuredOutputError`` if neither the answer nor its one repair
+    attempt can be parsed; provider errors propagate as ``HTTPException``.
+    """
+    if cache:
+        text = await get_cached_ai_response(
+            endpoint,
+            system_message,
+            user_message,
+            validate=lambda t: parse_structured(t, model),
+            timeout=timeout,
+            json_mode=True,
+            pro=pro,
+            user_id=user_id
+        )
+    else:
+        text = await get_ai_response(
+            system_message, user_message, timeout, json_mode=True, endpoint=endpoint, pro=pro, user_id=user_id
+        )
+
+    try:
+        return parse_structured(text, model)
+    except StructuredOutputError as e:
+        logger.warning(f"AI structured output invalid, attempting repair: {str(e)}", extra={"endpoint": endpoint})
+        error = e
+
+    repair_message = (
+        f"JSON schema:\n{json.dumps(model.model_json_schema())}\n\n"
+        f"Validation errors:\n{error}\n\n"
+        f"Original response:\n{text}"
+    )
+    served: Dict[str, str] = {}
+    repaired = await get_ai_response(
+        REPAIR_SYSTEM_PROMPT, repair_message, timeout, json_mode=True, endpoint=endpoint, pro=pro, user_id=user_id,
+        served=served
+    )
+    result = parse_structured(repaired, model)
+    if cache:
+        # Serve the repaired answer for identical requests instead of repairing again
+        await ai_cache.put(ai_cache_key(endpoint, system_message, user_message, served["model"]), repaired, endpoint)
+    return result
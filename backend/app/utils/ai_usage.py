@@ -0,0 +1,231 @@
+"""AI usage metering: tokens, latency, cache hits and cost per endpoint and user.
+
+``ai_usage.record`` is called for every upstream AI attempt (fallbacks
+included), every response-cache hit and every caller that shared another
+caller's in-flight request. Events are buffered in memory and
+written to the ``ai_usage`` Mongo time-series collection in batches, every
+``AI_USAGE_FLUSH_SECONDS`` or as soon as ``AI_USAGE_BATCH_SIZE`` events are
+waiting, so metering adds no database round trip to a request. If Mongo is
+unreachable the events are kept (up to ``max_buffer``) and retried.
+
+Token counts are the ones the provider reports (Gemini ``usage_metadata``,
+OpenAI ``usage``); where it reports none they fall back to the chars/4
+estimate the prompt budgets use. Cost comes from the per-provider prices in
+``AI_TOKEN_PRICES``.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+from pymongo.errors import BulkWriteError, CollectionInvalid, OperationFailure
+from app.core.config import settings
+from app.core.database import db
+from app.core.logging import logger
+
+USAGE_COLLECTION = "ai_usage"
+
+# Provider label for answers served from the response cache
+CACHE_PROVIDER = "cache"
+
+# Provider label for callers that shared another caller's in-flight request
+SHARED_PROVIDER = "shared"
+
+# Bucket labels per rollup period, in UTC
+ROLLUP_FORMATS = {"hour": "%Y-%m-%dT%H:00:00Z", "day": "%Y-%m-%d"}
+ROLLUP_GROUPS = {"endpoint": "meta.endpoint", "user": "meta.user_id", "provider": "meta.provider"}
+
+
+class Completion(NamedTuple):
+    """A provider's answer with the token counts it reported (None if it reported none)."""
+
+    text: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+def token_cost(provider: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of a call from ``AI_TOKEN_PRICES`` (per million tokens); 0 if unpriced."""
+    prices = settings.ai_token_prices.get(provider)
+    if not prices:
+        return 0.0
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+class UsageMeter:
+    """Buffers usage events and writes them to Mongo in batches."""
+
+    def __init__(self, batch_size: int, flush_interval: float, max_buffer: int = 10000):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self._buffer: List[dict] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    def record(
+        self,
+        endpoint: str,
+        user_id: str,
+        provider: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_ms: float,
+        cache_hit: bool = False,
+        ok: bool = True
+    ):
+        """Queue one usage event; never blocks or raises."""
+        self._buffer.append({
+            "ts": datetime.now(timezone.utc),
+            "meta": {"endpoint": endpoint, "user_id": user_id, "provider": provider},
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_ms": round(latency_ms, 1),
+            "cache_hit": cache_hit,
+            "ok": ok,
+            "cost_usd": token_cost(provider, prompt_tokens, completion_tokens),
+        })
+        self._trim()
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write everything buffered in one ``insert_many``; keep it for a retry on failure."""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            await db[USAGE_COLLECTION].insert_many(batch, ordered=False)
+            self.written += len(batch)
+        except BulkWriteError as e:
+            # Some documents were rejected; retrying them would fail the same way
+            self.failed_flushes += 1
+            self.written += e.details.get("nInserted", 0)
+            self.dropped += len(e.details.get("writeErrors", []))
+            logger.warning(f"AI usage flush partially failed: {str(e)}")
+        except Exception as e:
+            self.failed_flushes += 1
+            logger.warning(f"AI usage flush failed, {len(batch)} events kept: {str(e)}", extra={"error_type": type(e).__name__})
+            for doc in batch:
+                doc.pop("_id", None)
+            self._buffer = batch + self._buffer
+            self._trim()
+
+    def _trim(self):
+        """Drop the oldest events beyond ``max_buffer``."""
+        if len(self._buffer) > self.max_buffer:
+            overflow = len(self._buffer) - self.max_buffer
+            del self._buffer[:overflow]
+            self.dropped += overflow
+
+    def start(self):
+        """Start the flush loop on the current event loop."""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+ai_usage = UsageMeter(batch_size=settings.ai_usage_batch_size, flush_interval=settings.ai_usage_flush_seconds)
+
+
+async def start_ai_usage_meter():
+    """Create the time-series collection if needed and start flushing.
+
+    MongoDB before 5.0 has no time-series collections; there the events go
+    to a regular collection with a TTL index instead.
+    """
+    retention = settings.ai_usage_retention_days * 24 * 3600
+    if USAGE_COLLECTION not in await db.list_collection_names():
+        try:
+            await db.create_collection(
+                USAGE_COLLECTION,
+                timeseries={"timeField": "ts", "metaField": "meta", "granularity": "minutes"},
+                expireAfterSeconds=retention
+            )
+        except CollectionInvalid:
+            pass  # Another worker created it first
+        except OperationFailure as e:
+            logger.warning(f"Time-series collections unavailable, using a regular collection: {str(e)}")
+            await db[USAGE_COLLECTION].create_index("ts", expireAfterSeconds=retention)
+    await db[USAGE_COLLECTION].create_index([("meta.endpoint", 1), ("ts", 1)])
+    await db[USAGE_COLLECTION].create_index([("meta.user_id", 1), ("ts", 1)])
+    ai_usage.start()
+
+
+async def stop_ai_usage_meter():
+    await ai_usage.stop()
+
+
+async def usage_rollup(
+    group: str,
+    period: str,
+    since: datetime,
+    until: datetime,
+    user_id: Optional[str] = None,
+    limit: int = 1000
+) -> List[Dict[str, Any]]:
+    """Usage totals per ``period`` bucket and ``group`` key (see ``ROLLUP_GROUPS``), newest first.
+
+    At most ``limit`` rows; past that the oldest buckets are left out.
+    """
+    match: Dict[str, Any] = {"ts": {"$gte": since, "$lt": until}}
+    if user_id is not None:
+        match["meta.user_id"] = user_id
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "bucket": {"$dateToString": {"format": ROLLUP_FORMATS[period], "date": "$ts"}},
+                "key": f"${ROLLUP_GROUPS[group]}",
+            },
+            "calls": {"$sum": 1},
+            "cache_hits": {"$sum": {"$cond": ["$cache_hit", 1, 0]}},
+            "errors": {"$sum": {"$cond": ["$ok", 0, 1]}},
+            "prompt_tokens": {"$sum": "$prompt_tokens"},
+            "completion_tokens": {"$sum": "$completion_tokens"},
+            "cost_usd": {"$sum": "$cost_usd"},
+            # Upstream latency only; $avg skips the nulls of cache hits
+            "latency_avg_ms": {"$avg": {"$cond": ["$cache_hit", None, "$latency_ms"]}},
+            "latency_max_ms": {"$max": {"$cond": ["$cache_hit", None, "$latency_ms"]}},
+        }},
+        {"$sort": {"_id.bucket": -1, "calls": -1}},
+        {"$limit": limit},
+    ]
+    rows = []
+    async for doc in db[USAGE_COLLECTION].aggregate(pipeline):
+        key = doc.pop("_id")
+        rows.append({
+            "bucket": key["bucket"],
+            group: key["key"],
+            **doc,
+            "cost_usd": round(doc["cost_usd"], 6),
+            "latency_avg_ms": round(doc["latency_avg_ms"], 1) if doc["latency_avg_ms"] is not None else None,
+        })
+    return rows
@@ -0,0 +1,191 @@
+"""Local ATS keyword matching between a CV and a job description.
+
+Deterministic and fast, so /ai/optimize-for-job no longer needs the LLM for
+the match percentage or the matched/missing keyword lists.
+
+Keywords are the job description's words and two-word phrases (phrases never
+span punctuation or stopwords, so "Python and Django" is not one, nor pair
+two known skills, so "C++ C#" is not one either), with light plural folding.
+Each is weighted TF-IDF style: log-scaled term frequency in the job
+description times an inverse weight that discounts vocabulary common to
+every job posting ("experience", "team", ...), with a boost for phrases,
+which are usually more specific ("senior backend" is discounted like its
+generic half). The match percentage is the share of that weight the CV
+covers. Discounted terms count towards it but are never listed as keywords.
+"""
+import re
+from typing import Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.models.cv import CVData
+from app.utils.skill_extractor import COMMON_WORDS, SkillAutomaton, get_skill_automaton
+
+# A leading dot only at the start of a word, for ".NET"
+_TOKEN = re.compile(r"(?:(?<![\w.])\.)?[^\W_][\w+#.\-]*[\w+#]|[^\W_]", re.UNICODE)
+# Acronym plurals ("APIs", "SDKs"); folded before lowercasing hides them
+_ACRONYM_PLURAL = re.compile(r"\b([A-Z]{2,}[0-9]*)s\b")
+# Phrase boundaries: punctuation that separates list items or clauses
+_BREAK = re.compile(r"[,;:!?()\[\]{}/|\n•·]+|\.(?:\s|$)")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each etc few for from further had has have having he her here hers
+him his how i if in into is it its itself just may me might more most must my no nor not of off on once only or
+other our ours out over own per same shall she should so some such than that the their theirs them then there these
+they this those through to too under until up upon us very via was we well were what when where which while who
+whom why will with within without would you your yours yourself able across along among etc e.g i.e
+need needs needed get gets got like want wants make makes let lets one two three many much every another something anything
+ve ile bir bu da de için gibi olarak veya ya ve daha en çok az her hem ise ki mi mu mü olan olup
+""".split())
+
+# Words found in nearly every job posting: discounted like a high document frequency would
+GENERIC_TERMS = frozenset("""
+experience experienced years year work working job role position candidate candidates team teams strong good
+great excellent ability skill skills knowledge understanding responsibilities responsibility requirements required
+requirement preferred plus bonus including include includes new environment company opportunity opportunities
+looking join us help support ensure using use used across within various related relevant level senior junior
+minimum least degree equivalent field background proven track record demonstrated highly self motivated passion
+passionate fast paced dynamic day daily based business closely collaborate communication written verbal
+nice familiarity familiar proficiency proficient hands building
+ideal seeking seek apply applicant applicants qualification qualifications qualified duties duty benefits salary
+competitive offer offers successful following tasks task interest interested etc plus must-have nice-to-have
+hire hiring hired candidate's employer employee employees remote onsite hybrid office full-time part-time
+""".split())
+
+GENERIC_WEIGHT = 0.2
+BIGRAM_BOOST = 1.5
+MAX_KEYWORDS = 40
+MAX_MISSING = 15
+
+
+class ATSMatch(NamedTuple):
+    match_percentage: int
+    matched_keywords: List[str]
+    missing_keywords: List[str]
+
+
+def _fold(token: str) -> str:
+    """Light plural folding so "APIs" matches "API" and "services" matches "service"."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+_known_skills: Optional[FrozenSet[str]] = None
+_known_skills_source: Optional[SkillAutomaton] = None
+
+
+def known_skills() -> FrozenSet[str]:
+    """Folded one-word skills of the skill dictionary ("python", "c++", "node.js", ".net")."""
+    global _known_skills, _known_skills_source
+    automaton = get_skill_automaton()
+    if _known_skills is None or _known_skills_source is not automaton:
+        _known_skills_source = automaton
+        _known_skills = frozenset(
+            _fold(spelling) for spelling in automaton.patterns
+            if " " not in spelling and spelling not in COMMON_WORDS
+        )
+    return _known_skills
+
+
+def _runs(text: str) -> Iterator[List[str]]:
+    """Runs of consecutive lowercased non-stopword tokens; keeps "c++", "c#", "node.js"."""
+    for chunk in _BREAK.split(_ACRONYM_PLURAL.sub(r"\1", text).lower()):
+        run: List[str] = []
+        for token in _TOKEN.findall(chunk):
+            if token in STOPWORDS or not any(ch.isalpha() for ch in token):
+                if run:
+                    yield run
+                run = []
+            else:
+                run.append(token)
+        if run:
+            yield run
+
+
+def terms(text: str) -> List[Tuple[str, str]]:
+    """``(match key, display form)`` of every word and in-run two-word phrase."""
+    skills = known_skills()
+    result: List[Tuple[str, str]] = []
+    for run in _runs(text):
+        folded = [_fold(token) for token in run]
+        result.extend(zip(folded, run))
+        for i in range(len(run) - 1):
+            # Two skills side by side are a list written without commas, not a phrase
+            if folded[i] in skills and folded[i + 1] in skills:
+                continue
+            result.append((f"{folded[i]} {folded[i + 1]}", f"{run[i]} {run[i + 1]}"))
+    return result
+
+
+def cv_match_text(cv_data: CVData) -> str:
+    """The CV parts that count for ATS matching: summary, experiences and skills."""
+    parts = [cv_data.summary]
+    for experience in cv_data.experiences:
+        parts.extend((experience.position, experience.description))
+    parts.extend(skill.name for skill in cv_data.skills)
+    return "\n".join(p for p in parts if p)
+
+
+def _is_generic(term: str) -> bool:
+    return any(word in GENERIC_TERMS for word in term.split(" "))
+
+
+def _term_weights(vocabulary: List[str]) -> np.ndarray:
+    """Inverse weight per term: anything with a generic job-posting word is discounted, bigrams boosted."""
+    weights = np.ones(len(vocabulary))
+    for i, term in enumerate(vocabulary):
+        words = term.split(" ")
+        if _is_generic(term):
+            weights[i] = GENERIC_WEIGHT
+        elif len(words) > 1:
+            weights[i] = BIGRAM_BOOST
+    return weights
+
+
+def match_cv_to_job(cv_data: CVData, job_description: str) -> ATSMatch:
+    """Weighted keyword overlap between a CV and a job description."""
+    job_terms = terms(job_description)
+    if not job_terms:
+        return ATSMatch(0, [], [])
+
+    vocabulary: Dict[str, int] = {}
+    display: Dict[str, str] = {}
+    for key, surface in job_terms:
+        display.setdefault(key, surface)
+    job_ids = np.fromiter((vocabulary.setdefault(key, len(vocabulary)) for key, _ in job_terms), dtype=np.int64)
+    words = list(vocabulary)
+
+    tf = np.bincount(job_ids, minlength=len(words)).astype(float)
+    weights = (1.0 + np.log(tf)) * _term_weights(words)
+
+    cv_ids = [vocabulary[key] for key, _ in terms(cv_match_text(cv_data)) if key in vocabulary]
+    covered = np.bincount(np.asarray(cv_ids, dtype=np.int64), minlength=len(words)) > 0
+
+    # Keep the strongest specific keywords; drop unigrams already shown as part of a
+    # selected bigram, unless they are skills in their own right
+    skills = known_skills()
+    order = np.argsort(-weights, kind="stable")
+    selected: List[int] = []
+    in_bigrams = set()
+    for i in order:
+        term = words[i]
+        if _is_generic(term):
+            continue
+        if " " in term:
+            in_bigrams.update(term.split(" "))
+        elif term in in_bigrams and term not in skills:
+            continue
+        selected.append(int(i))
+        if len(selected) >= MAX_KEYWORDS:
+            break
+
+    # Generic terms count at their discounted weight but are never listed
+    scored = np.fromiter((_is_generic(term) for term in words), dtype=bool, count=len(words))
+    scored[selected] = True
+    total = weights[scored].sum()
+    percentage = int(round(100 * weights[scored & covered].sum() / total)) if total else 0
+
+    matched = [display[words[i]] for i in selected if covered[i]]
+    missing = [display[words[i]] for i in selected if not covered[i]][:MAX_MISSING]
+    return ATSMatch(percentage, matched, missing)
+
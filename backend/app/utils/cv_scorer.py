@@ -0,0 +1,248 @@
+"""Deterministic, rule-based CV scoring.
+
+Produces the same ``CVAnalysis`` shape as /ai/analyze in well under 5 ms,
+so it can be shown instantly as a pre-score while the AI analysis runs and
+returned instead of it when the AI fails. Scores come from:
+
+- content: quantified achievements, action verbs leading the bullets, length
+- formatting: section coverage, bullet structure, dates on every role
+- keywords: size of the skills list and how many skills the experience backs up
+- ats_compatibility: contact completeness and ATS-hostile formatting
+  (table pipes, decorative symbols, shouting capitals, HTML, photos)
+"""
+import re
+import unicodedata
+from typing import List, NamedTuple, Tuple
+from app.models.ai import CVAnalysis, ScoreBreakdown, Weakness
+from app.models.cv import CVData
+
+ACTION_VERBS = frozenset("""
+accelerated achieved acquired adapted administered advised analyzed architected arranged assembled assessed
+authored automated balanced boosted budgeted built captured chaired championed coached collaborated completed
+composed conceived conducted configured consolidated constructed consulted contributed controlled converted
+coordinated created cultivated cut debugged decreased defined delivered deployed designed developed devised
+diagnosed directed discovered doubled drafted drove eliminated enabled engineered enhanced established evaluated
+exceeded executed expanded expedited facilitated forecasted formulated founded generated grew guided halved
+headed identified implemented improved increased influenced initiated innovated inspected installed instituted
+integrated introduced invented launched led maintained managed maximized mentored merged migrated minimized
+modernized monitored motivated negotiated operated optimized orchestrated organized oversaw partnered performed
+piloted pioneered planned prepared presented prioritized produced programmed promoted proposed prototyped
+published raised rebuilt recruited redesigned reduced refactored reengineered resolved restructured revamped
+saved scaled secured shipped simplified solved spearheaded standardized streamlined strengthened supervised
+surpassed taught tested trained transformed tripled troubleshot unified upgraded won wrote
+""".split())
+
+# Turkish CVs put the verb last, in the past tense ("... kurdu", "... azalttım")
+_TURKISH_PAST_TENSE = re.compile(r"(?:d|t)[ıiuü](?:m|k|r|lar)?$")
+_NUMBER = re.compile(r"\d")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_HTML_TAG = re.compile(r"<[a-zA-Z/][^>]*>")
+_BULLET_MARKS = " \t-–—•*·▪►>"
+_WORD = re.compile(r"\w+")
+
+WALL_OF_TEXT_CHARS = 500
+TARGET_SKILLS = 8
+
+# Advice per score dimension; the weakest dimensions become the recommendations
+DIMENSION_ADVICE = {
+    "content": "Rework your experience bullets so each leads with an action verb and ends with a measurable result.",
+    "formatting": "Tidy the structure: standard sections, short bullet points and dates on every role.",
+    "keywords": "Use the exact skill names from the jobs you target and show each one in your experience.",
+    "ats_compatibility": "Keep the CV ATS-friendly: complete contact details and plain text without tables, symbols or photos.",
+}
+RECOMMEND_BELOW = 90
+MAX_RECOMMENDATIONS = 3
+
+
+class _Check(NamedTuple):
+    score: float
+    strength: str
+    issue: str
+    suggestion: str
+
+
+def _bullets(text: str) -> List[str]:
+    """Achievement lines of a description; sentences when it has no line breaks."""
+    lines = [line.strip(_BULLET_MARKS) for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    if len(lines) == 1:
+        lines = [s for s in _SENTENCE.split(lines[0]) if s.strip()]
+    return lines
+
+
+def _starts_with_action(bullet: str) -> bool:
+    words = bullet.split()
+    if not words:
+        return False
+    if words[0].lower().strip(",.;:") in ACTION_VERBS:
+        return True
+    return bool(_TURKISH_PAST_TENSE.search(words[-1].lower().rstrip(".!;:")))
+
+
+def _ramp(value: float, low: float, high: float) -> float:
+    """0 at ``low``, 1 at ``high`` and beyond, linear in between."""
+    if high == low:
+        return 1.0 if value >= high else 0.0
+    return max(0.0, min(1.0, (value - low) / (high - low)))
+
+
+def _length_score(words: int) -> float:
+    if words < 250:
+        return _ramp(words, 50, 250)
+    return 1.0 - _ramp(words, 900, 1600) * 0.5
+
+
+def _hazards(texts: List[str]) -> List[Tuple[str, str]]:
+    """ATS-hostile formatting found in free text, as (issue, suggestion)."""
+    found = []
+    joined = "\n".join(texts)
+    if "|" in joined or "\t" in joined:
+        found.append(("Table-like layout with pipes or tabs", "Write achievements as plain bullet points; ATS parsers scramble table columns."))
+    if any(unicodedata.category(ch) == "So" for ch in joined):
+        found.append(("Decorative symbols or emoji", "Remove icons and symbols; many ATS parsers drop or garble them."))
+    if _HTML_TAG.search(joined):
+        found.append(("HTML markup in the text", "Remove HTML tags and keep plain text."))
+    shouting = [line for line in joined.splitlines() if len(line.split()) > 3 and line.isupper()]
+    if shouting:
+        found.append(("Lines written in all capitals", "Use normal capitalization; all-caps text is harder to parse and read."))
+    return found
+
+
+def score_cv(cv_data: CVData) -> CVAnalysis:
+    """Rule-based analysis of ``cv_data`` in the /ai/analyze response shape."""
+    personal = cv_data.personal_info
+    experiences = cv_data.experiences
+    descriptions = [e.description for e in experiences if e.description.strip()]
+    bullets = [bullet for text in descriptions for bullet in _bullets(text)]
+    free_text = [cv_data.summary, *descriptions, *(p.description for p in cv_data.projects)]
+
+    # Content
+    quantified = sum(1 for b in bullets if _NUMBER.search(b)) / len(bullets) if bullets else 0.0
+    action = sum(1 for b in bullets if _starts_with_action(b)) / len(bullets) if bullets else 0.0
+    words = sum(len(_WORD.findall(text)) for text in free_text if text)
+    summary_words = len(_WORD.findall(cv_data.summary))
+
+    checks = [
+        _Check(
+            _ramp(quantified, 0, 0.5),
+            "Achievements are backed by numbers",
+            "Few quantified achievements",
+            "Add measurable results (percentages, amounts, team sizes, time saved) to your experience bullets."
+        ),
+        _Check(
+            _ramp(action, 0, 0.6),
+            "Bullets lead with strong action verbs",
+            "Bullets rarely start with an action verb",
+            "Start each bullet with a verb such as 'Led', 'Built', 'Reduced' or 'Launched'."
+        ),
+        _Check(
+            _length_score(words),
+            "Appropriate length and level of detail",
+            "CV is too short" if words < 250 else "CV is too long",
+            "Describe your main roles in 3-5 bullets each." if words < 250
+            else "Trim older or less relevant roles to keep the CV focused."
+        ),
+        _Check(
+            _ramp(summary_words, 0, 25) - _ramp(summary_words, 120, 240) * 0.5,
+            "Focused professional summary",
+            "Summary is missing or too short" if summary_words < 120 else "Summary is too long",
+            "Open with a 2-4 sentence summary of your experience, strengths and target role." if summary_words < 120
+            else "Cut the summary to 2-4 sentences; details belong in the experience section."
+        ),
+    ]
+    content = 0.3 * checks[0].score + 0.3 * checks[1].score + 0.25 * checks[2].score + 0.15 * checks[3].score
+
+    # Formatting
+    core = [bool(cv_data.summary.strip()), bool(experiences), bool(cv_data.education), bool(cv_data.skills)]
+    extras = [bool(cv_data.languages), bool(cv_data.certificates), bool(cv_data.projects)]
+    coverage = 0.8 * sum(core) / len(core) + 0.2 * sum(extras) / len(extras)
+    walls = sum(1 for text in descriptions if len(text) > WALL_OF_TEXT_CHARS and "\n" not in text.strip())
+    # Without any experience only the coverage check applies
+    structure = 1.0 - walls / len(descriptions) if descriptions else 1.0
+    dated = sum(1 for e in experiences if e.start_date and (e.end_date or e.current)) / len(experiences) if experiences else 1.0
+
+    checks.append(_Check(
+        coverage,
+        "Covers all the standard CV sections",
+        "Standard sections are missing",
+        "Include a summary, work experience, education and skills; languages, certificates and projects help too."
+    ))
+    if experiences:
+        checks += [
+            _Check(
+                structure,
+                "Experience is organized in scannable bullets",
+                "Long paragraphs in the experience section",
+                "Break long descriptions into short bullet points, one achievement each."
+            ),
+            _Check(
+                dated,
+                "Every role has clear dates",
+                "Some roles are missing dates",
+                "Add start and end dates (or mark as current) for every position."
+            ),
+        ]
+    formatting = 0.5 * coverage + 0.3 * structure + 0.2 * dated
+
+    # Keywords
+    skill_names = [s.name.strip() for s in cv_data.skills if s.name.strip()]
+    evidence = "\n".join([*descriptions, *(p.description for p in cv_data.projects),
+                          *(t for p in cv_data.projects for t in p.technologies)]).lower()
+    backed = sum(1 for name in skill_names if name.lower() in evidence) / len(skill_names) if skill_names else 0.0
+    checks += [
+        _Check(
+            _ramp(len(skill_names), 0, TARGET_SKILLS),
+            "Comprehensive skills list",
+            "Skills list is short",
+            f"List at least {TARGET_SKILLS} relevant skills, using the exact names employers use."
+        ),
+        _Check(
+            _ramp(backed, 0, 0.5),
+            "Skills are backed up by the experience described",
+            "Listed skills do not appear in your experience",
+            "Mention where you used your key skills in your experience and project descriptions."
+        ),
+    ]
+    keywords = 0.6 * checks[-2].score + 0.4 * checks[-1].score
+
+    # ATS compatibility
+    contact = [personal.full_name, personal.email, personal.phone, personal.location]
+    completeness = (sum(1 for field in contact if field.strip()) + 0.5 * bool(personal.linkedin or personal.website)) / 4.5
+    hazards = _hazards([text for text in free_text if text])
+    if personal.photo_url:
+        hazards.append(("Photo included", "Many ATS and employers in some countries prefer CVs without photos."))
+    cleanliness = max(0.0, 1.0 - 0.25 * len(hazards))
+    checks.append(_Check(
+        completeness,
+        "Complete contact information",
+        "Contact information is incomplete",
+        "Add your full name, email, phone, location and a LinkedIn or website link."
+    ))
+    ats = 0.5 * completeness + 0.5 * cleanliness
+
+    breakdown = ScoreBreakdown(
+        content=100 * content,
+        formatting=100 * formatting,
+        keywords=100 * keywords,
+        ats_compatibility=100 * ats
+    )
+    overall = 0.35 * breakdown.content + 0.2 * breakdown.formatting + 0.2 * breakdown.keywords + 0.25 * breakdown.ats_compatibility
+
+    # Lowest-scoring dimensions first; even a strong CV gets advice on its weakest one
+    dimensions = sorted(breakdown.model_dump().items(), key=lambda item: item[1])
+    recommendations = [DIMENSION_ADVICE[name] for name, score in dimensions if score < RECOMMEND_BELOW]
+    if not recommendations and dimensions[0][1] < 100:
+        recommendations = [DIMENSION_ADVICE[dimensions[0][0]]]
+
+    weak = sorted((c for c in checks if c.score < 0.7), key=lambda c: c.score)
+    weaknesses = [Weakness(issue=c.issue, suggestion=c.suggestion) for c in weak]
+    weaknesses += [Weakness(issue=issue, suggestion=suggestion) for issue, suggestion in hazards]
+    return CVAnalysis(
+        overall_score=overall,
+        breakdown=breakdown,
+        strengths=[c.strength for c in sorted(checks, key=lambda c: -c.score) if c.score >= 0.9][:5],
+        weaknesses=weaknesses[:5],
+        missing_keywords=[],
+        recommendations=recommendations[:MAX_RECOMMENDATIONS],
+        source="local"
+    )
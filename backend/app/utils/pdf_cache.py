@@ -0,0 +1,154 @@
+"""Content-addressed cache for rendered CV PDFs.
+
+Rendered PDFs are keyed by a hash of everything that affects the output, so an
+unchanged CV is served without re-rendering. Lookups go through an in-process
+LRU bounded by total bytes, then a persistent GridFS bucket shared by all
+workers.
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from app.core.config import settings
+from app.core.database import db
+from app.core.logging import logger
+from app.models.cv import CV
+from app.models.user import User
+from app.utils.pdf_executor import render_cv_pdf
+from app.utils.pdf_generator import TEMPLATE_VERSION
+from app.utils.pdf_optimizer import optimize_level
+from app.utils.pdf_renderers import backend_for_template
+
+
+def pdf_cache_key(cv: CV, user: User) -> str:
+    """Stable hash of the CV content, settings, template version, backend, optimization and watermark flag."""
+    payload = {
+        "data": cv.data.model_dump(mode="json"),
+        "settings": cv.settings.model_dump(mode="json"),
+        "template_version": TEMPLATE_VERSION,
+        "backend": backend_for_template(cv.settings.template),
+        "optimize": optimize_level(),
+        "watermark": not user.is_pro,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def cache_metadata(cv_id: str, user_id: str) -> dict:
+    """GridFS metadata stored with every cached render."""
+    return {
+        "cv_id": cv_id,
+        "user_id": user_id,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against a strong ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class PDFCache:
+    """Two-tier PDF cache: byte-budgeted in-memory LRU backed by GridFS."""
+
+    def __init__(self, max_memory_bytes: int, bucket_name: str = "pdf_cache"):
+        self.max_memory_bytes = max_memory_bytes
+        self.bucket_name = bucket_name
+        # key -> (pdf bytes, cv_id)
+        self._entries: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._bucket: Optional[AsyncIOMotorGridFSBucket] = None
+
+    @property
+    def bucket(self) -> AsyncIOMotorGridFSBucket:
+        if self._bucket is None:
+            self._bucket = AsyncIOMotorGridFSBucket(db, bucket_name=self.bucket_name)
+        return self._bucket
+
+    def _remember(self, key: str, pdf_bytes: bytes, cv_id: str):
+        """Insert into the memory tier, evicting least recently used entries."""
+        if len(pdf_bytes) > self.max_memory_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+        self._entries[key] = (pdf_bytes, cv_id)
+        self._memory_bytes += len(pdf_bytes)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _forget(self, matches):
+        """Drop memory tier entries for which ``matches(key, cv_id)`` is true."""
+        for key in [key for key, (_, cv_id) in self._entries.items() if matches(key, cv_id)]:
+            pdf_bytes, _ = self._entries.pop(key)
+            self._memory_bytes -= len(pdf_bytes)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return cached PDF bytes for ``key``, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        try:
+            stream = await self.bucket.open_download_stream_by_name(key)
+            pdf_bytes = await stream.read()
+        except NoFile:
+            return None
+        except Exception as e:
+            logger.warning(f"PDF cache read failed: {str(e)}", extra={"error_type": type(e).__name__})
+            return None
+
+        self._remember(key, pdf_bytes, (stream.metadata or {}).get("cv_id", ""))
+        return pdf_bytes
+
+    async def put(self, key: str, pdf_bytes: bytes, cv_id: str, user_id: str):
+        """Store a rendered PDF and drop older renders of the same CV."""
+        self._forget(lambda entry_key, entry_cv_id: entry_cv_id == cv_id and entry_key != key)
+        self._remember(key, pdf_bytes, cv_id)
+        try:
+            await self.bucket.upload_from_stream(
+                key,
+                pdf_bytes,
+                metadata=cache_metadata(cv_id, user_id)
+            )
+            await self._delete_files({"metadata.cv_id": cv_id, "filename": {"$ne": key}})
+        except Exception as e:
+            logger.warning(f"PDF cache write failed: {str(e)}", extra={"cv_id": cv_id, "error_type": type(e).__name__})
+
+    async def evict_cv(self, cv_id: str):
+        """Remove every cached render of a CV (e.g. after it is deleted)."""
+        self._forget(lambda entry_key, entry_cv_id: entry_cv_id == cv_id)
+        try:
+            await self._delete_files({"metadata.cv_id": cv_id})
+        except Exception as e:
+            logger.warning(f"PDF cache eviction failed: {str(e)}", extra={"cv_id": cv_id, "error_type": type(e).__name__})
+
+    async def _delete_files(self, query: dict):
+        async for grid_file in self.bucket.find(query):
+            await self.bucket.delete(grid_file._id)
+
+
+pdf_cache = PDFCache(max_memory_bytes=settings.pdf_cache_memory_mb * 1024 * 1024)
+
+
+async def get_or_render_pdf(cv: CV, user: User, cache_key: Optional[str] = None) -> bytes:
+    """Serve a CV's PDF from the cache, rendering and storing it on a miss."""
+    cache_key = cache_key or pdf_cache_key(cv, user)
+    pdf_bytes = await pdf_cache.get(cache_key)
+    if pdf_bytes is not None:
+        logger.info(f"PDF served from cache: {cv.cv_id}", extra={"user_id": user.user_id})
+        return pdf_bytes
+
+    # Generate PDF with sanitization in the render worker pool
+    pdf_bytes = await render_cv_pdf(cv, user)
+    await pdf_cache.put(cache_key, pdf_bytes, cv_id=cv.cv_id, user_id=user.user_id)
+    logger.info(f"PDF generated: {cv.cv_id}", extra={"user_id": user.user_id})
+    return pdf_bytes
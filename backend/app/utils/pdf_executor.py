@@ -0,0 +1,200 @@
+"""Bounded process pool for PDF rendering.
+
+xhtml2pdf is synchronous and CPU-bound, so rendering inside a request handler
+stalls the event loop for every other route on the worker. Renders are handed
+to a small pool of worker processes instead, with a bounded backlog, per-job
+timeouts and periodic recycling of the workers.
+
+Only as many jobs as there are workers are handed to the pool; the rest wait
+on the event loop, so a job's render timeout starts when a worker takes it.
+The timeout is enforced inside the worker with a timer signal, which leaves
+the worker (and the other renders) running. The pool is only killed when a
+render ignores that signal, e.g. stuck in C code, and jobs that lose their
+worker that way are retried once on the fresh pool.
+"""
+import asyncio
+import math
+import multiprocessing
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.cv import CV
+from app.models.user import User
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of the current process in bytes (0 if unknown)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# Seconds past the render timeout before a render that ignores it is killed
+HARD_TIMEOUT_GRACE = 5.0
+
+
+class RenderTimeout(Exception):
+    """Raised inside a worker when a render runs past its timeout."""
+
+
+def _raise_render_timeout(signum, frame):
+    raise RenderTimeout()
+
+
+def _render_job(cv: CV, user: User, timeout: float) -> Tuple[bytes, int]:
+    """Worker entry point: render one CV within ``timeout`` and report the worker's peak RSS."""
+    from app.utils.pdf_generator import generate_cv_pdf
+
+    # No SIGALRM on Windows; the hard timeout in the parent still applies
+    alarm = timeout > 0 and hasattr(signal, "SIGALRM")
+    if alarm:
+        signal.signal(signal.SIGALRM, _raise_render_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        pdf_bytes = generate_cv_pdf(cv, user)
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return pdf_bytes, peak_rss_bytes()
+
+
+class PDFRenderExecutor:
+    """Process pool with a bounded backlog and worker recycling.
+
+    All bookkeeping happens on the event loop thread, so no locking is needed.
+    Workers are recycled as a generation: once the pool has completed
+    ``max_renders`` renders per worker, or any worker reports a peak RSS above
+    ``max_rss_mb``, a fresh pool takes new jobs and the old one drains.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        timeout: float,
+        max_renders: int,
+        max_rss_mb: int
+    ):
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.timeout = timeout
+        self.max_renders = max_renders
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self._context = multiprocessing.get_context("spawn")
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._renders = 0
+        self._pending = 0
+        # Jobs handed to the pool; never more than there are workers
+        self._slots = asyncio.Semaphore(self.workers)
+
+    @property
+    def max_wait(self) -> float:
+        """Longest a ``render`` call can take: behind a full backlog, then its own render and one retry."""
+        rounds = math.ceil(self.capacity / self.workers) + 1
+        return rounds * (self.timeout + HARD_TIMEOUT_GRACE)
+
+    @property
+    def pending(self) -> int:
+        """Jobs currently running or waiting for a worker."""
+        return self._pending
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context)
+            self._renders = 0
+        return self._pool
+
+    def _recycle(self, pool: ProcessPoolExecutor, reason: str, kill: bool = False):
+        """Retire ``pool`` so that the next job starts a fresh one."""
+        if self._pool is not pool:
+            return
+        self._pool = None
+        logger.info(f"Recycling PDF worker pool: {reason}")
+        if kill:
+            # A hung render cannot be cancelled, only terminated
+            for process in list((getattr(pool, "_processes", None) or {}).values()):
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=kill)
+
+    async def render(self, cv: CV, user: User) -> bytes:
+        """Render ``cv`` in a worker process, rejecting work when the backlog is full."""
+        if self._pending >= self.capacity:
+            logger.warning("PDF render queue full", extra={"user_id": user.user_id})
+            raise HTTPException(
+                status_code=503,
+                detail="PDF service is busy. Please try again shortly.",
+                headers={"Retry-After": "5"}
+            )
+
+        self._pending += 1
+        try:
+            async with self._slots:
+                return await self._run(cv, user)
+        finally:
+            self._pending -= 1
+
+    async def _run(self, cv: CV, user: User, retry: bool = True) -> bytes:
+        """Run one job on a worker that is free now, so the timeout covers only the render."""
+        pool = self._get_pool()
+        try:
+            future = asyncio.wrap_future(pool.submit(_render_job, cv, user, self.timeout))
+            pdf_bytes, peak_rss = await asyncio.wait_for(future, timeout=self.timeout + HARD_TIMEOUT_GRACE)
+        except RenderTimeout:
+            logger.error(f"PDF render timed out after {self.timeout}s", extra={"user_id": user.user_id})
+            raise HTTPException(status_code=504, detail="PDF generation timed out")
+        except asyncio.TimeoutError:
+            logger.error(f"PDF render ignored its {self.timeout}s timeout", extra={"user_id": user.user_id})
+            self._recycle(pool, "render hung", kill=True)
+            raise HTTPException(status_code=504, detail="PDF generation timed out")
+        except BrokenProcessPool:
+            self._recycle(pool, "worker died")
+            if retry:
+                # Usually collateral of a killed hung render, so one more try is worthwhile
+                return await self._run(cv, user, retry=False)
+            raise
+
+        if self._pool is pool:
+            self._renders += 1
+            if self.max_rss_bytes and peak_rss > self.max_rss_bytes:
+                self._recycle(pool, f"worker RSS {peak_rss // (1024 * 1024)} MB over ceiling")
+            elif self.max_renders and self._renders >= self.max_renders * self.workers:
+                self._recycle(pool, f"{self._renders} renders completed")
+
+        return pdf_bytes
+
+    def shutdown(self):
+        """Stop the pool without waiting for in-flight renders."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+pdf_executor = PDFRenderExecutor(
+    workers=settings.pdf_workers,
+    queue_size=settings.pdf_queue_size,
+    timeout=settings.pdf_render_timeout,
+    max_renders=settings.pdf_worker_max_renders,
+    max_rss_mb=settings.pdf_worker_max_rss_mb
+)
+
+
+async def render_cv_pdf(cv: CV, user: User) -> bytes:
+    """Render a CV to PDF off the event loop."""
+    return await pdf_executor.render(cv, user)
+
+
+def shutdown_pdf_executor():
+    """Stop PDF worker processes on application shutdown."""
+    pdf_executor.shutdown()
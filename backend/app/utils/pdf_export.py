@@ -0,0 +1,137 @@
+"""Streaming ZIP export of rendered CV PDFs.
+
+CVs are read from a cursor and rendered with a bounded fan-out. Each PDF is
+written to the archive as soon as it finishes and the bytes are flushed to
+the client right away, so neither the CV list nor the archive is ever held
+in memory as a whole.
+
+Only CVs that fail to render are listed in the archive's ``errors.txt``.
+When the PDF pool is saturated (503) a render is retried after the pool's
+``Retry-After``; if it stays saturated the 503 propagates and the export
+fails as a whole instead of returning an archive with CVs missing.
+"""
+import asyncio
+import io
+import re
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Set, Tuple
+from fastapi import HTTPException
+from app.core.logging import logger
+from app.models.cv import CV
+from app.models.user import User
+from app.utils.pdf_cache import get_or_render_pdf
+
+_UNSAFE_FILENAME = re.compile(r"[^\w\- .,()]+", re.UNICODE)
+
+# Retries of a render rejected because the PDF pool is full
+CAPACITY_RETRIES = 3
+
+
+class _ChunkWriter(io.RawIOBase):
+    """Write-only, unseekable sink that hands out what was written since the last drain.
+
+    Being unseekable makes ``zipfile`` emit data descriptors instead of
+    seeking back to patch local headers, which is what allows streaming.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archive_name(title: str, taken: Set[str]) -> str:
+    """Filesystem-safe, unique ``.pdf`` entry name for a CV title."""
+    base = _UNSAFE_FILENAME.sub("_", title).strip(" ._") or "CV"
+    name = f"{base}.pdf"
+    counter = 2
+    while name in taken:
+        name = f"{base} ({counter}).pdf"
+        counter += 1
+    taken.add(name)
+    return name
+
+
+async def _render_entry(cv: CV, user: User) -> Tuple[CV, Optional[bytes]]:
+    """Render one CV; ``None`` for a CV that cannot be rendered, raises 503 if the pool stays full."""
+    for attempt in range(CAPACITY_RETRIES + 1):
+        try:
+            return cv, await get_or_render_pdf(cv, user)
+        except HTTPException as e:
+            if e.status_code != 503:
+                logger.error(f"Export render error: {e.detail}", extra={"cv_id": cv.cv_id, "user_id": user.user_id})
+                return cv, None
+            if attempt == CAPACITY_RETRIES:
+                logger.warning("Export aborted, PDF service busy", extra={"cv_id": cv.cv_id, "user_id": user.user_id})
+                raise
+            await asyncio.sleep(float((e.headers or {}).get("Retry-After", 5)))
+        except Exception as e:
+            logger.error(f"Export render error: {str(e)}", extra={"cv_id": cv.cv_id, "user_id": user.user_id, "error_type": type(e).__name__})
+            return cv, None
+
+
+async def render_as_completed(
+    cursor,
+    user: User,
+    concurrency: int
+) -> AsyncIterator[Tuple[CV, Optional[bytes]]]:
+    """Render CVs from ``cursor`` with at most ``concurrency`` in flight, yielding in completion order."""
+    pending: Set[asyncio.Task] = set()
+    done: Set[asyncio.Task] = set()
+    try:
+        async for doc in cursor:
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.create_task(_render_entry(CV(**doc), user)))
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # Client went away mid-export: don't leave renders running for nobody
+        for task in pending:
+            task.cancel()
+        # A 503 aborts the export; finished siblings still need their outcome retrieved
+        for task in done:
+            if not task.cancelled():
+                task.exception()
+
+
+async def stream_cv_zip(cursor, user: User, concurrency: int) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of the CVs in ``cursor`` entry by entry."""
+    writer = _ChunkWriter()
+    taken: Set[str] = set()
+    failed: List[str] = []
+    exported = 0
+
+    # PDFs are already compressed; deflating them again only costs CPU
+    with zipfile.ZipFile(writer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        async for cv, pdf_bytes in render_as_completed(cursor, user, concurrency):
+            if pdf_bytes is None:
+                failed.append(cv.title)
+                continue
+            entry = zipfile.ZipInfo(archive_name(cv.title, taken), date_time=datetime.now().timetuple()[:6])
+            archive.writestr(entry, pdf_bytes)
+            exported += 1
+            yield writer.drain()
+
+        if failed:
+            archive.writestr("errors.txt", "Could not render:\n" + "\n".join(failed) + "\n")
+
+    logger.info(f"CV export finished: {exported} PDFs, {len(failed)} failed", extra={"user_id": user.user_id})
+    yield writer.drain()
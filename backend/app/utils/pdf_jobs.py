@@ -0,0 +1,235 @@
+"""Asynchronous PDF render jobs.
+
+Jobs live in ``db.pdf_jobs``, which doubles as the queue: runner tasks on
+every app worker atomically claim the oldest queued job, render it through
+the shared process pool and store the result in the PDF cache. Clients poll
+the job or subscribe to its status events instead of holding a request open
+for the whole render. Finished jobs expire ``PDF_JOB_TTL`` seconds after
+``finished_at`` through a Mongo TTL index.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Set
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+from app.core.database import db
+from app.core.logging import logger
+from app.models.cv import CV
+from app.models.user import User
+from app.utils.pdf_cache import pdf_cache, pdf_cache_key, get_or_render_pdf
+from app.utils.pdf_executor import pdf_executor
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+TERMINAL_STATES = (JOB_DONE, JOB_FAILED)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _utc(value: datetime) -> datetime:
+    """Mongo hands back naive UTC datetimes."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _elapsed_ms(start: datetime, end: datetime) -> int:
+    return int((_utc(end) - _utc(start)).total_seconds() * 1000)
+
+
+def _public(job: dict) -> dict:
+    """Job document as returned to clients, with its dates as ISO strings."""
+    for field in ("created_at", "started_at", "finished_at"):
+        if isinstance(job.get(field), datetime):
+            job[field] = _utc(job[field]).isoformat()
+    return job
+
+
+class PDFJobRunner:
+    """Pulls queued jobs from Mongo and renders them with bounded concurrency."""
+
+    def __init__(self, concurrency: int, poll_interval: float = 1.0, busy_backoff: float = 2.0):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.busy_backoff = busy_backoff
+        # A job still "running" after this long belongs to a dead worker; a live one may
+        # first wait behind the whole render backlog
+        self.stale_after = timedelta(seconds=pdf_executor.max_wait)
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        # One event per waiting listener, so several streams can follow the same job
+        self._job_events: Dict[str, Set[asyncio.Event]] = {}
+
+    def start(self):
+        """Start runner tasks on the current event loop."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        logger.info(f"PDF job runners started: {self.concurrency}")
+
+    async def stop(self):
+        """Cancel runner tasks; claimed jobs are picked up again once stale."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, cv: CV, user: User) -> dict:
+        """Queue a render for ``cv`` and return the job document."""
+        now = _now()
+        cache_key = pdf_cache_key(cv, user)
+        job = {
+            "job_id": f"pdfjob_{uuid.uuid4().hex[:12]}",
+            "cv_id": cv.cv_id,
+            "user_id": user.user_id,
+            "status": JOB_QUEUED,
+            "cache_key": cache_key,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "queue_ms": None,
+            "render_ms": None,
+        }
+
+        # Nothing to render if this exact CV is already cached
+        if await pdf_cache.get(cache_key) is not None:
+            job.update({
+                "status": JOB_DONE,
+                "started_at": now,
+                "finished_at": now,
+                "queue_ms": 0,
+                "render_ms": 0,
+            })
+
+        await db.pdf_jobs.insert_one(job)
+        job.pop("_id", None)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return _public(job)
+
+    async def get_job(self, job_id: str, user_id: str) -> Optional[dict]:
+        """Fetch a job owned by ``user_id``."""
+        job = await db.pdf_jobs.find_one({"job_id": job_id, "user_id": user_id}, {"_id": 0})
+        return _public(job) if job else None
+
+    async def wait_for_change(self, job_id: str, timeout: float):
+        """Sleep until a local runner updates ``job_id`` or ``timeout`` elapses."""
+        event = asyncio.Event()
+        listeners = self._job_events.setdefault(job_id, set())
+        listeners.add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            listeners.discard(event)
+            if not listeners and self._job_events.get(job_id) is listeners:
+                del self._job_events[job_id]
+
+    async def _run(self):
+        while True:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"PDF job claim error: {str(e)}", extra={"error_type": type(e).__name__})
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._process(job)
+
+    async def _claim(self) -> Optional[dict]:
+        now = _now()
+        stale_cutoff = now - self.stale_after
+        return await db.pdf_jobs.find_one_and_update(
+            {"$or": [
+                {"status": JOB_QUEUED},
+                {"status": JOB_RUNNING, "started_at": {"$lt": stale_cutoff}},
+            ]},
+            {"$set": {"status": JOB_RUNNING, "started_at": now}},
+            sort=[("created_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _update(self, job_id: str, fields: dict):
+        await db.pdf_jobs.update_one({"job_id": job_id}, {"$set": fields})
+        for event in self._job_events.pop(job_id, ()):
+            event.set()
+
+    async def _process(self, job: dict):
+        job_id = job["job_id"]
+        started = _utc(job["started_at"])
+        try:
+            cv_doc = await db.cvs.find_one({"cv_id": job["cv_id"], "user_id": job["user_id"]}, {"_id": 0})
+            user_doc = await db.users.find_one({"user_id": job["user_id"]}, {"_id": 0})
+            if not cv_doc or not user_doc:
+                raise LookupError("CV not found")
+
+            cv = CV(**cv_doc)
+            user = User(**user_doc)
+            # The CV may have been edited since submission; key the result on what is rendered
+            cache_key = pdf_cache_key(cv, user)
+            await self._update(job_id, {"queue_ms": _elapsed_ms(job["created_at"], started)})
+
+            await get_or_render_pdf(cv, user, cache_key)
+
+            finished = _now()
+            await self._update(job_id, {
+                "status": JOB_DONE,
+                "cache_key": cache_key,
+                "finished_at": finished,
+                "render_ms": int((finished - started).total_seconds() * 1000),
+            })
+            logger.info(f"PDF job done: {job_id}", extra={"user_id": job["user_id"]})
+
+        except HTTPException as e:
+            if e.status_code == 503:
+                # Pool saturated by synchronous downloads; put the job back and retry later
+                await self._update(job_id, {"status": JOB_QUEUED, "started_at": None})
+                await asyncio.sleep(self.busy_backoff)
+                return
+            await self._fail(job_id, e.detail)
+        except Exception as e:
+            logger.error(f"PDF job error: {str(e)}", extra={"job_id": job_id, "error_type": type(e).__name__})
+            await self._fail(job_id, "Failed to generate PDF")
+
+    async def _fail(self, job_id: str, error: str):
+        await self._update(job_id, {
+            "status": JOB_FAILED,
+            "error": error,
+            "finished_at": _now(),
+        })
+
+
+pdf_jobs = PDFJobRunner(concurrency=settings.pdf_job_runners)
+
+
+async def start_pdf_job_runners():
+    """Ensure indexes and start job runners on application startup."""
+    await db.pdf_jobs.create_index("job_id", unique=True)
+    await db.pdf_jobs.create_index([("status", 1), ("created_at", 1)])
+    try:
+        await db.pdf_jobs.create_index("finished_at", expireAfterSeconds=settings.pdf_job_ttl)
+    except OperationFailure:
+        # PDF_JOB_TTL changed since the index was created
+        await db.command("collMod", "pdf_jobs", index={"keyPattern": {"finished_at": 1}, "expireAfterSeconds": settings.pdf_job_ttl})
+    pdf_jobs.start()
+
+
+async def stop_pdf_job_runners():
+    """Stop job runners on application shutdown."""
+    await pdf_jobs.stop()
@@ -0,0 +1,135 @@
+"""Post-render size optimization for generated PDFs.
+
+Levels (``PDF_OPTIMIZE_LEVEL``):
+
+- ``none``: bytes are returned as the renderer produced them.
+- ``lossless``: Flate-compress content streams (xhtml2pdf writes them
+  uncompressed), merge duplicate objects and drop unreferenced ones.
+- ``max``: ``lossless`` plus downsampling of images drawn at more than
+  ``PDF_IMAGE_DPI`` for their size on the page, re-encoded as JPEG where
+  they have no transparency.
+
+Embedded TrueType fonts are already subset by both backends (ReportLab and
+WeasyPrint), and the base-14 fonts are never embedded, so fonts are left
+alone. Optimization never fails a render: on any error the original bytes
+are returned.
+"""
+import math
+from io import BytesIO
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.logging import logger
+
+LEVEL_NONE = "none"
+LEVEL_LOSSLESS = "lossless"
+LEVEL_MAX = "max"
+OPTIMIZE_LEVELS = (LEVEL_NONE, LEVEL_LOSSLESS, LEVEL_MAX)
+
+# Don't re-encode images that are only marginally over the target resolution
+DOWNSAMPLE_THRESHOLD = 1.25
+JPEG_QUALITY = 85
+
+_IDENTITY = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+
+
+def optimize_level() -> str:
+    """Configured optimization level, falling back to lossless for unknown values."""
+    level = settings.pdf_optimize_level
+    return level if level in OPTIMIZE_LEVELS else LEVEL_LOSSLESS
+
+
+def _multiply(m: List[float], n: List[float]) -> List[float]:
+    """Concatenate two PDF transformation matrices (``m`` applied first)."""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return [
+        a * a2 + b * c2, a * b2 + b * d2,
+        c * a2 + d * c2, c * b2 + d * d2,
+        e * a2 + f * c2 + e2, e * b2 + f * d2 + f2,
+    ]
+
+
+def _image_placements(page) -> Dict[str, float]:
+    """Largest on-page width in points of each XObject drawn directly on ``page``."""
+    from pypdf.generic import ContentStream
+
+    contents = page.get_contents()
+    if contents is None:
+        return {}
+
+    placements: Dict[str, float] = {}
+    ctm, stack = _IDENTITY, []
+    for operands, operator in ContentStream(contents, page.pdf).operations:
+        if operator == b"q":
+            stack.append(ctm)
+        elif operator == b"Q":
+            ctm = stack.pop() if stack else _IDENTITY
+        elif operator == b"cm":
+            ctm = _multiply([float(x) for x in operands], ctm)
+        elif operator == b"Do":
+            name = str(operands[0])
+            placements[name] = max(placements.get(name, 0.0), math.hypot(ctm[0], ctm[1]))
+    return placements
+
+
+def _downsample_images(page, dpi: int) -> int:
+    """Shrink images drawn at more than ``dpi``; returns how many were replaced."""
+    from PIL import Image
+
+    xobjects = page.get("/Resources", {}).get("/XObject", {})
+    if not any(xobject.get_object().get("/Subtype") == "/Image" for xobject in xobjects.values()):
+        return 0  # Skip parsing the content stream of text-only pages
+
+    replaced = 0
+    for name, width_pt in _image_placements(page).items():
+        if width_pt <= 0:
+            continue
+        try:
+            image_file = page.images[name]
+        except (KeyError, IndexError):
+            continue  # Not an image (e.g. a form XObject)
+
+        image = image_file.image
+        target_width = math.ceil(width_pt / 72 * dpi)
+        if image is None or image.width <= target_width * DOWNSAMPLE_THRESHOLD:
+            continue
+
+        target_height = max(1, round(image.height * target_width / image.width))
+        resized = image.resize((target_width, target_height), Image.LANCZOS)
+        if resized.mode in ("RGB", "L", "CMYK"):
+            image_file.replace(resized, quality=JPEG_QUALITY)
+        else:
+            image_file.replace(resized)
+        replaced += 1
+    return replaced
+
+
+def optimize_pdf(pdf_bytes: bytes, level: Optional[str] = None) -> bytes:
+    """Apply the optimization ``level`` (default: configured) to a rendered PDF."""
+    level = level or optimize_level()
+    if level == LEVEL_NONE:
+        return pdf_bytes
+
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        logger.warning("pypdf is not installed; PDF optimization skipped")
+        return pdf_bytes
+
+    try:
+        writer = PdfWriter(clone_from=BytesIO(pdf_bytes))
+        for page in writer.pages:
+            if level == LEVEL_MAX:
+                _downsample_images(page, settings.pdf_image_dpi)
+            page.compress_content_streams(level=9)
+        writer.compress_identical_objects(remove_duplicates=True, remove_unreferenced=True)
+
+        output = BytesIO()
+        writer.write(output)
+        optimized = output.getvalue()
+    except Exception as e:
+        logger.warning(f"PDF optimization failed, keeping original: {str(e)}", extra={"error_type": type(e).__name__})
+        return pdf_bytes
+
+    # Never hand out an "optimized" file that is bigger than what we started with
+    return optimized if len(optimized) < len(pdf_bytes) else pdf_bytes
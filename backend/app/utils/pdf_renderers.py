@@ -0,0 +1,77 @@
+"""Pluggable HTML-to-PDF rendering backends.
+
+The backend is chosen per deployment (``PDF_BACKEND``) and can be overridden
+per CV template (``PDF_TEMPLATE_BACKENDS``, e.g. ``tech=weasyprint``).
+Engines are imported lazily so a deployment only needs the libraries of the
+backends it actually uses.
+"""
+from io import BytesIO
+from typing import Dict
+from app.core.config import settings
+
+
+class PDFRendererUnavailable(RuntimeError):
+    """Raised when a backend's library (or its system dependencies) is missing."""
+
+
+class PDFRenderer:
+    """Turns a complete HTML document into PDF bytes."""
+
+    name = ""
+
+    def render(self, html: str) -> bytes:
+        raise NotImplementedError
+
+
+class XHTML2PDFRenderer(PDFRenderer):
+    """Pure-Python renderer built on xhtml2pdf/ReportLab."""
+
+    name = "xhtml2pdf"
+
+    def render(self, html: str) -> bytes:
+        try:
+            from xhtml2pdf import pisa
+        except ImportError as e:
+            raise PDFRendererUnavailable(f"xhtml2pdf is not installed: {e}")
+
+        # Pass encoded bytes: html5lib rejects an explicit encoding for str input
+        buffer = BytesIO()
+        pisa_status = pisa.CreatePDF(
+            src=html.encode("utf-8"),
+            dest=buffer,
+            encoding='utf-8'
+        )
+        if pisa_status.err:
+            raise Exception(f"PDF generation failed with error code: {pisa_status.err}")
+        return buffer.getvalue()
+
+
+class WeasyPrintRenderer(PDFRenderer):
+    """Pango-based renderer with fuller CSS support (needs system libraries)."""
+
+    name = "weasyprint"
+
+    def render(self, html: str) -> bytes:
+        try:
+            from weasyprint import HTML
+        except (ImportError, OSError) as e:
+            # OSError: the package is installed but Pango/Cairo are not
+            raise PDFRendererUnavailable(f"WeasyPrint is not available: {e}")
+
+        return HTML(string=html).write_pdf()
+
+
+RENDERERS: Dict[str, PDFRenderer] = {
+    renderer.name: renderer for renderer in (XHTML2PDFRenderer(), WeasyPrintRenderer())
+}
+
+
+def backend_for_template(template: str) -> str:
+    """Name of the backend configured for ``CVSettings.template``."""
+    name = settings.pdf_template_backends.get(template) or settings.pdf_backend
+    return name if name in RENDERERS else XHTML2PDFRenderer.name
+
+
+def get_renderer(template: str) -> PDFRenderer:
+    """Renderer configured for ``CVSettings.template``."""
+    return RENDERERS[backend_for_template(template)]
@@ -0,0 +1,218 @@
+"""Skill extraction from free-text CV descriptions.
+
+Experience and project descriptions often mention skills ("built pipelines
+in Python on AWS") that are missing from the CV's skills list. They are
+found with an Aho-Corasick automaton over a skill dictionary: the technical
+skills of the skill taxonomy (learned titles included) plus common aliases.
+All descriptions are scanned in one pass, in time linear in the text length
+regardless of the dictionary size.
+
+Matching is case-insensitive and on word boundaries; overlapping matches
+resolve to the leftmost longest ("React Native" over "React"). Skills that
+are also everyday words or very short ("Go", "Excel", "R") only match when
+not written in lowercase.
+"""
+from bisect import bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from app.models.cv import CVData
+from app.utils.skill_taxonomy import skill_taxonomy
+
+# Spellings that name a dictionary skill
+SKILL_ALIASES: Dict[str, str] = {
+    "k8s": "Kubernetes",
+    "postgres": "PostgreSQL",
+    "golang": "Go",
+    "js": "JavaScript",
+    "ts": "TypeScript",
+    "nodejs": "Node.js",
+    "node": "Node.js",
+    "reactjs": "React",
+    "react.js": "React",
+    "vue.js": "Vue",
+    "vuejs": "Vue",
+    "ci/cd pipelines": "CI/CD",
+    "amazon web services": "AWS",
+    "gcp": "Google Cloud",
+    "ms excel": "Excel",
+    "microsoft excel": "Excel",
+    "sklearn": "Scikit-learn",
+    "tf": "TensorFlow",
+    "spark": "Apache Spark",
+    "mongo": "MongoDB",
+}
+
+# Common technologies that no taxonomy entry lists
+EXTRA_SKILLS = (
+    "FastAPI", "Flask", "Django", "Spring Boot", "Vue", "Angular", "Next.js", "GraphQL", "gRPC",
+    "Elasticsearch", "RabbitMQ", "GitHub Actions", "GitLab CI", "Go", "Rust", "C++", "C#", ".NET",
+    "PHP", "Ruby", "Ruby on Rails", "Scala", "Kafka", "Tailwind CSS", "Grafana", "Helm", "Nginx",
+)
+
+# Spellings that are also everyday words; not matched when written in lowercase
+COMMON_WORDS = frozenset({"go", "excel", "swift", "lean", "rust", "r", "c", "spark", "node", "ts", "tf", "scala"})
+
+_TURKISH_CAPITAL_I = str.maketrans({"İ": "i"})
+
+
+class SkillOccurrence(NamedTuple):
+    skill: str
+    section: str
+    item_id: str
+    start: int
+    end: int
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in "+#"
+
+
+def _lower(text: str) -> str:
+    """Lowercase without changing the length, so offsets stay valid."""
+    lowered = text.translate(_TURKISH_CAPITAL_I).lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+class SkillAutomaton:
+    """Aho-Corasick automaton over lowercased skill names."""
+
+    def __init__(self, patterns: Dict[str, str]):
+        """``patterns`` maps a lowercased spelling to the canonical skill name."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (pattern length, spelling) of every pattern ending at a node, via fail links included
+        self._out: List[List[Tuple[int, str]]] = [[]]
+        self.patterns = patterns
+
+        for spelling in patterns:
+            node = 0
+            for ch in spelling:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(spelling), spelling))
+
+        # Breadth-first fail links
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, nxt in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """Leftmost-longest, non-overlapping ``(start, end, skill)`` matches on word boundaries."""
+        lowered = _lower(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        candidates: List[Tuple[int, int, str]] = []
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, spelling in out[node]:
+                start, end = i + 1 - length, i + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if end < len(text) and _is_word_char(text[end]):
+                    continue
+                if spelling in COMMON_WORDS and text[start:end].islower():
+                    continue
+                candidates.append((start, end, self.patterns[spelling]))
+
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches: List[Tuple[int, int, str]] = []
+        covered = 0
+        for start, end, skill in candidates:
+            if start >= covered:
+                matches.append((start, end, skill))
+                covered = end
+        return matches
+
+
+def skill_patterns(skills: Iterable[str]) -> Dict[str, str]:
+    """Lowercased spelling -> canonical name for ``skills`` plus the aliases."""
+    patterns = {_lower(skill): skill for skill in skills if skill.strip()}
+    for alias, skill in SKILL_ALIASES.items():
+        patterns.setdefault(alias, skill)
+    return patterns
+
+
+_automaton: Optional[SkillAutomaton] = None
+_automaton_size = -1
+
+
+def get_skill_automaton() -> SkillAutomaton:
+    """Automaton over the current dictionary, rebuilt when the taxonomy learns titles."""
+    global _automaton, _automaton_size
+    if _automaton is None or _automaton_size != len(skill_taxonomy):
+        _automaton_size = len(skill_taxonomy)
+        _automaton = SkillAutomaton(skill_patterns([*skill_taxonomy.technical_skills(), *EXTRA_SKILLS]))
+    return _automaton
+
+
+def description_segments(cv_data: CVData) -> List[Tuple[str, str, str]]:
+    """``(section, item id, description)`` of every experience and project."""
+    segments = [("experiences", e.id, e.description) for e in cv_data.experiences if e.description]
+    segments.extend(("projects", p.id, p.description) for p in cv_data.projects if p.description)
+    return segments
+
+
+def extract_skills(cv_data: CVData, automaton: Optional[SkillAutomaton] = None) -> List[SkillOccurrence]:
+    """Every skill mention in the CV's descriptions, with offsets into its description."""
+    automaton = automaton or get_skill_automaton()
+    segments = description_segments(cv_data)
+    # One scan over all descriptions; the newline separator is a word boundary
+    offsets: List[int] = []
+    position = 0
+    for _, _, text in segments:
+        offsets.append(position)
+        position += len(text) + 1
+    joined = "\n".join(text for _, _, text in segments)
+
+    occurrences = []
+    for start, end, skill in automaton.find(joined):
+        index = bisect_right(offsets, start) - 1
+        section, item_id, _ = segments[index]
+        base = offsets[index]
+        occurrences.append(SkillOccurrence(skill, section, item_id, start - base, end - base))
+    return occurrences
+
+
+def summarize_skills(
+    cv_data: CVData,
+    occurrences: List[SkillOccurrence],
+    automaton: Optional[SkillAutomaton] = None
+) -> dict:
+    """Group occurrences by skill and flag the skills missing from the CV's skills list."""
+    patterns = (automaton or get_skill_automaton()).patterns
+    names = [skill.name for skill in cv_data.skills]
+    names.extend(tech for project in cv_data.projects for tech in project.technologies)
+    # Listed under an alias ("Postgres") still counts as listed
+    listed = {_lower(patterns.get(_lower(name.strip()), name.strip())) for name in names}
+    grouped: Dict[str, List[dict]] = {}
+    for occurrence in occurrences:
+        grouped.setdefault(occurrence.skill, []).append({
+            "section": occurrence.section,
+            "item_id": occurrence.item_id,
+            "start": occurrence.start,
+            "end": occurrence.end,
+        })
+
+    skills = [
+        {"name": name, "in_skills": _lower(name) in listed, "occurrences": found}
+        for name, found in sorted(grouped.items(), key=lambda item: -len(item[1]))
+    ]
+    return {
+        "skills": skills,
+        "new_skills": [skill["name"] for skill in skills if not skill["in_skills"]],
+    }
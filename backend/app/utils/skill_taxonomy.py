@@ -0,0 +1,218 @@
+"""Offline job title -> skills taxonomy for /ai/suggest-skills.
+
+Common titles are answered from a bundled taxonomy
+(``app/data/skill_taxonomy.json``) without an AI call. Titles are
+normalized (case, diacritics, seniority words) and looked up exactly, then
+fuzzily by IDF-weighted character trigram similarity, so "Sr. Back-end
+Developer" and "yazilim muhendisi" still hit while a word shared by many
+titles, like "developer", counts for little. A fuzzy hit must also share the
+head noun (the last word, typos allowed), so "Account Manager" is not taken
+for "Accountant". Titles the index does not know go to the AI once; the
+answer is stored in ``db.skill_taxonomy`` and added to the index, so every
+worker answers them locally from then on. Only title-like inputs are learned,
+up to ``SKILL_TAXONOMY_MAX_LEARNED`` of them.
+"""
+import json
+import math
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set
+from app.core.config import settings
+from app.core.database import db
+from app.core.logging import logger
+from app.models.ai import SkillSuggestions
+
+TAXONOMY_FILE = Path(__file__).parent.parent / "data" / "skill_taxonomy.json"
+
+# Minimum trigram similarity for a fuzzy hit
+MIN_SIMILARITY = 0.8
+
+# Minimum trigram overlap (Jaccard) of two head nouns to count as the same word
+MIN_HEAD_SIMILARITY = 0.5
+
+# Longest title (normalized words) the taxonomy learns from an AI answer
+MAX_LEARNED_WORDS = 5
+
+# Words that qualify a title without changing the skills it needs
+TITLE_NOISE = frozenset("""
+senior sr junior jr mid middle level entry intern internship trainee graduate principal staff associate
+assistant remote hybrid freelance contract contractor part full time i ii iii iv
+kidemli stajyer uzman yardimcisi yardimci
+""".split())
+
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+
+
+class SkillMatch(NamedTuple):
+    title: str
+    similarity: float
+    skills: SkillSuggestions
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase ASCII title without punctuation or seniority words."""
+    folded = unicodedata.normalize("NFKD", title.replace("ı", "i").replace("I", "i").lower())
+    ascii_title = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    words = _NON_WORD.sub(" ", ascii_title.replace("-", "")).split()
+    return " ".join(word for word in words if word not in TITLE_NOISE)
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def same_head(key: str, other: str) -> bool:
+    """Whether two normalized titles end in the same word, allowing plurals and typos."""
+    head, other_head = key.rsplit(" ", 1)[-1], other.rsplit(" ", 1)[-1]
+    if head.rstrip("s") == other_head.rstrip("s"):
+        return True
+    grams, other_grams = _trigrams(head), _trigrams(other_head)
+    return len(grams & other_grams) / len(grams | other_grams) >= MIN_HEAD_SIMILARITY
+
+
+def learnable_title(key: str) -> bool:
+    """Whether a normalized title looks like a job title worth sharing with every user."""
+    words = key.split()
+    return 0 < len(words) <= MAX_LEARNED_WORDS and any(ch.isalpha() for ch in key)
+
+
+class SkillTaxonomy:
+    """Exact and trigram-fuzzy index of job titles to suggested skills."""
+
+    def __init__(self, max_learned: int = 5000):
+        self.max_learned = max_learned
+        self.learned = 0
+        self._titles: List[str] = []
+        self._skills: List[SkillSuggestions] = []
+        self._grams: List[Set[str]] = []
+        self._by_key: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._norms: Optional[List[float]] = None
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add(self, title: str, skills: SkillSuggestions) -> bool:
+        """Index ``skills`` under ``title``; False if the title normalizes to nothing."""
+        key = normalize_title(title)
+        if not key:
+            return False
+        if key in self._by_key:
+            self._skills[self._by_key[key]] = skills
+            return True
+
+        entry = len(self._titles)
+        grams = _trigrams(key)
+        self._titles.append(title)
+        self._skills.append(skills)
+        self._grams.append(grams)
+        self._by_key[key] = entry
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry)
+        self._norms = None
+        return True
+
+    def technical_skills(self) -> Set[str]:
+        """Every technical skill in the index, bundled and learned."""
+        return {skill for skills in self._skills for skill in skills.technical_skills}
+
+    def _idf(self, gram: str) -> float:
+        return math.log((len(self._titles) + 1) / (len(self._postings.get(gram, ())) + 1)) + 1.0
+
+    def load_bundled(self, path: Path = TAXONOMY_FILE):
+        with open(path, encoding="utf-8") as f:
+            for group in json.load(f):
+                skills = SkillSuggestions(technical_skills=group["technical_skills"], soft_skills=group["soft_skills"])
+                for title in group["titles"]:
+                    self.add(title, skills)
+
+    def lookup(self, title: str) -> Optional[SkillMatch]:
+        """Best indexed title for ``title``, or None below ``MIN_SIMILARITY``."""
+        key = normalize_title(title)
+        if not key:
+            return None
+        entry = self._by_key.get(key)
+        if entry is not None:
+            return SkillMatch(self._titles[entry], 1.0, self._skills[entry])
+
+        if self._norms is None:
+            self._norms = [math.sqrt(sum(self._idf(gram) ** 2 for gram in grams)) for grams in self._grams]
+
+        shared: Dict[int, float] = Counter()
+        query_norm = 0.0
+        for gram in _trigrams(key):
+            idf = self._idf(gram)
+            query_norm += idf * idf
+            for entry in self._postings.get(gram, ()):
+                shared[entry] += idf * idf
+        # Weighted cosine similarity of the trigram sets, best first
+        scored = sorted(
+            ((dot / (math.sqrt(query_norm) * self._norms[entry]), entry) for entry, dot in shared.items()),
+            reverse=True
+        )
+        for similarity, entry in scored:
+            if similarity < MIN_SIMILARITY:
+                return None
+            if same_head(key, normalize_title(self._titles[entry])):
+                return SkillMatch(self._titles[entry], similarity, self._skills[entry])
+        return None
+
+    def _add_learned(self, title: str, skills: SkillSuggestions) -> bool:
+        """``add`` for AI answers, within ``max_learned`` new titles."""
+        new = normalize_title(title) not in self._by_key
+        if new and self.learned >= self.max_learned:
+            return False
+        if not self.add(title, skills):
+            return False
+        self.learned += new
+        return True
+
+    async def find_learned(self, title: str) -> Optional[SkillSuggestions]:
+        """An answer another worker learned since this one loaded the index."""
+        key = normalize_title(title)
+        if not key:
+            return None
+        doc = await db.skill_taxonomy.find_one({"key": key}, {"_id": 0})
+        if doc is None:
+            return None
+        skills = SkillSuggestions(technical_skills=doc["technical_skills"], soft_skills=doc["soft_skills"])
+        self._add_learned(doc["title"], skills)
+        return skills
+
+    async def learn(self, title: str, skills: SkillSuggestions):
+        """Persist an AI answer for a title-like ``title`` and index it, up to ``max_learned``."""
+        if not learnable_title(normalize_title(title)) or not self._add_learned(title, skills):
+            logger.info("Skill taxonomy did not learn title", extra={"job_title": title, "learned": self.learned})
+            return
+        try:
+            await db.skill_taxonomy.update_one(
+                {"key": normalize_title(title)},
+                {"$set": {"title": title, **skills.model_dump(), "created_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Skill taxonomy write failed: {str(e)}", extra={"job_title": title, "error_type": type(e).__name__})
+
+    async def load_learned(self) -> int:
+        """Index the newest persisted AI answers, up to ``max_learned``; returns how many were loaded."""
+        count = 0
+        cursor = db.skill_taxonomy.find({}, {"_id": 0}).sort("created_at", -1).limit(self.max_learned)
+        async for doc in cursor:
+            skills = SkillSuggestions(technical_skills=doc["technical_skills"], soft_skills=doc["soft_skills"])
+            count += self._add_learned(doc["title"], skills)
+        return count
+
+
+skill_taxonomy = SkillTaxonomy(max_learned=settings.skill_taxonomy_max_learned)
+skill_taxonomy.load_bundled()
+
+
+async def init_skill_taxonomy():
+    """Create the learned-titles index and load learned titles into memory."""
+    await db.skill_taxonomy.create_index("key", unique=True)
+    learned = await skill_taxonomy.load_learned()
+    logger.info(f"Skill taxonomy loaded: {len(skill_taxonomy)} titles, {learned} learned")
@@ -0,0 +1,181 @@
+"""Jinja2 template engine for CV HTML rendering.
+
+Each CV template is compiled once per process and reused for every render.
+Autoescaping is always on, so user-supplied fields never need to be
+sanitized by hand before they reach the markup.
+
+The document body is assembled from fragments: the header, the summary, the
+skills block and one fragment per experience, education, language,
+certificate and project entry. Fragments are cached by their content plus
+the style settings, so re-rendering a CV after an autosave only renders the
+entries that actually changed. Renders run in the PDF worker processes, so
+each worker keeps its own fragment cache.
+"""
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from markupsafe import Markup
+from pydantic import BaseModel
+from app.core.config import settings as app_settings
+from app.models.cv import CV
+from app.models.user import User
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates" / "pdf"
+AVAILABLE_TEMPLATES = ("minimal", "corporate", "creative", "tech")
+DEFAULT_TEMPLATE = "minimal"
+KNOWN_SECTIONS = ("summary", "experience", "education", "skills", "languages", "certificates", "projects")
+DEFAULT_PRIMARY_COLOR = "#064E3B"
+
+SECTION_TITLES = {
+    "summary": "Professional Summary",
+    "experience": "Work Experience",
+    "education": "Education",
+    "skills": "Skills",
+    "languages": "Languages",
+    "certificates": "Certifications",
+    "projects": "Projects",
+}
+# Sections rendered one fragment per entry, mapped to their CVData field
+ITEM_SECTIONS = {
+    "experience": "experiences",
+    "education": "education",
+    "languages": "languages",
+    "certificates": "certificates",
+    "projects": "projects",
+}
+
+_HEX_COLOR = re.compile(r"^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})$")
+
+_env = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+_compiled: Dict[str, Template] = {}
+
+
+class FragmentCache:
+    """LRU of rendered HTML fragments keyed by fragment, style and content."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Markup]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Markup]:
+        html = self._entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return html
+
+    def put(self, key: Hashable, html: Markup):
+        self._entries[key] = html
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+fragment_cache = FragmentCache(max_entries=app_settings.pdf_fragment_cache_size)
+
+
+def _compile(path: str) -> Template:
+    template = _compiled.get(path)
+    if template is None:
+        template = _compiled[path] = _env.get_template(path)
+    return template
+
+
+def get_template(name: str) -> Template:
+    """Return the compiled template for ``CVSettings.template``, compiling it on first use."""
+    if name not in AVAILABLE_TEMPLATES:
+        name = DEFAULT_TEMPLATE
+    return _compile(f"{name}.html")
+
+
+def safe_color(color: str) -> str:
+    """Only allow hex colors into stylesheets; anything else falls back to the default."""
+    return color if color and _HEX_COLOR.match(color) else DEFAULT_PRIMARY_COLOR
+
+
+def visible_sections(cv: CV) -> List[str]:
+    """Sections to render, in the user's order, without hidden or unknown ones."""
+    shown = cv.settings.visible_sections
+    ordered = [s for s in cv.data.section_order if s in KNOWN_SECTIONS]
+    ordered += [s for s in KNOWN_SECTIONS if s not in ordered]
+    return [s for s in ordered if shown.get(s, True)]
+
+
+def content_key(model: BaseModel) -> tuple:
+    """Hashable snapshot of a model's field values.
+
+    Cheaper than serializing and hashing the model, and unlike a digest the
+    cache compares full keys, so two different entries can never collide.
+    """
+    return tuple(tuple(v) if isinstance(v, list) else v for v in model.__dict__.values())
+
+
+def render_fragment(name: str, style_key: str, key: Hashable, **context) -> Markup:
+    """Render ``fragments/<name>.html`` unless an identical fragment is cached."""
+    key = (name, style_key, key)
+    html = fragment_cache.get(key)
+    if html is None:
+        html = Markup(_compile(f"fragments/{name}.html").render(**context))
+        fragment_cache.put(key, html)
+    return html
+
+
+def _section_html(section: str, cv: CV, style_key: str) -> Optional[Markup]:
+    data = cv.data
+    if section == "summary":
+        if not data.summary:
+            return None
+        body = render_fragment("summary", style_key, data.summary, summary=data.summary)
+    elif section == "skills":
+        if not data.skills:
+            return None
+        key = tuple(content_key(skill) for skill in data.skills)
+        body = render_fragment("skills", style_key, key, skills=data.skills)
+    else:
+        items = getattr(data, ITEM_SECTIONS[section])
+        if not items:
+            return None
+        # Fragments are already escaped; a plain str join avoids escaping them again
+        body = Markup("".join(
+            render_fragment(section, style_key, content_key(item), item=item)
+            for item in items
+        ))
+    return Markup(_compile("fragments/section.html").render(title=SECTION_TITLES[section], body=body))
+
+
+def render_cv_html(cv: CV, user: User) -> str:
+    """Render a CV to a complete HTML document with its selected template."""
+    template = get_template(cv.settings.template)
+    primary_color = safe_color(cv.settings.primary_color)
+    style_key = f"{template.name}|{primary_color}"
+
+    personal = cv.data.personal_info
+    header = render_fragment("header", style_key, content_key(personal), personal=personal)
+    section_html = []
+    for section in visible_sections(cv):
+        html = _section_html(section, cv, style_key)
+        if html is not None:
+            section_html.append(html)
+
+    return template.render(
+        header=header,
+        section_html=section_html,
+        primary_color=primary_color,
+        watermark=not user.is_pro,
+    )
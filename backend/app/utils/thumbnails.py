@@ -0,0 +1,226 @@
+"""Dashboard thumbnails of page 1 of each CV.
+
+Thumbnails are small PNGs stored in ``db.cv_thumbnails`` (one document per
+CV) under a content key derived from the PDF cache key, so a thumbnail is
+reused for exactly as long as the PDF it was taken from. They are
+regenerated in the background once a CV has been idle for
+``THUMBNAIL_IDLE_SECONDS`` after its last save, so editor autosaves collapse
+into one refresh. Thumbnails never render a PDF: page 1 is rasterized (with
+pypdfium2 when it is installed) only from a PDF already in the cache, and a
+schematic preview is drawn with Pillow from the CV data otherwise. A
+schematic is replaced by the real page once that PDF is cached, and
+``app.tools.backfill_thumbnails`` fills in thumbnails offline.
+"""
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+from PIL import Image, ImageDraw
+from app.core.config import settings
+from app.core.database import db
+from app.core.logging import logger
+from app.models.cv import CV
+from app.models.user import User
+from app.utils.pdf_cache import pdf_cache, pdf_cache_key
+from app.utils.template_engine import safe_color, visible_sections
+
+# Bump when the rasterization output changes so stored thumbnails are replaced
+THUMBNAIL_VERSION = "1"
+
+SOURCE_PDF = "pdf"
+SOURCE_SCHEMATIC = "schematic"
+
+# A4 portrait
+PAGE_ASPECT = 297 / 210
+
+# PDFium is not thread-safe, so all rasterization goes through one thread
+_raster_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnail")
+
+
+def thumbnail_key(pdf_key: str, width: int) -> str:
+    """Content key of the thumbnail taken from the PDF with cache key ``pdf_key``."""
+    return hashlib.sha256(f"{pdf_key}:{width}:{THUMBNAIL_VERSION}".encode("utf-8")).hexdigest()[:32]
+
+
+def _encode_png(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.convert("RGB").save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def rasterize_first_page(pdf_bytes: bytes, width: int) -> Optional[bytes]:
+    """Render page 1 of a PDF to a PNG ``width`` pixels wide, or None without pypdfium2."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
+
+    document = pdfium.PdfDocument(pdf_bytes)
+    try:
+        page = document[0]
+        bitmap = page.render(scale=width / page.get_width())
+        return _encode_png(bitmap.to_pil())
+    finally:
+        document.close()
+
+
+def draw_schematic(cv: CV, width: int) -> bytes:
+    """Pillow-only preview: header band, name and one block per visible section."""
+    height = int(width * PAGE_ASPECT)
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    color = safe_color(cv.settings.primary_color)
+    margin = width // 12
+    line = max(2, width // 80)
+
+    header_bottom = height // 7
+    draw.rectangle([0, 0, width, line * 2], fill=color)
+    name = cv.data.personal_info.full_name or cv.title
+    draw.text((margin, header_bottom // 2 - line * 2), name[:40], fill=color)
+    draw.line([margin, header_bottom, width - margin, header_bottom], fill=color, width=1)
+
+    y = header_bottom + line * 4
+    for _ in visible_sections(cv):
+        if y > height - margin:
+            break
+        draw.rectangle([margin, y, margin + width // 4, y + line * 2], fill=color)
+        y += line * 4
+        for fraction in (1.0, 0.9, 0.75):
+            draw.rectangle([margin, y, margin + int((width - 2 * margin) * fraction), y + line], fill="#d4d4d8")
+            y += line * 3
+        y += line * 2
+
+    return _encode_png(image)
+
+
+def make_thumbnail(pdf_bytes: Optional[bytes], cv: CV, width: int) -> Tuple[bytes, str]:
+    """``(png, source)``: page 1 of ``pdf_bytes`` if given and rasterizable, else a schematic."""
+    png = rasterize_first_page(pdf_bytes, width) if pdf_bytes is not None else None
+    if png is not None:
+        return png, SOURCE_PDF
+    return draw_schematic(cv, width), SOURCE_SCHEMATIC
+
+
+class ThumbnailStore:
+    """Stored thumbnails plus debounced, coalesced background regeneration."""
+
+    def __init__(self, width: int, idle_seconds: float):
+        self.width = width
+        self.idle_seconds = idle_seconds
+        # cv_id -> whether another refresh was requested while one was running
+        self._refreshing: Dict[str, bool] = {}
+        # cv_id -> (loop time the CV becomes idle, owner) for scheduled refreshes
+        self._pending: Dict[str, Tuple[float, User]] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+
+    async def get_stored(self, cv_id: str, user_id: str) -> Optional[dict]:
+        return await db.cv_thumbnails.find_one({"cv_id": cv_id, "user_id": user_id}, {"_id": 0})
+
+    async def keys_for_user(self, user_id: str) -> Dict[str, str]:
+        """Current thumbnail key per CV, for building versioned URLs."""
+        cursor = db.cv_thumbnails.find({"user_id": user_id}, {"_id": 0, "cv_id": 1, "key": 1})
+        return {doc["cv_id"]: doc["key"] async for doc in cursor}
+
+    async def get_or_create(self, cv: CV, user: User, pdf_bytes: Optional[bytes] = None) -> Tuple[str, bytes]:
+        """Return ``(key, png)`` for the CV's current content, creating it if needed.
+
+        Uses ``pdf_bytes`` or the cached PDF of this version; without either a
+        schematic is stored, to be replaced once the PDF is cached.
+        """
+        pdf_key = pdf_cache_key(cv, user)
+        key = thumbnail_key(pdf_key, self.width)
+        stored = await db.cv_thumbnails.find_one(
+            {"cv_id": cv.cv_id, "key": key},
+            {"_id": 0, "png": 1, "source": 1}
+        )
+        if stored and stored.get("source") != SOURCE_SCHEMATIC:
+            return key, stored["png"]
+
+        if pdf_bytes is None:
+            pdf_bytes = await pdf_cache.get(pdf_key)
+        if stored and pdf_bytes is None:
+            return key, stored["png"]
+
+        loop = asyncio.get_running_loop()
+        png, source = await loop.run_in_executor(_raster_executor, make_thumbnail, pdf_bytes, cv, self.width)
+        if stored and source == SOURCE_SCHEMATIC:
+            return key, stored["png"]
+
+        await db.cv_thumbnails.update_one(
+            {"cv_id": cv.cv_id},
+            {"$set": {
+                "user_id": user.user_id,
+                "key": key,
+                "png": png,
+                "source": source,
+                "created_at": datetime.now(timezone.utc).isoformat()
+            }},
+            upsert=True
+        )
+        logger.info(f"Thumbnail generated: {cv.cv_id}", extra={"user_id": user.user_id, "source": source})
+        return key, png
+
+    def schedule(self, cv_id: str, user: User):
+        """Refresh a CV's thumbnail once it has gone ``idle_seconds`` without another call."""
+        loop = asyncio.get_running_loop()
+        self._pending[cv_id] = (loop.time() + self.idle_seconds, user)
+        if cv_id not in self._timers:
+            self._timers[cv_id] = asyncio.create_task(self._refresh_when_idle(cv_id))
+
+    async def _refresh_when_idle(self, cv_id: str):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                due, user = self._pending[cv_id]
+                if loop.time() >= due:
+                    break
+                await asyncio.sleep(due - loop.time())
+            del self._pending[cv_id]
+        finally:
+            self._timers.pop(cv_id, None)
+        await self.refresh(cv_id, user)
+
+    async def refresh(self, cv_id: str, user: User):
+        """Regenerate a CV's thumbnail, coalescing requests that arrive while one is running."""
+        if cv_id in self._refreshing:
+            self._refreshing[cv_id] = True
+            return
+
+        self._refreshing[cv_id] = False
+        try:
+            while True:
+                cv_data = await db.cvs.find_one({"cv_id": cv_id, "user_id": user.user_id}, {"_id": 0})
+                if not cv_data:
+                    return
+                try:
+                    await self.get_or_create(CV(**cv_data), user)
+                except Exception as e:
+                    # The thumbnail route falls back to the stored or a schematic image
+                    logger.warning(f"Thumbnail refresh failed: {str(e)}", extra={"cv_id": cv_id, "user_id": user.user_id})
+                if not self._refreshing[cv_id]:
+                    return
+                self._refreshing[cv_id] = False
+        finally:
+            self._refreshing.pop(cv_id, None)
+
+    async def stop(self):
+        """Cancel scheduled refreshes; the next save or view schedules them again."""
+        timers = list(self._timers.values())
+        for timer in timers:
+            timer.cancel()
+        await asyncio.gather(*timers, return_exceptions=True)
+        self._pending.clear()
+
+    async def delete(self, cv_id: str):
+        await db.cv_thumbnails.delete_one({"cv_id": cv_id})
+
+
+thumbnail_store = ThumbnailStore(width=settings.thumbnail_width, idle_seconds=settings.thumbnail_idle_seconds)
+
+
+async def create_thumbnail_indexes():
+    """Indexes for thumbnail lookups by CV and by owner."""
+    await db.cv_thumbnails.create_index("cv_id", unique=True)
+    await db.cv_thumbnails.create_index("user_id")
@@ -13,7 +13,14 @@ from app.core.config import settings
 from app.core.database import close_db_connection
 from app.core.logging import logger
 from app.middleware.rate_limit import RateLimitMiddleware
-from app.routes import auth, cv, share, ai, pdf, payment
+from app.utils.ai_cache import create_ai_cache_indexes
+from app.utils.ai_service import shutdown_ai_client
+from app.utils.ai_usage import start_ai_usage_meter, stop_ai_usage_meter
+from app.utils.pdf_executor import shutdown_pdf_executor
+from app.utils.pdf_jobs import start_pdf_job_runners, stop_pdf_job_runners
+from app.utils.skill_taxonomy import init_skill_taxonomy
+from app.utils.thumbnails import create_thumbnail_indexes, thumbnail_store
+from app.routes import auth, cv, export, share, ai, pdf, payment, usage
 
 # Create FastAPI app with documentation
 app = FastAPI(
@@ -43,11 +50,13 @@ app.add_middleware(
 
 # Include routers
 app.include_router(auth.router, prefix="/api")
+app.include_router(export.router, prefix="/api")
 app.include_router(cv.router, prefix="/api")
 app.include_router(share.router, prefix="/api")
 app.include_router(ai.router, prefix="/api")
 app.include_router(pdf.router, prefix="/api")
 app.include_router(payment.router, prefix="/api")
+app.include_router(usage.router, prefix="/api")
 
 
 @app.get("/api")
@@ -62,13 +71,28 @@ async def root():
 
 @app.get("/api/health")
 async def health():
-    """Health check endpoint."""
+    """Health check endpoint (service statistics are at /api/usage/service, for admins)."""
     return {"status": "healthy", "environment": settings.environment}
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Start background workers on application startup."""
+    await start_pdf_job_runners()
+    await create_thumbnail_indexes()
+    await create_ai_cache_indexes()
+    await init_skill_taxonomy()
+    await start_ai_usage_meter()
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on application shutdown."""
+    await stop_pdf_job_runners()
+    await thumbnail_store.stop()
+    await stop_ai_usage_meter()
+    shutdown_pdf_executor()
+    shutdown_ai_client()
     await close_db_connection()
     logger.info("Application shutdown complete")
 
@@ -4,11 +4,12 @@ import { ScrollArea } from "@/components/ui/scroll-area";
 import { Progress } from "@/components/ui/progress";
 import { X, Sparkles, Loader2, CheckCircle2, AlertCircle, TrendingUp } from "lucide-react";
 import { motion } from "framer-motion";
-import { postJson } from "@/lib/api";
+import { postEventStream } from "@/lib/api";
 
 export default function AIAnalysisPanel({ cv, onClose }) {
   const [analysis, setAnalysis] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [refining, setRefining] = useState(false);
   const [error, setError] = useState(null);
 
   const analyzeCV = async () => {
@@ -16,13 +17,26 @@ export default function AIAnalysisPanel({ cv, onClose }) {
     setError(null);
 
     try {
-      const data = await postJson(`/ai/analyze`, { cv_data: cv.data });
-      setAnalysis(data);
+      // The instant local pre-score is shown until the AI analysis replaces it
+      let result = null;
+      await postEventStream(`/ai/analyze/stream`, { cv_data: cv.data }, (event, data) => {
+        if (event === "prescore") {
+          setAnalysis(data);
+          setLoading(false);
+          setRefining(true);
+        } else if (event === "done") {
+          result = data;
+          setAnalysis(data);
+        }
+      });
+      if (!result) throw new Error("Analysis stream ended early");
     } catch (err) {
       console.error("AI analysis error:", err);
+      setAnalysis(null);
       setError("Failed to analyze CV. Please try again.");
     } finally {
       setLoading(false);
+      setRefining(false);
     }
   };
 
@@ -101,6 +115,15 @@ export default function AIAnalysisPanel({ cv, onClose }) {
 
             {analysis && (
               <div className="space-y-8">
+                {(refining || analysis.fallback) && (
+                  <div className="flex items-center justify-center gap-2 text-sm text-muted-foreground">
+                    {refining && <Loader2 className="w-4 h-4 animate-spin" />}
+                    {refining
+                      ? "Instant score shown. Refining with AI..."
+                      : "AI analysis is unavailable right now. Showing the automatic score."}
+                  </div>
+                )}
+
                 {/* Overall Score */}
                 <div className="text-center">
                   <div className="relative inline-flex items-center justify-center">
@@ -235,7 +258,7 @@ export default function AIAnalysisPanel({ cv, onClose }) {
 
         {analysis && (
           <div className="p-4 border-t border-border">
-            <Button onClick={analyzeCV} variant="outline" className="w-full">
+            <Button onClick={analyzeCV} variant="outline" className="w-full" disabled={refining}>
               <Sparkles className="w-4 h-4 mr-2" />
               Re-analyze
             </Button>
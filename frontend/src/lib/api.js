@@ -55,13 +55,61 @@ export async function postBlob(path, body, opts) {
 }
 
 /**
- * Download PDF file for a CV
+ * POST a JSON body and consume a server-sent events response
+ * @param {string} path - API path
+ * @param {object} body - JSON request body
+ * @param {(event: string, data: any) => void} onEvent - Called for each event with its parsed JSON data
+ * @returns {Promise<void>} Resolves when the stream ends
+ */
+export async function postEventStream(path, body, onEvent, { signal } = {}) {
+  const res = await fetch(`${API_BASE}${path}`, {
+    method: "POST",
+    credentials: "include",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify(body),
+    signal,
+  });
+
+  if (!res.ok) {
+    const text = await res.text().catch(() => "");
+    const err = new Error(text || res.statusText);
+    err.status = res.status;
+    throw err;
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      const data = [];
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+      }
+      if (data.length) onEvent(event, JSON.parse(data.join("\n")));
+    }
+  }
+}
+
+/**
+ * Download PDF file for a CV (a GET, so the browser revalidates its cached copy with If-None-Match)
  * @param {string} cvId - CV ID
  * @param {string} title - CV title for filename
  * @returns {Promise<void>}
  */
 export async function downloadPDF(cvId, title) {
-  const blob = await postBlob(`/generate-pdf/${cvId}`);
+  const blob = await getJson(`/generate-pdf/${cvId}`);
   const url = window.URL.createObjectURL(blob);
   const a = document.createElement("a");
   a.href = url;
@@ -72,11 +120,23 @@ export async function downloadPDF(cvId, title) {
   document.body.removeChild(a);
 }
 
+/**
+ * Thumbnail image URL for a CV card
+ * @param {{cv_id: string, thumbnail_key?: string}} cv - CV list entry
+ * @returns {string}
+ */
+export function thumbnailUrl(cv) {
+  const version = cv.thumbnail_key ? `?v=${cv.thumbnail_key}` : "";
+  return `${API_BASE}/cvs/${cv.cv_id}/thumbnail${version}`;
+}
+
 export default {
   getJson,
   postJson,
   putJson,
   deleteJson,
   postBlob,
+  postEventStream,
   downloadPDF,
+  thumbnailUrl,
 };
\ No newline at end of file
@@ -48,7 +48,7 @@ import ShareModal from "@/components/cv/ShareModal";
 import ProfileMenu from "@/components/ProfileMenu";
 import { motion, AnimatePresence } from "framer-motion";
 
-import { getJson, postJson, putJson, downloadPDF } from "@/lib/api";
+import { getJson, putJson, postEventStream, downloadPDF } from "@/lib/api";
 
 const WIZARD_STEPS = [
   { id: "personal", labelKey: "step.personal", icon: User },
@@ -76,6 +76,8 @@ export default function CVEditor() {
   const [showTemplates, setShowTemplates] = useState(false);
   const [showShare, setShowShare] = useState(false);
   const [aiLoading, setAiLoading] = useState({});
+  // Text streamed by "Improve with AI", shown in place of the field until the final answer arrives
+  const [aiDrafts, setAiDrafts] = useState({});
   
   const saveTimeoutRef = useRef(null);
   const lastSavedRef = useRef(null);
@@ -126,15 +128,10 @@ export default function CVEditor() {
     }
   }, [cvId]);
 
-  const handleChange = useCallback((path, value) => {
+  const updateCV = useCallback((mutate) => {
     setCV((prev) => {
       const newCV = JSON.parse(JSON.stringify(prev));
-      const keys = path.split(".");
-      let obj = newCV;
-      for (let i = 0; i < keys.length - 1; i++) {
-        obj = obj[keys[i]];
-      }
-      obj[keys[keys.length - 1]] = value;
+      mutate(newCV);
 
       // Debounced autosave
       if (saveTimeoutRef.current) clearTimeout(saveTimeoutRef.current);
@@ -144,6 +141,17 @@ export default function CVEditor() {
     });
   }, [saveCV]);
 
+  const handleChange = useCallback((path, value) => {
+    updateCV((newCV) => {
+      const keys = path.split(".");
+      let obj = newCV;
+      for (let i = 0; i < keys.length - 1; i++) {
+        obj = obj[keys[i]];
+      }
+      obj[keys[keys.length - 1]] = value;
+    });
+  }, [updateCV]);
+
   const handleAddItem = (section) => {
     const newItem = {
       id: `${section}_${Date.now()}`,
@@ -162,29 +170,55 @@ export default function CVEditor() {
     handleChange(`data.${section}`, cv.data[section].filter((item) => item.id !== id));
   };
 
+  // Applied to the latest CV state, so edits made while the AI was streaming are kept
+  const applyImprovedText = (section, itemId, text) => {
+    updateCV((newCV) => {
+      if (itemId) {
+        const sectionKey = section === "experience" ? "experiences" : section;
+        const item = (newCV.data[sectionKey] || []).find((i) => i.id === itemId);
+        if (item) item.description = text;
+      } else if (section === "summary") {
+        newCV.data.summary = text;
+      }
+    });
+  };
+
+  const setAiDraft = (key, text) => {
+    setAiDrafts((prev) => {
+      const next = { ...prev };
+      if (text === null) delete next[key];
+      else next[key] = text;
+      return next;
+    });
+  };
+
   const handleImproveWithAI = async (section, content, itemId = null) => {
     const key = itemId || section;
     setAiLoading((prev) => ({ ...prev, [key]: true }));
 
     try {
-      const data = await postJson(`/ai/improve`, { section, content });
-      if (itemId) {
-        const sectionKey = section === "experience" ? "experiences" : section;
-        const items = cv.data[sectionKey];
-        const index = items.findIndex((i) => i.id === itemId);
-        if (index !== -1) {
-          const updated = [...items];
-          updated[index] = { ...updated[index], description: data.improved };
-          handleChange(`data.${sectionKey}`, updated);
+      // Show the rewrite as it is generated, but only the final "done" text goes into the CV
+      // (and so into autosave)
+      let streamed = "";
+      let result = null;
+      await postEventStream(`/ai/improve/stream`, { section, content }, (event, data) => {
+        if (event === "token") {
+          streamed += data.text;
+          setAiDraft(key, streamed);
+        } else if (event === "done") {
+          result = data;
         }
-      } else if (section === "summary") {
-        handleChange("data.summary", data.improved);
+      });
+      if (!result || result.fallback) {
+        throw new Error("AI improve fell back to the original content");
       }
+      applyImprovedText(section, itemId, result.improved);
       toast.success("AI improved your content!");
     } catch (error) {
       console.error("AI improve failed:", error);
       toast.error("Failed to improve with AI");
     } finally {
+      setAiDraft(key, null);
       setAiLoading((prev) => ({ ...prev, [key]: false }));
     }
   };
@@ -328,6 +362,7 @@ export default function CVEditor() {
                       onChange={handleChange}
                       onImprove={handleImproveWithAI}
                       loading={aiLoading.summary}
+                      draft={aiDrafts.summary}
                     />
                   )}
                   {activeStep === "experience" && (
@@ -338,6 +373,7 @@ export default function CVEditor() {
                       onRemove={(id) => handleRemoveItem("experiences", id)}
                       onImprove={handleImproveWithAI}
                       loading={aiLoading}
+                      drafts={aiDrafts}
                     />
                   )}
                   {activeStep === "education" && (
@@ -518,7 +554,7 @@ function PersonalInfoForm({ cv, onChange }) {
   );
 }
 
-function SummaryForm({ cv, onChange, onImprove, loading }) {
+function SummaryForm({ cv, onChange, onImprove, loading, draft }) {
   return (
     <div className="space-y-6">
       <div className="flex items-start justify-between">
@@ -539,8 +575,9 @@ function SummaryForm({ cv, onChange, onImprove, loading }) {
       </div>
 
       <Textarea
-        value={cv.data.summary || ""}
+        value={draft ?? (cv.data.summary || "")}
         onChange={(e) => onChange("data.summary", e.target.value)}
+        readOnly={draft !== undefined}
         placeholder="Results-driven software engineer with 5+ years of experience..."
         className="min-h-[200px]"
         data-testid="input-summary"
@@ -549,7 +586,7 @@ function SummaryForm({ cv, onChange, onImprove, loading }) {
   );
 }
 
-function ExperienceForm({ cv, onChange, onAdd, onRemove, onImprove, loading }) {
+function ExperienceForm({ cv, onChange, onAdd, onRemove, onImprove, loading, drafts }) {
   const experiences = cv.data.experiences || [];
 
   const handleItemChange = (index, field, value) => {
@@ -635,8 +672,9 @@ function ExperienceForm({ cv, onChange, onAdd, onRemove, onImprove, loading }) {
                     </Button>
                   </div>
                   <Textarea
-                    value={exp.description || ""}
+                    value={drafts[exp.id] ?? (exp.description || "")}
                     onChange={(e) => handleItemChange(index, "description", e.target.value)}
+                    readOnly={drafts[exp.id] !== undefined}
                     placeholder="• Led development of..."
                     className="min-h-[100px]"
                   />
@@ -40,7 +40,7 @@ import {
 } from "lucide-react";
 import { motion } from "framer-motion";
 import { format } from "date-fns";
-import { getJson, postJson, deleteJson, downloadPDF } from "@/lib/api";
+import { getJson, postJson, deleteJson, downloadPDF, thumbnailUrl } from "@/lib/api";
 
 export default function Dashboard() {
   const navigate = useNavigate();
@@ -304,6 +304,16 @@ export default function Dashboard() {
                       </DropdownMenu>
                     </div>
 
+                    <div className="mb-4 aspect-[210/297] overflow-hidden rounded-lg border bg-white">
+                      <img
+                        src={thumbnailUrl(cv)}
+                        alt={cv.title}
+                        loading="lazy"
+                        className="h-full w-full object-cover object-top"
+                        onError={(e) => { e.currentTarget.style.visibility = "hidden"; }}
+                      />
+                    </div>
+
                     <h3 className="font-heading font-semibold text-base sm:text-lg mb-1 text-foreground">{cv.title}</h3>
                     <p className="text-xs sm:text-sm text-foreground-muted mb-4">
                       {t("dashboard.updated")} {cv.updated_at ? format(new Date(cv.updated_at), "MMM d, yyyy") : "recently"}
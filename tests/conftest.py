@@ -0,0 +1,5 @@
+"""Make the backend's ``app`` package importable from the repository root."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
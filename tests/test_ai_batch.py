@@ -0,0 +1,42 @@
+"""Batch section improvement: packing items into budgeted upstream calls."""
+import asyncio
+from app.models.ai import AIImproveBatchRequest, ImprovedItems
+from app.models.user import User
+from app.routes import ai as ai_routes
+from app.utils.ai_prompts import pack_by_budget
+
+USER = User(user_id="u1", email="a@b.c", name="A")
+
+
+def test_pack_by_budget_keeps_order_and_isolates_oversized_items():
+    assert pack_by_budget("abcde", [3, 3, 3, 9, 1], 6) == [["a", "b"], ["c"], ["d"], ["e"]]
+    assert pack_by_budget([], [], 10) == []
+
+
+def test_batch_is_packed_and_falls_back_per_item(monkeypatch):
+    monkeypatch.setattr(ai_routes.settings, "ai_batch_token_budget", 45)
+    groups = []
+
+    async def structured(endpoint, system, user_message, model, **kwargs):
+        group = ai_routes.json.loads(user_message)
+        groups.append([entry["id"] for entry in group])
+        if any(entry["content"] == "fail" for entry in group):
+            raise RuntimeError("upstream")
+        # The model skips item 1, answers blank for item 2 and invents id 99
+        items = [{"id": entry["id"], "improved": "" if entry["id"] == 2 else entry["content"].upper()}
+                 for entry in group if entry["id"] != 1]
+        return ImprovedItems(items=items + [{"id": 99, "improved": "stray"}])
+
+    monkeypatch.setattr(ai_routes, "get_structured_response", structured)
+    contents = ["led team", "wrote code", "ran tests", "x" * 200, "fail"]
+    request = AIImproveBatchRequest(items=[{"section": "experience", "content": c} for c in contents])
+    results = asyncio.run(ai_routes.improve_sections_batch(request, USER))["results"]
+
+    assert groups == [[0, 1, 2], [3], [4]]
+    assert results == [
+        {"improved": "LED TEAM"},
+        {"improved": "wrote code", "fallback": True},
+        {"improved": "ran tests", "fallback": True},
+        {"improved": "X" * 200},
+        {"improved": "fail", "fallback": True},
+    ]
@@ -0,0 +1,111 @@
+"""Two-tier AI response cache: keys, expiry, LRU and provider preference."""
+import asyncio
+import time
+from datetime import datetime, timezone, timedelta
+import pytest
+from app.utils import ai_cache as ai_cache_module
+from app.utils.ai_cache import AICache, ai_cache_key
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+        self.fail = False
+
+    def find(self, query, projection=None):
+        if self.fail:
+            raise RuntimeError("mongo down")
+        keys, cutoff = query["key"]["$in"], query["created_at"]["$gt"]
+        return FakeCursor([dict(doc) for key, doc in self.docs.items() if key in keys and doc["created_at"] > cutoff])
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs[query["key"]] = {"key": query["key"], **update["$set"]}
+
+
+class FakeDB:
+    def __init__(self):
+        self.ai_cache = FakeCollection()
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(ai_cache_module, "db", db)
+    return db
+
+
+def test_key_ignores_whitespace_but_not_prompt_or_model():
+    key = ai_cache_key("analyze", "sys", "some  cv\ntext", "gemini/flash")
+    assert key == ai_cache_key("analyze", "sys", " some cv text ", "gemini/flash")
+    assert key != ai_cache_key("analyze", "sys v2", "some cv text", "gemini/flash")
+    assert key != ai_cache_key("analyze", "sys", "some cv text", "openai/mini")
+    assert key != ai_cache_key("improve", "sys", "some cv text", "gemini/flash")
+
+
+def test_memory_tier_is_an_lru(fake_db):
+    cache = AICache(max_entries=2, ttl_seconds=60)
+
+    async def scenario():
+        await cache.put("a", "A", "analyze")
+        await cache.put("b", "B", "analyze")
+        assert await cache.get(["a"]) == "A"  # "b" becomes the oldest
+        await cache.put("c", "C", "analyze")
+        fake_db.ai_cache.docs.clear()
+        return [await cache.get([key]) for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == ["A", None, "C"]
+    assert cache.stats()["misses"] == 1
+
+
+def test_mongo_hit_fills_memory_with_the_remaining_ttl(fake_db):
+    cache = AICache(max_entries=10, ttl_seconds=60)
+    fake_db.ai_cache.docs["k"] = {"key": "k", "response": "R", "created_at": datetime.now(timezone.utc) - timedelta(seconds=50)}
+    fake_db.ai_cache.docs["old"] = {"key": "old", "response": "X", "created_at": datetime.now(timezone.utc) - timedelta(seconds=61)}
+
+    async def scenario():
+        return await cache.get(["k"]), await cache.get(["k"]), await cache.get(["old"])
+
+    assert asyncio.run(scenario()) == ("R", "R", None)
+    assert cache.stats()["mongo_hits"] == 1 and cache.stats()["memory_hits"] == 1
+    expires_at = cache._entries["k"][0]
+    assert expires_at - time.monotonic() < 11
+
+
+def test_expired_memory_entries_are_dropped(fake_db):
+    cache = AICache(max_entries=10, ttl_seconds=0)
+
+    async def scenario():
+        await cache.put("k", "R", "analyze")
+        return await cache.get(["k"])
+
+    assert asyncio.run(scenario()) is None
+    assert "k" not in cache._entries
+
+
+def test_keys_are_preferred_in_order(fake_db):
+    cache = AICache(max_entries=10, ttl_seconds=60)
+    now = datetime.now(timezone.utc)
+    fake_db.ai_cache.docs["fallback"] = {"key": "fallback", "response": "F", "created_at": now}
+    fake_db.ai_cache.docs["primary"] = {"key": "primary", "response": "P", "created_at": now}
+
+    async def scenario():
+        from_mongo = await cache.get(["primary", "fallback"])
+        from_memory = await cache.get(["primary", "fallback"])
+        return from_mongo, from_memory
+
+    assert asyncio.run(scenario()) == ("P", "P")
+
+
+def test_mongo_failure_is_a_miss(fake_db):
+    fake_db.ai_cache.fail = True
+    cache = AICache(max_entries=10, ttl_seconds=60)
+    assert asyncio.run(cache.get(["k"])) is None
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,67 @@
+"""Prompt serialization of CVs and trimming to a token budget."""
+from app.models.cv import CVData, Experience, PersonalInfo, Project
+from app.utils.ai_prompts import by_recency, clip_text, estimate_tokens, serialize_cv
+
+LONG = "Delivered measurable results across many teams and projects. " * 8
+
+
+def _cv() -> CVData:
+    return CVData(
+        personal_info=PersonalInfo(full_name="Jane Doe", email="jane@example.com"),
+        summary="Backend   engineer.\n\nLikes   Python.",
+        experiences=[
+            Experience(position="Junior Dev", company="Old Co", start_date="2015", end_date="2018", description=LONG),
+            Experience(position="Lead Dev", company="New Co", start_date="2018", current=True, description=LONG),
+        ],
+        projects=[Project(name="Tool", technologies=["Go"], description=LONG)],
+    )
+
+
+def test_estimate_and_clip():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
+    clipped = clip_text("word " * 50, 5)
+    assert clipped.endswith("…") and len(clipped) <= 20
+    assert clip_text("short", 5) == "short"
+
+
+def test_most_recent_role_first():
+    experiences = _cv().experiences
+    assert [e.position for e in by_recency(experiences)] == ["Lead Dev", "Junior Dev"]
+    experiences[0].start_date = ""
+    assert [e.position for e in by_recency(experiences)] == ["Junior Dev", "Lead Dev"]
+
+
+def test_full_serialization_is_plain_text():
+    serialized = serialize_cv(_cv())
+    lines = serialized.text.splitlines()
+    assert lines[:4] == [
+        "Contact: Jane Doe, jane@example.com",
+        "Summary: Backend engineer. Likes Python.",
+        "Experience:",
+        "Lead Dev at New Co (2018–present):",
+    ]
+    assert "Tool [Go]:" in lines
+    assert serialized.tokens == serialized.full_tokens == estimate_tokens(serialized.text)
+    assert "Contact" not in serialize_cv(_cv(), contact=False).text
+
+
+def test_trimming_order():
+    full = serialize_cv(_cv())
+    recent = "Lead Dev at New Co (2018–present):\n" + " ".join(LONG.split())
+
+    # Projects are shortened first
+    trimmed = serialize_cv(_cv(), budget=full.tokens - 60)
+    assert trimmed.tokens <= full.tokens - 60 and trimmed.full_tokens == full.tokens
+    assert "Junior Dev at Old Co (2015–2018):\n" + " ".join(LONG.split()) in trimmed.text
+    assert trimmed.text.endswith("…")
+
+    # Then older roles, and finally everything but the most recent role is a title line
+    headers = serialize_cv(_cv(), budget=175)
+    assert recent in headers.text
+    assert headers.text.endswith("Junior Dev at Old Co (2015–2018):\nProjects:\nTool [Go]:")
+
+    # Past that the text is clipped
+    clipped = serialize_cv(_cv(), budget=100)
+    assert clipped.tokens <= 100 and clipped.text.endswith("…")
+    assert "Junior Dev" not in clipped.text
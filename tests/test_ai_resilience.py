@@ -0,0 +1,155 @@
+"""Circuit breaker, deadlines and hedging against the local fake provider."""
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from app.utils import ai_service
+from app.utils.ai_fake import FakeAIClient
+from app.utils.ai_resilience import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker, HedgeStats, hedged
+from app.utils.ai_router import AIRouter, Provider
+from app.utils.ai_usage import Completion
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """Route every endpoint to one fake provider with a fast-tripping breaker."""
+    client = FakeAIClient(timeout=1.0, latency=0.01, seed=1)
+    breaker = CircuitBreaker(failure_threshold=0.5, min_calls=4, window=4, open_seconds=0.2)
+    router = AIRouter()
+    router.add(Provider("fake", client, breaker))
+    scheduler = ai_service.AIScheduler(
+        max_concurrency=4, endpoint_concurrency=4, endpoint_limits={}, max_queue=8, queue_timeout=1.0
+    )
+    monkeypatch.setattr(ai_service, "ai_router", router)
+    monkeypatch.setattr(ai_service, "ai_scheduler", scheduler)
+    monkeypatch.setattr(ai_service.settings, "ai_hedge", False)
+    return client, breaker
+
+
+async def _status(message: str, timeout: float = 1.0) -> int:
+    try:
+        await ai_service.get_ai_response("system", message, timeout=timeout, endpoint="test")
+        return 200
+    except HTTPException as e:
+        return e.status_code
+
+
+def test_breaker_opens_half_opens_and_closes(fake):
+    client, breaker = fake
+
+    async def scenario():
+        client.error_rate = 1.0
+        assert [await _status(f"fail {i}") for i in range(4)] == [503] * 4
+        assert breaker.state == STATE_OPEN
+
+        # Open: rejected without reaching the provider
+        calls = client.calls
+        assert await _status("rejected") == 503
+        assert client.calls == calls
+
+        await asyncio.sleep(0.25)
+        assert breaker.state == STATE_HALF_OPEN
+        client.error_rate = 0.0
+        assert await _status("probe") == 200
+        assert breaker.state == STATE_CLOSED
+        assert await _status("healthy") == 200
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_reopens(fake):
+    client, breaker = fake
+
+    async def scenario():
+        client.error_rate = 1.0
+        for i in range(4):
+            await _status(f"fail {i}")
+        await asyncio.sleep(0.25)
+        assert await _status("probe") == 503
+        assert breaker.state == STATE_OPEN
+        assert breaker.times_opened == 2
+
+    asyncio.run(scenario())
+
+
+def test_deadline_expiry(fake):
+    client, _ = fake
+    client.latency = 1.0
+
+    async def scenario():
+        started = time.perf_counter()
+        assert await _status("slow", timeout=0.1) == 504
+        assert time.perf_counter() - started < 0.5
+
+    asyncio.run(scenario())
+
+
+def _labelled(label: str, latency: float) -> FakeAIClient:
+    return FakeAIClient(timeout=1.0, latency=latency, responder=lambda system, user, json_mode: label)
+
+
+def test_hedge_backup_wins():
+    slow, fast = _labelled("primary", 0.5), _labelled("backup", 0.01)
+    stats = HedgeStats()
+
+    async def scenario():
+        return await hedged(slow.generate("s", "u"), 0.05, lambda: fast.generate("s", "u"), stats)
+
+    assert asyncio.run(scenario()).text == "backup"
+    assert (stats.hedged, stats.backup_wins) == (1, 1)
+
+
+def test_hedge_primary_wins():
+    primary, backup = _labelled("primary", 0.1), _labelled("backup", 0.5)
+    stats = HedgeStats()
+
+    async def scenario():
+        return await hedged(primary.generate("s", "u"), 0.05, lambda: backup.generate("s", "u"), stats)
+
+    assert asyncio.run(scenario()).text == "primary"
+    assert (stats.hedged, stats.backup_wins) == (1, 0)
+
+
+def test_hedge_not_started_without_capacity():
+    primary = _labelled("primary", 0.1)
+    stats = HedgeStats()
+
+    async def scenario():
+        return await hedged(primary.generate("s", "u"), 0.01, lambda: None, stats)
+
+    assert asyncio.run(scenario()).text == "primary"
+    assert stats.hedged == 0
+
+
+def test_lost_hedge_thread_holds_its_slot(fake, monkeypatch):
+    """A provider thread that lost the race stays in flight until it returns."""
+    client = ai_service.GeminiClient(model_name="test", max_threads=2, timeout=1.0)
+    delays = iter([0.3, 0.01])
+
+    def generate(model, user_message, timeout, json_mode):
+        time.sleep(next(delays))
+        return Completion("done")
+
+    monkeypatch.setattr(client, "get_model", lambda system_message: None)
+    monkeypatch.setattr(client, "_generate", generate)
+    monkeypatch.setattr(ai_service.settings, "ai_hedge", True)
+    provider = Provider("threads", client, CircuitBreaker(0.5, 10, 20, 30))
+    for _ in range(10):
+        provider.latency.record(0.02)
+    scheduler = ai_service.ai_scheduler
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        async with scheduler.slot("test"):
+            completion = await ai_service._attempt(
+                provider, "s", "u", loop.time() + 1.0, False, endpoint="test", pro=False
+            )
+        assert completion.text == "done"
+        assert scheduler.in_flight == 1
+        await asyncio.sleep(0.4)
+        assert scheduler.in_flight == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        client.shutdown()
@@ -0,0 +1,77 @@
+"""Provider ranking by preference, health and latency."""
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.utils.ai_resilience import CircuitBreaker, LatencyTracker
+from app.utils.ai_router import AIRouter, Provider
+
+
+def _provider(name: str, p95: float = None, configured: bool = True) -> Provider:
+    client = SimpleNamespace(configured=configured, model_name=f"{name}-model")
+    breaker = CircuitBreaker(failure_threshold=0.5, min_calls=2, window=4, open_seconds=30)
+    provider = Provider(name, client, breaker, LatencyTracker(size=10, min_samples=1))
+    if p95 is not None:
+        provider.latency.record(p95)
+    return provider
+
+
+def _router(*providers, routes=None, **options) -> AIRouter:
+    router = AIRouter(routes=routes, **options)
+    for provider in providers:
+        router.add(provider)
+    return router
+
+
+def _names(providers):
+    return [provider.name for provider in providers]
+
+
+def test_routes_and_model_names():
+    router = _router(_provider("gemini"), _provider("openai"), routes={"improve": ["openai", "missing"]})
+    assert _names(router.candidates("improve")) == ["openai"]
+    assert _names(router.candidates("analyze")) == ["gemini", "openai"]
+    assert router.providers["openai"].model == "openai/openai-model"
+
+
+def test_preferred_provider_kept_within_tolerance():
+    router = _router(_provider("gemini", 1.1), _provider("openai", 1.0), tolerance=0.2, explore_every=0)
+    assert _names(router.rank("analyze")) == ["gemini", "openai"]
+    router.providers["gemini"].latency.record(2.0)
+    assert _names(router.rank("analyze")) == ["openai", "gemini"]
+
+
+def test_unmeasured_providers_get_traffic():
+    router = _router(_provider("gemini", 1.0), _provider("openai"), explore_every=0)
+    assert _names(router.rank("analyze")) == ["openai", "gemini"]
+
+
+def test_errors_penalize_the_score():
+    router = _router(_provider("gemini", 1.0), _provider("openai", 1.5), explore_every=0)
+    breaker = router.providers["gemini"].breaker
+    for ok in (True, True, True, False):
+        breaker.record(ok)
+    # One failure in four stays under the breaker threshold but doubles the score
+    assert _names(router.rank("analyze")) == ["openai", "gemini"]
+
+
+def test_least_recently_used_is_explored():
+    router = _router(_provider("gemini", 1.0), _provider("openai", 3.0), explore_every=3)
+    router.providers["gemini"].last_used = 10.0
+    orders = [_names(router.rank("analyze"))[0] for _ in range(3)]
+    assert orders == ["gemini", "gemini", "openai"]
+
+
+def test_check_errors():
+    with pytest.raises(HTTPException) as unconfigured:
+        _router(_provider("gemini", configured=False)).check("analyze")
+    assert unconfigured.value.status_code == 500
+
+    router = _router(_provider("gemini"), _provider("openai", configured=False))
+    breaker = router.providers["gemini"].breaker
+    breaker.record(False)
+    breaker.record(False)
+    assert not router.providers["gemini"].available
+    with pytest.raises(HTTPException) as unavailable:
+        router.rank("analyze")
+    assert unavailable.value.status_code == 503
+    assert 1 <= int(unavailable.value.headers["Retry-After"]) <= 30
@@ -0,0 +1,135 @@
+"""AIScheduler admission control: caps, lanes, queue limits and held slots."""
+import asyncio
+from concurrent.futures import Future
+import pytest
+from fastapi import HTTPException
+from app.utils.ai_service import AIScheduler
+
+
+def _scheduler(**overrides) -> AIScheduler:
+    options = dict(max_concurrency=2, endpoint_concurrency=2, endpoint_limits={}, max_queue=10, queue_timeout=1.0)
+    options.update(overrides)
+    return AIScheduler(**options)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_global_and_endpoint_caps():
+    scheduler = _scheduler(max_concurrency=3, endpoint_limits={"improve": 1})
+
+    async def scenario():
+        await scheduler.acquire("improve")
+        waiting = asyncio.ensure_future(scheduler.acquire("improve"))
+        await _settle()
+        # improve is at its own cap, but other endpoints still get slots
+        await scheduler.acquire("analyze")
+        await scheduler.acquire("analyze")
+        assert not waiting.done()
+        assert not scheduler.try_acquire("analyze")  # Global cap
+        scheduler.release("analyze")
+        await _settle()
+        assert not waiting.done()  # The freed slot is not improve's
+        scheduler.release("improve")
+        await _settle()
+        assert waiting.done()
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["in_flight_by_endpoint"] == {"improve": 1, "analyze": 1}
+    assert stats["queued"]["free"] == 1
+
+
+def test_pro_lane_first_without_starving_free():
+    scheduler = _scheduler(max_concurrency=1, pro_burst=2)
+    order = []
+
+    async def call(name, pro):
+        await scheduler.acquire("analyze", pro=pro)
+        order.append(name)
+
+    async def scenario():
+        await scheduler.acquire("analyze")
+        tasks = [asyncio.ensure_future(call("free1", False))]
+        await _settle()
+        tasks += [asyncio.ensure_future(call(f"pro{i}", True)) for i in range(1, 4)]
+        await _settle()
+        for _ in tasks:
+            scheduler.release("analyze")
+            await _settle()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order == ["pro1", "pro2", "free1", "pro3"]
+
+
+def test_full_queue_and_queue_timeout_return_503():
+    scheduler = _scheduler(max_concurrency=1, max_queue=1, queue_timeout=0.05)
+
+    async def scenario():
+        await scheduler.acquire("analyze")
+        waiting = asyncio.ensure_future(scheduler.acquire("analyze"))
+        await _settle()
+        with pytest.raises(HTTPException) as full:
+            await scheduler.acquire("analyze")
+        with pytest.raises(HTTPException) as timed_out:
+            await waiting
+        return full.value, timed_out.value
+
+    full, timed_out = asyncio.run(scenario())
+    assert full.status_code == timed_out.status_code == 503
+    assert full.headers["Retry-After"] == "5"
+    stats = scheduler.stats()
+    assert (stats["rejected"]["free"], stats["timed_out"]["free"]) == (1, 1)
+    assert scheduler.queue_depth() == 0 and scheduler.in_flight == 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = _scheduler(max_concurrency=1)
+
+    async def scenario():
+        await scheduler.acquire("analyze")
+        waiting = asyncio.ensure_future(scheduler.acquire("analyze"))
+        await _settle()
+        waiting.cancel()
+        await _settle()
+        assert scheduler.queue_depth() == 0
+        scheduler.release("analyze")
+
+    asyncio.run(scenario())
+    assert scheduler.in_flight == 0
+
+
+def test_try_acquire_does_not_jump_the_queue():
+    scheduler = _scheduler(max_concurrency=1, endpoint_limits={"improve": 1})
+
+    async def scenario():
+        await scheduler.acquire("improve")
+        waiting = asyncio.ensure_future(scheduler.acquire("improve"))
+        await _settle()
+        assert not scheduler.try_acquire("analyze")
+        scheduler.release("improve")
+        await waiting
+        scheduler.release("improve")
+        assert scheduler.try_acquire("analyze", pro=True)
+
+    asyncio.run(scenario())
+    assert scheduler.stats()["admitted"] == {"pro": 1, "free": 2}
+
+
+def test_held_slot_is_released_when_the_thread_finishes():
+    scheduler = _scheduler(max_concurrency=1)
+    thread_call = Future()
+
+    async def scenario():
+        scheduler.hold("analyze")
+        scheduler.release_when_done("analyze", [thread_call])
+        assert not scheduler.try_acquire("analyze")
+        thread_call.set_result("late answer")
+        await _settle()
+        return scheduler.try_acquire("analyze")
+
+    assert asyncio.run(scenario())
+    assert scheduler.in_flight == 1
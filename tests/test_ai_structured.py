@@ -0,0 +1,29 @@
+"""Lenient JSON extraction from AI responses."""
+import pytest
+from app.utils.ai_structured import StructuredOutputError, extract_json
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('prose {not json} {"a": 1}', {"a": 1}),
+    ('```json\n{"a": [1, 2,],}\n```', {"a": [1, 2]}),
+    ('{"text": "line\nbreak"}', {"text": "line\nbreak"}),
+    ('{"a": {"b": 1}, "c": 2', {"a": {"b": 1}}),
+    ('{"a": "ok"', {"a": "ok"}),
+    ('{"a": true', {"a": True}),
+])
+def test_extract_json(text, expected):
+    assert extract_json(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"score": 7, "content": 8', {"score": 7}),
+    ('{"a": "x", "b": "trunc', {"a": "x"}),
+    ('{"a": 1, "b": [1, 2', {"a": 1, "b": [1]}),
+])
+def test_truncated_values_are_dropped(text, expected):
+    assert extract_json(text) == expected
+
+
+def test_no_json():
+    with pytest.raises(StructuredOutputError):
+        extract_json("no braces here")
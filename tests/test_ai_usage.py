@@ -0,0 +1,85 @@
+"""AI usage metering: cost, buffering and batched flushes."""
+import asyncio
+import pytest
+from pymongo.errors import BulkWriteError
+from app.utils import ai_usage as ai_usage_module
+from app.utils.ai_usage import UsageMeter, token_cost
+
+
+class FakeUsage:
+    def __init__(self):
+        self.batches = []
+        self.error = None
+
+    async def insert_many(self, docs, ordered=True):
+        if self.error is not None:
+            for doc in docs:
+                doc["_id"] = "assigned"  # The driver sets ids even when the write fails
+            raise self.error
+        self.batches.append(list(docs))
+
+
+@pytest.fixture
+def usage(monkeypatch):
+    collection = FakeUsage()
+    monkeypatch.setattr(ai_usage_module, "db", {ai_usage_module.USAGE_COLLECTION: collection})
+    monkeypatch.setattr(ai_usage_module.settings, "ai_token_prices", {"gemini": (1.0, 2.0)})
+    return collection
+
+
+def _record(meter, n=1):
+    for _ in range(n):
+        meter.record("analyze", "u1", "gemini", 1000, 500, 12.34)
+
+
+def test_token_cost(usage):
+    assert token_cost("gemini", 1_000_000, 500_000) == 2.0
+    assert token_cost("cache", 1000, 1000) == 0.0
+
+
+def test_buffer_keeps_the_newest_events(usage):
+    meter = UsageMeter(batch_size=100, flush_interval=60, max_buffer=3)
+    _record(meter, 5)
+    assert meter.stats() == {"buffered": 3, "written": 0, "dropped": 2, "failed_flushes": 0}
+    event = meter._buffer[0]
+    assert event["meta"] == {"endpoint": "analyze", "user_id": "u1", "provider": "gemini"}
+    assert (event["latency_ms"], event["cost_usd"]) == (12.3, 0.002)
+
+
+def test_failed_flush_keeps_events_for_a_retry(usage):
+    meter = UsageMeter(batch_size=100, flush_interval=60)
+    _record(meter, 2)
+    usage.error = RuntimeError("mongo down")
+    asyncio.run(meter.flush())
+    assert meter.stats()["buffered"] == 2 and meter.failed_flushes == 1
+    assert all("_id" not in doc for doc in meter._buffer)
+
+    usage.error = None
+    asyncio.run(meter.flush())
+    assert meter.stats()["buffered"] == 0 and meter.written == 2
+    assert len(usage.batches) == 1
+
+
+def test_rejected_documents_are_not_retried(usage):
+    meter = UsageMeter(batch_size=100, flush_interval=60)
+    _record(meter, 3)
+    usage.error = BulkWriteError({"nInserted": 2, "writeErrors": [{"index": 1}]})
+    asyncio.run(meter.flush())
+    assert meter.stats() == {"buffered": 0, "written": 2, "dropped": 1, "failed_flushes": 1}
+
+
+def test_full_batch_wakes_the_flush_loop(usage):
+    meter = UsageMeter(batch_size=2, flush_interval=60)
+
+    async def scenario():
+        meter.start()
+        _record(meter, 2)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        flushed = meter.written
+        _record(meter)
+        await meter.stop()
+        return flushed
+
+    assert asyncio.run(scenario()) == 2
+    assert meter.written == 3 and [len(batch) for batch in usage.batches] == [2, 1]
@@ -0,0 +1,53 @@
+"""Local ATS keyword matching for /ai/optimize-for-job."""
+from app.models.cv import CVData
+from app.utils.ats_matcher import match_cv_to_job, terms
+
+
+def test_acronym_plurals_match_singular():
+    cv = CVData(summary="Designed a REST API for payments")
+    result = match_cv_to_job(cv, "Experience with REST APIs.")
+    assert "rest api" in result.matched_keywords
+    assert result.missing_keywords == []
+
+
+def test_short_plurals_fold():
+    keys = [key for key, _ in terms("docs bugs")]
+    assert keys[:2] == ["doc", "bug"]
+
+
+def test_skill_lists_are_not_phrases():
+    result = match_cv_to_job(CVData(), "C++ C# node.js .NET")
+    assert result.missing_keywords == ["c++", "c#", "node.js", ".net"]
+
+
+def test_skills_inside_phrases_are_kept():
+    cv = CVData(summary="Python developer")
+    result = match_cv_to_job(cv, "Python backend services. Python backend services.")
+    assert "python" in result.matched_keywords
+    assert "python backend" in result.missing_keywords
+
+
+def test_generic_words_are_not_keywords():
+    job = "Strong experience required. Experience with Kubernetes. We need 5 years of experience."
+    result = match_cv_to_job(CVData(), job)
+    listed = result.matched_keywords + result.missing_keywords
+    assert "kubernetes" in listed
+    assert not any(word in keyword for keyword in listed for word in ("experience", "need", "required"))
+
+
+def test_generic_words_count_towards_the_percentage():
+    job = "Strong experience required. Experience with Kubernetes, Terraform and AWS."
+    generic_only = match_cv_to_job(CVData(summary="strong experience required years"), job)
+    assert generic_only.match_percentage > 0
+    assert generic_only.matched_keywords == []
+    skills_only = match_cv_to_job(CVData(summary="Kubernetes, Terraform, AWS"), job)
+    assert generic_only.match_percentage < skills_only.match_percentage < 100
+
+
+def test_all_generic_job_lists_no_keywords():
+    job = "Experience required. Strong team."
+    missing = match_cv_to_job(CVData(), job)
+    assert (missing.match_percentage, missing.matched_keywords, missing.missing_keywords) == (0, [], [])
+    covered = match_cv_to_job(CVData(summary="Experience required. Strong team."), job)
+    assert covered.match_percentage == 100
+    assert covered.matched_keywords == []
@@ -0,0 +1,24 @@
+"""Rule-based CV scoring."""
+from app.models.cv import CVData
+from app.tools.synthetic import make_cv
+from app.utils.cv_scorer import DIMENSION_ADVICE, score_cv
+
+
+def test_recommendations_target_the_weakest_dimensions():
+    analysis = score_cv(CVData(summary="Engineer."))
+    assert 0 < len(analysis.recommendations) <= 3
+    weakest = min(analysis.breakdown.model_dump().items(), key=lambda item: item[1])[0]
+    assert analysis.recommendations[0] == DIMENSION_ADVICE[weakest]
+
+
+def test_complete_cv_still_gets_a_recommendation():
+    analysis = score_cv(make_cv("medium", "en").data)
+    assert len(analysis.weaknesses) <= 5
+    assert analysis.recommendations
+
+
+def test_scores_stay_in_range():
+    for data in (CVData(), make_cv("small", "tr").data, make_cv("huge", "en").data):
+        analysis = score_cv(data)
+        assert 0 <= analysis.overall_score <= 100
+        assert all(0 <= score <= 100 for score in analysis.breakdown.model_dump().values())
@@ -0,0 +1,67 @@
+"""Gemini client: model reuse, JSON mode and deadlines."""
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from app.utils import ai_service
+from app.utils.ai_service import GeminiClient
+
+
+class FakeModel:
+    created = []
+    delay = 0.0
+
+    def __init__(self, model_name, system_instruction):
+        self.system_instruction = system_instruction
+        self.calls = []
+        FakeModel.created.append(system_instruction)
+
+    def generate_content(self, user_message, generation_config=None, request_options=None):
+        self.calls.append((user_message, generation_config, request_options))
+        time.sleep(FakeModel.delay)
+        usage = SimpleNamespace(prompt_token_count=7, candidates_token_count=3)
+        return SimpleNamespace(text=f"re: {user_message}", usage_metadata=usage)
+
+
+@pytest.fixture(autouse=True)
+def fake_model(monkeypatch):
+    FakeModel.created, FakeModel.delay = [], 0.0
+    monkeypatch.setattr(ai_service.genai, "GenerativeModel", FakeModel)
+
+
+def test_models_are_reused_per_system_message_with_lru_eviction():
+    client = GeminiClient("gemini-1.5-flash", max_threads=1, timeout=5, max_models=2)
+    a = client.get_model("a")
+    assert client.get_model("a") is a
+    client.get_model("b")
+    client.get_model("a")  # Refreshes "a", so "b" is the oldest
+    client.get_model("c")
+    assert list(client._models) == ["a", "c"]
+    assert client.get_model("a") is a
+    assert FakeModel.created == ["a", "b", "c"]
+
+
+def test_generate_reports_usage_and_json_mode():
+    client = GeminiClient("gemini-1.5-flash", max_threads=1, timeout=5)
+    completion = asyncio.run(client.generate("sys", "hi", json_mode=True))
+    assert (completion.text, completion.prompt_tokens, completion.completion_tokens) == ("re: hi", 7, 3)
+    _, config, options = client.get_model("sys").calls[0]
+    assert config == {"response_mime_type": "application/json"}
+    assert options == {"timeout": 5}
+
+
+def test_legacy_models_get_no_json_mode():
+    client = GeminiClient("gemini-pro", max_threads=1, timeout=5)
+    asyncio.run(client.generate("sys", "hi", json_mode=True))
+    assert client.get_model("sys").calls[0][1] is None
+
+
+def test_deadline_raises_and_keeps_the_running_future():
+    FakeModel.delay = 0.3
+    client = GeminiClient("gemini-1.5-flash", max_threads=1, timeout=5)
+    running = []
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(client.generate("sys", "hi", timeout=0.05, running=running))
+    assert len(running) == 1
+    # The worker thread outlives the wait and still finishes
+    assert running[0].result(timeout=2).text == "re: hi"
@@ -0,0 +1,124 @@
+"""PDF cache: content-addressed keys, byte-budgeted memory tier, GridFS tier."""
+import asyncio
+from types import SimpleNamespace
+from gridfs.errors import NoFile
+from app.models.cv import CV
+from app.models.user import User
+from app.utils.pdf_cache import PDFCache, etag_matches, pdf_cache_key
+
+
+class FakeBucket:
+    """In-memory stand-in for the GridFS bucket calls PDFCache makes."""
+
+    def __init__(self):
+        self.files = {}
+        self.reads = 0
+
+    async def open_download_stream_by_name(self, name):
+        self.reads += 1
+        if name not in self.files:
+            raise NoFile(name)
+        data, metadata = self.files[name]
+
+        async def read():
+            return data
+        return SimpleNamespace(read=read, metadata=metadata)
+
+    async def upload_from_stream(self, name, data, metadata=None):
+        self.files[name] = (data, metadata)
+
+    async def _find(self, query):
+        for name, (_, metadata) in list(self.files.items()):
+            if metadata["cv_id"] != query["metadata.cv_id"]:
+                continue
+            if name == query.get("filename", {}).get("$ne"):
+                continue
+            yield SimpleNamespace(_id=name)
+
+    def find(self, query):
+        return self._find(query)
+
+    async def delete(self, file_id):
+        del self.files[file_id]
+
+
+def _cache(max_memory_bytes=100) -> PDFCache:
+    cache = PDFCache(max_memory_bytes=max_memory_bytes)
+    cache._bucket = FakeBucket()
+    return cache
+
+
+def test_key_changes_with_content_and_watermark():
+    cv = CV(user_id="u1", title="CV")
+    free, pro = User(user_id="u1", email="a@b.c", name="A"), User(user_id="u1", email="a@b.c", name="A", is_pro=True)
+    assert pdf_cache_key(cv, free) == pdf_cache_key(cv.model_copy(deep=True), free)
+    assert pdf_cache_key(cv, free) != pdf_cache_key(cv, pro)
+    edited = cv.model_copy(deep=True)
+    edited.data.summary = "Changed"
+    assert pdf_cache_key(edited, free) != pdf_cache_key(cv, free)
+
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches(None, '"b"')
+    assert not etag_matches('"c"', '"b"')
+
+
+def test_memory_tier_stays_within_its_byte_budget():
+    cache = _cache(max_memory_bytes=100)
+
+    async def scenario():
+        await cache.put("k1", b"x" * 40, cv_id="cv1", user_id="u1")
+        await cache.put("k2", b"x" * 40, cv_id="cv2", user_id="u1")
+        await cache.get("k1")  # k1 is now the most recently used
+        await cache.put("k3", b"x" * 40, cv_id="cv3", user_id="u1")
+        await cache.put("big", b"x" * 101, cv_id="cv4", user_id="u1")
+
+    asyncio.run(scenario())
+    assert list(cache._entries) == ["k1", "k3"]
+    assert cache._memory_bytes == 80
+    # Oversized and evicted renders are still served from GridFS
+    assert set(cache.bucket.files) == {"k1", "k2", "k3", "big"}
+
+
+def test_gridfs_hit_fills_the_memory_tier():
+    cache = _cache()
+
+    async def scenario():
+        await cache.bucket.upload_from_stream("k1", b"%PDF", metadata={"cv_id": "cv1", "user_id": "u1"})
+        first = await cache.get("k1")
+        second = await cache.get("k1")
+        return first, second, await cache.get("missing")
+
+    assert asyncio.run(scenario()) == (b"%PDF", b"%PDF", None)
+    assert cache.bucket.reads == 2  # the repeat hit came from memory
+    assert cache._entries["k1"] == (b"%PDF", "cv1")
+
+
+def test_new_render_replaces_the_cvs_older_renders():
+    cache = _cache()
+
+    async def scenario():
+        await cache.put("old", b"v1", cv_id="cv1", user_id="u1")
+        await cache.put("other", b"o1", cv_id="cv2", user_id="u1")
+        await cache.put("new", b"v2", cv_id="cv1", user_id="u1")
+
+    asyncio.run(scenario())
+    assert set(cache._entries) == {"other", "new"}
+    assert set(cache.bucket.files) == {"other", "new"}
+
+
+def test_evict_cv_clears_both_tiers():
+    cache = _cache()
+
+    async def scenario():
+        await cache.put("k1", b"v1", cv_id="cv1", user_id="u1")
+        await cache.put("k2", b"o1", cv_id="cv2", user_id="u1")
+        await cache.evict_cv("cv1")
+        return await cache.get("k1")
+
+    assert asyncio.run(scenario()) is None
+    assert set(cache._entries) == {"k2"}
+    assert cache._memory_bytes == 2
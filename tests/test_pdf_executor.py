@@ -0,0 +1,124 @@
+"""Render process pool: backlog limit, soft and hard timeouts, crashed workers.
+
+The jobs below replace ``_render_job`` in the parent; spawned workers import
+this module to run them.
+"""
+import asyncio
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from fastapi import HTTPException
+from app.models.cv import CV
+from app.models.user import User
+from app.utils import pdf_executor
+from app.utils.pdf_executor import PDFRenderExecutor
+
+CV_ = CV(user_id="u1", title="Test")
+USER = User(user_id="u1", email="u1@example.com", name="U")
+
+
+def _quick_job(cv, user, timeout):
+    time.sleep(0.3)
+    return b"%PDF", 0
+
+
+def _slow_job(cv, user, timeout):
+    # Same alarm as the real job, so the worker raises RenderTimeout itself
+    signal.signal(signal.SIGALRM, pdf_executor._raise_render_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    time.sleep(5)
+    return b"%PDF", 0
+
+
+def _hung_job(cv, user, timeout):
+    time.sleep(30)
+    return b"%PDF", 0
+
+
+def _crash_job(cv, user, timeout):
+    os._exit(1)
+
+
+def _executor(monkeypatch, job, workers=1, queue_size=0, timeout=0.2) -> PDFRenderExecutor:
+    monkeypatch.setattr(pdf_executor, "_render_job", job)
+    return PDFRenderExecutor(workers=workers, queue_size=queue_size, timeout=timeout, max_renders=0, max_rss_mb=0)
+
+
+def _status(outcome) -> int:
+    if isinstance(outcome, HTTPException):
+        return outcome.status_code
+    return 200 if isinstance(outcome, bytes) else -1
+
+
+def test_full_backlog_is_rejected_with_retry_after(monkeypatch):
+    executor = _executor(monkeypatch, _quick_job, workers=1, queue_size=1, timeout=5)
+
+    async def scenario():
+        return await asyncio.gather(*(executor.render(CV_, USER) for _ in range(3)), return_exceptions=True)
+
+    try:
+        outcomes = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert sorted(_status(o) for o in outcomes) == [200, 200, 503]
+    rejected = next(o for o in outcomes if isinstance(o, HTTPException))
+    assert rejected.headers["Retry-After"]
+    assert executor.pending == 0
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGALRM"), reason="soft timeout needs SIGALRM")
+def test_soft_timeout_keeps_the_pool(monkeypatch):
+    executor = _executor(monkeypatch, _slow_job)
+
+    async def scenario():
+        with pytest.raises(HTTPException) as raised:
+            await executor.render(CV_, USER)
+        return raised.value, executor._pool
+
+    try:
+        error, pool = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert error.status_code == 504
+    assert pool is not None
+
+
+def test_hard_timeout_kills_the_pool(monkeypatch):
+    monkeypatch.setattr(pdf_executor, "HARD_TIMEOUT_GRACE", 0.5)
+    executor = _executor(monkeypatch, _hung_job)
+
+    async def scenario():
+        started = time.perf_counter()
+        with pytest.raises(HTTPException) as raised:
+            await executor.render(CV_, USER)
+        return raised.value, time.perf_counter() - started
+
+    try:
+        error, elapsed = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert error.status_code == 504
+    assert elapsed < 10
+    assert executor._pool is None
+
+
+def test_crashed_worker_is_retried_once(monkeypatch):
+    executor = _executor(monkeypatch, _crash_job, timeout=5)
+    attempts = []
+    real_run = executor._run
+
+    async def counting_run(cv, user, retry=True):
+        attempts.append(retry)
+        return await real_run(cv, user, retry)
+
+    monkeypatch.setattr(executor, "_run", counting_run)
+
+    try:
+        with pytest.raises(BrokenProcessPool):
+            asyncio.run(executor.render(CV_, USER))
+    finally:
+        executor.shutdown()
+    assert executor.pending == 0
+    assert attempts == [True, False]
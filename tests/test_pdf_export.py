@@ -0,0 +1,75 @@
+"""Streaming ZIP export of a user's CVs."""
+import asyncio
+import io
+import zipfile
+import pytest
+from fastapi import HTTPException
+from app.models.user import User
+from app.tools.synthetic import make_cv
+from app.utils import pdf_export
+from app.utils.pdf_export import archive_name, stream_cv_zip
+
+USER = User(user_id="u1", email="a@b.c", name="A")
+
+
+async def _cursor(titles):
+    for i, title in enumerate(titles):
+        cv = make_cv("small", seed=i)
+        cv.cv_id, cv.user_id, cv.title = f"cv{i}", "u1", title
+        yield cv.model_dump(mode="json")
+
+
+async def _collect(titles, concurrency=2) -> zipfile.ZipFile:
+    chunks = [chunk async for chunk in stream_cv_zip(_cursor(titles), USER, concurrency)]
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_archive_names_are_safe_and_unique():
+    taken = set()
+    assert archive_name("Jane/CV", taken) == "Jane_CV.pdf"
+    assert archive_name("Jane/CV", taken) == "Jane_CV (2).pdf"
+    assert archive_name("...", taken) == "CV.pdf"
+
+
+def test_failed_renders_are_listed_and_concurrency_is_bounded(monkeypatch):
+    running, peak = 0, 0
+
+    async def render(cv, user):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if cv.title == "Broken":
+            raise ValueError("bad content")
+        return b"%PDF " + cv.title.encode()
+
+    monkeypatch.setattr(pdf_export, "get_or_render_pdf", render)
+    archive = asyncio.run(_collect(["A", "Broken", "B", "C"], concurrency=2))
+    assert sorted(archive.namelist()) == ["A.pdf", "B.pdf", "C.pdf", "errors.txt"]
+    assert archive.read("errors.txt") == b"Could not render:\nBroken\n"
+    assert archive.testzip() is None
+    assert peak == 2
+
+
+def test_busy_pool_is_retried_then_fails_the_export(monkeypatch):
+    calls = {"B": 0}
+
+    async def render(cv, user):
+        if cv.title == "B":
+            calls["B"] += 1
+            if calls["B"] == 1:
+                raise HTTPException(status_code=503, detail="busy", headers={"Retry-After": "0"})
+        return b"%PDF"
+
+    monkeypatch.setattr(pdf_export, "get_or_render_pdf", render)
+    archive = asyncio.run(_collect(["A", "B"]))
+    assert sorted(archive.namelist()) == ["A.pdf", "B.pdf"]
+
+    async def always_busy(cv, user):
+        raise HTTPException(status_code=503, detail="busy", headers={"Retry-After": "0"})
+
+    monkeypatch.setattr(pdf_export, "get_or_render_pdf", always_busy)
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(_collect(["A", "B"]))
+    assert raised.value.status_code == 503
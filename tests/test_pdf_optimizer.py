@@ -0,0 +1,54 @@
+"""Post-render PDF size optimization levels."""
+import io
+import pytest
+from PIL import Image
+from app.utils import pdf_optimizer
+from app.utils.pdf_optimizer import LEVEL_LOSSLESS, LEVEL_MAX, LEVEL_NONE, _multiply, optimize_level, optimize_pdf
+
+pypdf = pytest.importorskip("pypdf")
+
+
+def _image_pdf(pixels: int, width_pt: float) -> bytes:
+    """One page with a ``pixels``-wide noisy RGB image drawn ``width_pt`` wide."""
+    image = Image.effect_noise((pixels, pixels), 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PDF", resolution=pixels / width_pt * 72)
+    return buffer.getvalue()
+
+
+def _first_image_width(pdf_bytes: bytes) -> int:
+    return pypdf.PdfReader(io.BytesIO(pdf_bytes)).pages[0].images[0].image.width
+
+
+def test_matrix_concatenation():
+    scale, move = [2.0, 0, 0, 3.0, 0, 0], [1.0, 0, 0, 1.0, 10.0, 20.0]
+    assert _multiply(scale, move) == [2.0, 0, 0, 3.0, 10.0, 20.0]
+    assert _multiply(move, scale) == [2.0, 0, 0, 3.0, 20.0, 60.0]
+
+
+def test_unknown_level_falls_back_to_lossless(monkeypatch):
+    monkeypatch.setattr(pdf_optimizer.settings, "pdf_optimize_level", "turbo")
+    assert optimize_level() == LEVEL_LOSSLESS
+
+
+def test_none_and_broken_input_are_returned_unchanged():
+    pdf = _image_pdf(64, 100)
+    assert optimize_pdf(pdf, LEVEL_NONE) is pdf
+    assert optimize_pdf(b"not a pdf", LEVEL_LOSSLESS) == b"not a pdf"
+
+
+def test_lossless_never_grows_the_file():
+    pdf = _image_pdf(64, 100)
+    assert len(optimize_pdf(pdf, LEVEL_LOSSLESS)) <= len(pdf)
+
+
+def test_max_downsamples_oversized_images(monkeypatch):
+    monkeypatch.setattr(pdf_optimizer.settings, "pdf_image_dpi", 72)
+    oversized = _image_pdf(1200, 200)
+    optimized = optimize_pdf(oversized, LEVEL_MAX)
+    assert len(optimized) < len(oversized)
+    assert _first_image_width(optimized) == 200
+
+    # Within DOWNSAMPLE_THRESHOLD of the target: left alone
+    close = _image_pdf(220, 200)
+    assert _first_image_width(optimize_pdf(close, LEVEL_MAX)) == 220
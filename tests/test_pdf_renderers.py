@@ -0,0 +1,30 @@
+"""PDF renderer backends and their per-template selection."""
+import pytest
+from app.utils import pdf_renderers
+from app.utils.pdf_renderers import PDFRendererUnavailable, backend_for_template, get_renderer
+
+HTML = "<html><body><h1>CV</h1><p>Text</p></body></html>"
+
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.setattr(pdf_renderers.settings, "pdf_backend", "xhtml2pdf")
+    monkeypatch.setattr(pdf_renderers.settings, "pdf_template_backends", {"tech": "weasyprint", "creative": "bogus"})
+    assert backend_for_template("minimal") == "xhtml2pdf"
+    assert backend_for_template("tech") == "weasyprint"
+    # Unknown names fall back instead of failing every render
+    assert backend_for_template("creative") == "xhtml2pdf"
+    assert get_renderer("tech").name == "weasyprint"
+
+
+def test_xhtml2pdf_renders_a_pdf():
+    pytest.importorskip("xhtml2pdf")
+    assert pdf_renderers.RENDERERS["xhtml2pdf"].render(HTML).startswith(b"%PDF")
+
+
+def test_weasyprint_renders_or_reports_unavailable():
+    renderer = pdf_renderers.RENDERERS["weasyprint"]
+    try:
+        pdf = renderer.render(HTML)
+    except PDFRendererUnavailable:
+        return  # Not installed, or its system libraries are missing
+    assert pdf.startswith(b"%PDF")
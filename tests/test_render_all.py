@@ -0,0 +1,59 @@
+"""Offline bulk renderer: checkpointing and failure accounting."""
+import argparse
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from app.tools.render_all import Checkpoint, RenderAll
+
+
+def _runner(tmp_path) -> RenderAll:
+    args = argparse.Namespace(gridfs=False, out=str(tmp_path / "out"), checkpoint=str(tmp_path / "done.txt"))
+    return RenderAll(args)
+
+
+def _future(result=None, error=None) -> Future:
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+def _pending(runner, cv_id):
+    runner.keys[cv_id] = f"key-{cv_id}"
+    return {cv_id: {"cv_id": cv_id, "user_id": "u1"}}
+
+
+def test_checkpoint_resumes_from_finished_ids(tmp_path):
+    path = str(tmp_path / "done.txt")
+    first = Checkpoint(path)
+    first.mark("cv1")
+    first.mark("cv2")
+    first.close()
+    resumed = Checkpoint(path)
+    assert resumed.done == {"cv1", "cv2"}
+    resumed.close()
+    assert Checkpoint(None).done == set()
+
+
+def test_rendered_pdf_is_written_and_checkpointed(tmp_path):
+    runner = _runner(tmp_path)
+    runner._collect(_future({"cv_id": "cv1", "pdf": b"%PDF", "ms": 5.0}), "cv1", _pending(runner, "cv1"))
+    runner.checkpoint.close()
+    assert (tmp_path / "out" / "u1" / "cv1.pdf").read_bytes() == b"%PDF"
+    assert runner.stats["rendered"] == 1
+    assert Checkpoint(str(tmp_path / "done.txt")).done == {"cv1"}
+
+
+def test_failures_are_counted_and_not_checkpointed(tmp_path):
+    runner = _runner(tmp_path)
+    runner._collect(_future({"cv_id": "cv1", "error": "ValueError: bad"}), "cv1", _pending(runner, "cv1"))
+    runner._collect(_future(error=RuntimeError("lost")), "cv2", _pending(runner, "cv2"))
+    assert not runner.pool_broken
+    runner._collect(_future(error=BrokenProcessPool("died")), "cv3", _pending(runner, "cv3"))
+    runner.checkpoint.close()
+    assert runner.pool_broken
+    assert runner.stats["failed"] == 3
+    assert runner.errors == {"ValueError": 1, "RuntimeError": 1, "BrokenProcessPool": 1}
+    assert runner.keys == {}
+    assert Checkpoint(str(tmp_path / "done.txt")).done == set()
@@ -0,0 +1,98 @@
+"""SingleFlight: coalescing identical concurrent AI calls."""
+import asyncio
+import gc
+import pytest
+from app.utils.ai_service import SingleFlight, flight_key
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", call) for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert results == [("answer", False), ("answer", True), ("answer", True)]
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "coalesced": 2}
+
+
+def test_finished_calls_are_not_reused():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        return await flight.do("k", call), await flight.do("k", call)
+
+    assert asyncio.run(scenario()) == ((1, False), (2, False))
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", call) for _ in range(2)), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(scenario())] == [ValueError, ValueError]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("k", call))
+        second = asyncio.ensure_future(flight.do("k", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == ("answer", True)
+
+
+def test_abandoned_failure_is_not_reported_as_unretrieved():
+    flight = SingleFlight()
+    unhandled = []
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+        caller = asyncio.ensure_future(flight.do("k", call))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.03)
+
+    asyncio.run(scenario())
+    gc.collect()
+    assert unhandled == []
+
+
+def test_flight_key_separates_endpoint_lane_and_mode():
+    key = flight_key("analyze", False, "sys", "text")
+    assert key == flight_key("analyze", False, "sys", "text")
+    assert key != flight_key("improve", False, "sys", "text")
+    assert key != flight_key("analyze", True, "sys", "text")
+    assert key != flight_key("analyze", False, "sys", "text", json_mode=True)
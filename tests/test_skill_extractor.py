@@ -0,0 +1,44 @@
+"""Aho-Corasick skill extraction from CV descriptions."""
+from app.models.cv import CVData, Experience, Project, Skill
+from app.utils.skill_extractor import SkillAutomaton, extract_skills, skill_patterns, summarize_skills
+
+AUTOMATON = SkillAutomaton(skill_patterns(["Python", "React", "React Native", "Java", "JavaScript", "Go", "C++", "AWS", "PostgreSQL"]))
+
+
+def _skills(text):
+    return [(text[start:end], skill) for start, end, skill in AUTOMATON.find(text)]
+
+
+def test_word_boundaries_and_longest_match():
+    assert _skills("Built React Native apps and React sites") == [("React Native", "React Native"), ("React", "React")]
+    assert _skills("JavaScript, not Java; Javanese is no skill") == [("JavaScript", "JavaScript"), ("Java", "Java")]
+    assert _skills("Wrote C++ and Cpython") == [("C++", "C++")]
+
+
+def test_case_insensitive_except_common_words():
+    assert _skills("python and POSTGRES on aws") == [("python", "Python"), ("POSTGRES", "PostgreSQL"), ("aws", "AWS")]
+    assert _skills("let's go with Go") == [("Go", "Go")]
+
+
+def test_offsets_point_into_each_description():
+    cv_data = CVData(
+        experiences=[Experience(id="e1", description="Python services"), Experience(id="e2", description="")],
+        projects=[Project(id="p1", description="A React app\nin Go")],
+    )
+    occurrences = extract_skills(cv_data, AUTOMATON)
+    texts = {"e1": cv_data.experiences[0].description, "p1": cv_data.projects[0].description}
+    assert [(o.skill, o.section, o.item_id) for o in occurrences] == [
+        ("Python", "experiences", "e1"), ("React", "projects", "p1"), ("Go", "projects", "p1"),
+    ]
+    assert [texts[o.item_id][o.start:o.end] for o in occurrences] == ["Python", "React", "Go"]
+
+
+def test_summary_flags_unlisted_skills():
+    cv_data = CVData(
+        experiences=[Experience(id="e1", description="Python and PostgreSQL on AWS, more Python")],
+        projects=[Project(id="p1", technologies=["aws"])],
+        skills=[Skill(name="postgres")],
+    )
+    summary = summarize_skills(cv_data, extract_skills(cv_data, AUTOMATON), AUTOMATON)
+    assert summary["skills"][0]["name"] == "Python" and len(summary["skills"][0]["occurrences"]) == 2
+    assert summary["new_skills"] == ["Python"]
@@ -0,0 +1,57 @@
+"""Offline job title lookups for /ai/suggest-skills."""
+import pytest
+from app.models.ai import SkillSuggestions
+from app.utils.skill_taxonomy import SkillTaxonomy, learnable_title, normalize_title, same_head
+
+
+@pytest.fixture(scope="module")
+def taxonomy():
+    index = SkillTaxonomy()
+    index.load_bundled()
+    return index
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Sr. Back-end Developer", "Backend Developer"),
+    ("yazilim muhendisi", "Yazılım Mühendisi"),
+    ("Frontend Develper", "Frontend Developer"),
+    ("Data Scientists", "Data Scientist"),
+])
+def test_lookup_hits(taxonomy, title, expected):
+    match = taxonomy.lookup(title)
+    assert match is not None and match.title == expected
+
+
+@pytest.mark.parametrize("title", [
+    "Account Manager",
+    "Data Entry",
+    "Project Engineer",
+    "Marketing Analyst",
+    "Developer",
+])
+def test_lookup_rejects_near_misses(taxonomy, title):
+    assert taxonomy.lookup(title) is None
+
+
+def test_same_head():
+    assert same_head("frontend develper", "frontend developer")
+    assert same_head("data scientists", "data scientist")
+    assert not same_head("account manager", "accountant")
+    assert not same_head("data entry", "data engineer")
+
+
+def test_learnable_title():
+    assert learnable_title(normalize_title("Senior Rust Developer"))
+    assert not learnable_title(normalize_title("!!!"))
+    assert not learnable_title(normalize_title("I want a job where I can work with computers all day"))
+
+
+def test_learned_titles_are_capped():
+    index = SkillTaxonomy(max_learned=2)
+    skills = SkillSuggestions(technical_skills=["Rust"], soft_skills=["Focus"])
+    assert index._add_learned("Rust Developer", skills)
+    assert index._add_learned("Zig Developer", skills)
+    assert not index._add_learned("Nim Developer", skills)
+    # Updating an already learned title does not count against the cap
+    assert index._add_learned("Rust Developer", skills)
+    assert index.learned == 2 and len(index) == 2
@@ -0,0 +1,69 @@
+"""CV HTML rendering from the precompiled Jinja2 templates and the fragment cache."""
+from markupsafe import Markup
+from app.models.user import User
+from app.tools.synthetic import make_cv
+from app.utils.template_engine import (
+    DEFAULT_PRIMARY_COLOR, FragmentCache, fragment_cache, get_template, render_cv_html, safe_color, visible_sections
+)
+
+FREE = User(user_id="u1", email="a@b.c", name="A")
+PRO = User(user_id="u1", email="a@b.c", name="A", is_pro=True)
+
+
+def test_user_fields_are_escaped():
+    cv = make_cv("small")
+    cv.data.summary = '<script>alert("x")</script>'
+    cv.data.experiences[0].company = "<b>Evil & Co</b>"
+    html = render_cv_html(cv, PRO)
+    assert "<script>" not in html and "<b>Evil" not in html
+    assert "&lt;script&gt;" in html
+    assert "&lt;b&gt;Evil &amp; Co&lt;/b&gt;" in html
+
+
+def test_unknown_template_and_color_fall_back():
+    assert get_template("nope") is get_template("minimal")
+    assert safe_color("#abc") == "#abc"
+    assert safe_color("red;}body{display:none") == DEFAULT_PRIMARY_COLOR
+
+
+def test_sections_follow_order_and_visibility():
+    cv = make_cv("small")
+    cv.data.section_order = ["skills", "bogus", "summary"]
+    cv.settings.visible_sections["education"] = False
+    assert visible_sections(cv) == ["skills", "summary", "experience", "languages", "certificates", "projects"]
+
+
+def test_watermark_only_for_free_users():
+    cv = make_cv("small")
+    assert render_cv_html(cv, FREE) != render_cv_html(cv, PRO)
+
+
+def test_rerender_only_renders_changed_fragments():
+    fragment_cache.clear()
+    cv = make_cv("small")
+    render_cv_html(cv, PRO)
+    first_misses = fragment_cache.misses
+    assert first_misses > 0
+
+    render_cv_html(cv, PRO)
+    assert fragment_cache.misses == first_misses
+
+    cv.data.experiences[0].description = "Led a migration."
+    render_cv_html(cv, PRO)
+    assert fragment_cache.misses == first_misses + 1
+
+    # A style change invalidates every fragment
+    cv.settings.primary_color = "#123456"
+    render_cv_html(cv, PRO)
+    assert fragment_cache.misses == 2 * first_misses + 1
+
+
+def test_fragment_cache_evicts_least_recently_used():
+    cache = FragmentCache(max_entries=2)
+    cache.put("a", Markup("A"))
+    cache.put("b", Markup("B"))
+    assert cache.get("a") == "A"
+    cache.put("c", Markup("C"))
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert (cache.hits, cache.misses) == (3, 1)
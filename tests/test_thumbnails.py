@@ -0,0 +1,95 @@
+"""Dashboard thumbnails: keys, sources, debouncing and coalescing."""
+import asyncio
+import io
+import pytest
+from PIL import Image
+from app.models.user import User
+from app.tools.synthetic import make_cv
+from app.utils import thumbnails
+from app.utils.thumbnails import SOURCE_PDF, SOURCE_SCHEMATIC, ThumbnailStore, make_thumbnail, thumbnail_key
+
+USER = User(user_id="u1", email="a@b.c", name="A")
+
+
+def _size(png: bytes):
+    return Image.open(io.BytesIO(png)).size
+
+
+def test_thumbnail_key_follows_pdf_key_and_width():
+    assert thumbnail_key("pdf1", 240) == thumbnail_key("pdf1", 240)
+    assert thumbnail_key("pdf1", 240) != thumbnail_key("pdf2", 240)
+    assert thumbnail_key("pdf1", 240) != thumbnail_key("pdf1", 320)
+
+
+def test_schematic_without_pdf():
+    png, source = make_thumbnail(None, make_cv("small"), 200)
+    assert source == SOURCE_SCHEMATIC
+    assert _size(png) == (200, int(200 * thumbnails.PAGE_ASPECT))
+
+
+def test_first_page_of_pdf():
+    pdfium = pytest.importorskip("pypdfium2")
+    document = pdfium.PdfDocument.new()
+    document.new_page(595, 842)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    document.close()
+    png, source = make_thumbnail(buffer.getvalue(), make_cv("small"), 120)
+    assert source == SOURCE_PDF
+    assert _size(png)[0] == 120
+
+
+def test_saves_are_debounced_into_one_refresh(monkeypatch):
+    refreshed = []
+
+    async def refresh(cv_id, user):
+        refreshed.append(cv_id)
+
+    async def scenario():
+        store = ThumbnailStore(width=120, idle_seconds=0.05)
+        monkeypatch.setattr(store, "refresh", refresh)
+        for _ in range(5):
+            store.schedule("cv1", USER)
+            await asyncio.sleep(0.01)
+        store.schedule("cv2", USER)
+        await asyncio.sleep(0.15)
+        return store
+
+    store = asyncio.run(scenario())
+    assert sorted(refreshed) == ["cv1", "cv2"]
+    assert store._timers == {} and store._pending == {}
+
+
+class FakeCVs:
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def find_one(self, query, projection=None):
+        return dict(self.doc)
+
+
+class FakeDB:
+    def __init__(self, doc):
+        self.cvs = FakeCVs(doc)
+
+
+def test_refreshes_during_a_refresh_coalesce(monkeypatch):
+    cv = make_cv("small")
+    cv.cv_id, cv.user_id = "cv1", "u1"
+    monkeypatch.setattr(thumbnails, "db", FakeDB(cv.model_dump()))
+    generated = []
+
+    async def get_or_create(cv, user, pdf_bytes=None):
+        generated.append(cv.cv_id)
+        await asyncio.sleep(0.02)
+
+    async def scenario():
+        store = ThumbnailStore(width=120, idle_seconds=0)
+        monkeypatch.setattr(store, "get_or_create", get_or_create)
+        await asyncio.gather(*(store.refresh("cv1", USER) for _ in range(4)))
+        return store
+
+    store = asyncio.run(scenario())
+    # The first refresh runs, the other three fold into one more pass
+    assert generated == ["cv1", "cv1"]
+    assert store._refreshing == {}